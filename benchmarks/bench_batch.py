@@ -0,0 +1,64 @@
+# Per-document cost of converting many short snippets
+import os
+import random
+import time
+
+from src.parsers import markdown_to_html_many, markdown_to_html_node
+
+SNIPPETS = 20_000
+
+PHRASES = [
+    "Thanks for the **great** write-up!",
+    "See [the docs](/docs/) for details.",
+    "I think _Glorfindel_ would win.",
+    "Run `make test` before pushing.",
+    "- first point\n- second point",
+    "> quoting the original post",
+    "+1",
+]
+
+
+def make_snippets(count=SNIPPETS, seed=0):
+    rng = random.Random(seed)
+    snippets = []
+    for i in range(count):
+        parts = rng.sample(PHRASES, 3)
+        # every snippet has one unique paragraph, like real comments
+        parts.append(f"Comment number {i} by user{rng.randrange(1000)}.")
+        snippets.append("\n\n".join(parts))
+    return snippets
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed * 1000:9.1f} ms{elapsed / count * 1e6:9.1f} us/doc")
+
+
+def main():
+    snippets = make_snippets()
+    count = len(snippets)
+    workers = os.cpu_count() or 1
+
+    timed(
+        "one call per document",
+        lambda: [markdown_to_html_node(md).to_html() for md in snippets],
+        count,
+    )
+    timed(
+        "batch, tree engine",
+        lambda: list(markdown_to_html_many(snippets, "tree")),
+        count,
+    )
+    timed("batch, direct engine", lambda: list(markdown_to_html_many(snippets)), count)
+    if workers > 1:
+        timed(
+            f"batch, {workers} workers",
+            lambda: list(markdown_to_html_many(snippets, workers=workers)),
+            count,
+        )
+
+
+if __name__ == "__main__":
+    main()
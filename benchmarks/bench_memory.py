@@ -0,0 +1,90 @@
+# Bytes per node for the node classes, compared with the old __dict__ layout
+import tracemalloc
+
+from src.nodes import LeafNode, NodeArena, ParentNode, TextNode, TextType
+
+NODE_COUNT = 100_000
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children is not None else []
+        self.props = props if props is not None else {}
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+def measure(factory, count=NODE_COUNT):
+    # the node values are shared, so only the node objects themselves count
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # subtract the list holding the nodes
+    holder = len(nodes) * 8
+    return (after - before - holder) / count
+
+
+def measure_arena(count=NODE_COUNT):
+    text = "shared text value"
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    arena = NodeArena()
+    root = arena.add_parent("div")
+    for _ in range(count - 1):
+        arena.add_leaf("b", text, root)
+    # the text buffer is joined on first render
+    arena.buffer
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    text_bytes = len(text) * (count - 1)
+    return (after - before - text_bytes) / count
+
+
+def main():
+    text = "shared text value"
+    cases = [
+        (
+            "TextNode",
+            lambda: DictTextNode(text, TextType.TEXT),
+            lambda: TextNode(text, TextType.TEXT),
+        ),
+        (
+            "LeafNode",
+            lambda: DictHTMLNode("b", text),
+            lambda: LeafNode("b", text),
+        ),
+        (
+            "LeafNode with props",
+            lambda: DictHTMLNode("a", text, props={"href": "/"}),
+            lambda: LeafNode("a", text, props={"href": "/"}),
+        ),
+    ]
+    leaf = LeafNode("b", text)
+    cases.append(
+        (
+            "ParentNode",
+            lambda: DictHTMLNode("p", children=[leaf]),
+            lambda: ParentNode("p", [leaf]),
+        )
+    )
+
+    print(f"{'node':<22}{'before':>10}{'after':>10}{'saved':>8}")
+    for name, old_factory, new_factory in cases:
+        old = measure(old_factory)
+        new = measure(new_factory)
+        saved = 100 * (old - new) / old
+        print(f"{name:<22}{old:>10.1f}{new:>10.1f}{saved:>7.0f}%")
+    print(f"{'NodeArena leaf':<22}{'':>10}{measure_arena():>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
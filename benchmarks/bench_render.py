@@ -0,0 +1,61 @@
+# Render throughput for the site content, with and without HTML escaping
+import glob
+import time
+
+from src.nodes import htmlnode
+from src.parsers import markdown_to_html_node
+
+REPEAT = 200
+ROUNDS = 5
+
+
+def load_corpus(pattern="content/**/*.md"):
+    documents = []
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            documents.append(f.read())
+    return "\n\n".join(documents * REPEAT)
+
+
+def best_time(func, rounds=ROUNDS):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def no_escape(value):
+    return value if type(value) is str else str(value)
+
+
+def main():
+    markdown = load_corpus()
+    node = markdown_to_html_node(markdown)
+    size = len(node.to_html())
+
+    escaped = best_time(node.to_html)
+    escape_text, escape_attr = htmlnode.escape_text, htmlnode.escape_attr
+    htmlnode.escape_text = htmlnode.escape_attr = no_escape
+    try:
+        raw = best_time(node.to_html)
+    finally:
+        htmlnode.escape_text, htmlnode.escape_attr = escape_text, escape_attr
+
+    parse = best_time(lambda: markdown_to_html_node(markdown))
+
+    print(f"document: {len(markdown) / 1e6:.2f} MB markdown, {size / 1e6:.2f} MB html")
+    print(f"parse:              {parse * 1000:8.1f} ms")
+    print(f"to_html (raw):      {raw * 1000:8.1f} ms")
+    print(f"to_html (escaped):  {escaped * 1000:8.1f} ms")
+    print(f"escaping overhead:  {100 * (escaped - raw) / raw:8.1f} % of to_html")
+    print(
+        f"                    {100 * (escaped - raw) / (parse + raw):8.1f} % of a build"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from src.build.builder import SiteBuilder
+from src.build.targets import Target, parse_target
+
+__all__ = ["SiteBuilder", "Target", "parse_target"]
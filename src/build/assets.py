@@ -0,0 +1,160 @@
+# Content-hash fingerprinting of static assets: /index.css is published as
+# /index.3f2a9c.css so it can be served with long-lived immutable caching.
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+from src.build.pages import read_text
+
+FINGERPRINT_EXTENSIONS = {
+    ".css",
+    ".js",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".svg",
+    ".webp",
+    ".woff",
+    ".woff2",
+}
+
+HASH_LENGTH = 6
+
+# url(...) and @import "..." references in stylesheets, up to any query
+# string or fragment
+_CSS_URL = re.compile(r"""(url\(\s*|@import\s+)(['"]?)([^'")\s?#;]+)""")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(65536)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprinted_path(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def resolve_css_url(path, css_url):
+    # root-relative URL of a stylesheet reference; None for data: URIs and
+    # other sites
+    if ":" in path or path.startswith("//"):
+        return None
+    if path.startswith("/"):
+        return path
+    return posixpath.normpath(posixpath.join(posixpath.dirname(css_url), path))
+
+
+def css_references(css, css_url):
+    resolved = (
+        resolve_css_url(match.group(3), css_url) for match in _CSS_URL.finditer(css)
+    )
+    return sorted({url for url in resolved if url})
+
+
+def rewrite_css_urls(css, css_url, manifest):
+    # points a stylesheet's references at the published (fingerprinted)
+    # names; relative references stay relative
+    def replace(match):
+        prefix, quote, path = match.groups()
+        resolved = resolve_css_url(path, css_url)
+        published = manifest.get(resolved) if resolved else None
+        if published is None or published == resolved:
+            return match.group()
+        if not path.startswith("/"):
+            published = posixpath.relpath(published, posixpath.dirname(css_url))
+        return f"{prefix}{quote}{published}"
+
+    return _CSS_URL.sub(replace, css)
+
+
+class AssetPipeline:
+    # Hashes every file below static_dir and maps its root-relative URL to
+    # the fingerprinted one. Hashes are cached by (mtime, size), so unchanged
+    # files are never read again.
+    def __init__(self, static_dir, cache):
+        self.static_dir = static_dir
+        self.cache = cache
+        self.manifest = {}
+        self.hashed = 0
+
+    def scan(self):
+        state = self.cache.load_json("assets.json", {})
+        new_state = {}
+        self.manifest = {}
+        self.hashed = 0
+        digests = {}
+        # stylesheet URL -> the URLs it refers to, kept with its hash
+        references = {}
+        for dir_path, dir_names, file_names in os.walk(self.static_dir):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.join(dir_path, file_name)
+                relative = os.path.relpath(path, self.static_dir).replace(os.sep, "/")
+                url = "/" + relative
+                stylesheet = file_name.lower().endswith(".css")
+                stat = os.stat(path)
+                entry = state.get(relative)
+                if (
+                    entry
+                    and entry[0] == stat.st_mtime_ns
+                    and entry[1] == stat.st_size
+                    and len(entry) == (4 if stylesheet else 3)
+                ):
+                    new_state[relative] = entry
+                else:
+                    entry = [stat.st_mtime_ns, stat.st_size, file_hash(path)]
+                    if stylesheet:
+                        entry.append(css_references(read_text(path), url))
+                    new_state[relative] = entry
+                    self.hashed += 1
+                digests[url] = entry[2]
+                if stylesheet:
+                    references[url] = entry[3]
+        for url in digests:
+            self._publish(url, digests, references, set())
+        if new_state != state:
+            self.cache.save_json("assets.json", new_state)
+        return self.manifest
+
+    def _publish(self, url, digests, references, visiting):
+        published = self.manifest.get(url)
+        if published is not None:
+            return published
+        if os.path.splitext(url)[1].lower() not in FINGERPRINT_EXTENSIONS:
+            published = url
+        elif url not in references:
+            published = fingerprinted_path(url, digests[url])
+        else:
+            # a stylesheet's name also covers the names it refers to, so it
+            # changes whenever one of them does
+            digest = hashlib.sha256(digests[url].encode("ascii"))
+            visiting.add(url)
+            for reference in references[url]:
+                if reference in digests and reference not in visiting:
+                    name = self._publish(reference, digests, references, visiting)
+                    digest.update(b"\0" + name.encode("utf-8"))
+            visiting.discard(url)
+            published = fingerprinted_path(url, digest.hexdigest())
+        self.manifest[url] = published
+        return published
+
+    def rewrite_css(self, url, css):
+        return rewrite_css_urls(css, url, self.manifest)
+
+    def manifest_json(self):
+        manifest = {
+            url[1:]: published[1:]
+            for url, published in self.manifest.items()
+            if url != published
+        }
+        return json.dumps(manifest, indent=2, sort_keys=True) + "\n"
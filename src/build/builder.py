@@ -0,0 +1,415 @@
+import hashlib
+import json
+import os
+import time
+
+from src.build.assets import AssetPipeline
+from src.build.cache import BuildCache
+from src.build.compress import DEFAULT_LEVEL, MIN_SIZE, compress_outputs
+from src.build.deploy import remove_stale_outputs, write_deploy_manifest
+from src.build.feed import FeedWriter
+from src.build.links import BrokenLinksError, LinkChecker
+from src.build.minify import minify_cached
+from src.build.navigation import PER_PAGE, Navigation, listing_url, scan_pages
+from src.build.output import DirectoryOutput
+from src.build.pages import (
+    Page,
+    apply_basepath,
+    fill_template,
+    find_markdown_files,
+    output_path,
+    page_title,
+    page_url,
+    read_page,
+    read_text,
+    select_paths,
+)
+from src.build.search import SearchIndex
+from src.build.sitemap import SitemapWriter
+from src.build.static import static_urls
+from src.build.targets import Target
+from src.build.templates import TemplateLoader
+from src.parsers import BlockCache, ConversionContext, PluginRunner, render_markdown
+from src.parsers.toc import toc_html
+
+CACHE_DIR = ".flatpy-cache"
+
+
+class SiteBuilder:
+    # Builds the site once per invocation and writes it to every target.
+    # Pages are parsed and rendered once with root-relative links; only the
+    # basepath rewrite and the write happen per target.
+    def __init__(
+        self,
+        content_dir="content",
+        template_path="template.html",
+        static_dir="static",
+        targets=None,
+        templates_dir="templates",
+        engine="tree",
+        cache=None,
+        search=True,
+        cache_dir=CACHE_DIR,
+        build_cache=None,
+        site_url="",
+        feed_sections=("blog",),
+        fingerprint=False,
+        minify=False,
+        gzip=False,
+        gzip_level=DEFAULT_LEVEL,
+        gzip_min_size=MIN_SIZE,
+        workers=None,
+        check_links=True,
+        fail_on_broken_links=False,
+        per_page=PER_PAGE,
+        output=None,
+        plugins=(),
+        profile_plugins=False,
+        toc=False,
+    ):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.static_dir = static_dir
+        self.templates = TemplateLoader(templates_dir)
+        self.targets = targets if targets else [Target()]
+        # an output such as MemoryOutput replaces the target's directory;
+        # sitemaps, feeds, the search index and .gz files are only written
+        # to directories
+        self.in_memory = output is not None
+        if self.in_memory and len(self.targets) > 1:
+            raise ValueError("An output can only be used with a single target")
+        self.outputs = (
+            [output]
+            if output is not None
+            else [DirectoryOutput(target.output_dir) for target in self.targets]
+        )
+        self.engine = engine
+        self.cache = cache if cache is not None else BlockCache()
+        self.cache_dir = cache_dir
+        if build_cache is None:
+            # in-memory builds keep their build cache in memory too
+            build_cache = BuildCache(None if self.in_memory else cache_dir)
+        self.build_cache = build_cache
+        self.site_url = site_url
+        self.feed_sections = tuple(feed_sections)
+        self.minify = minify
+        self.gzip = gzip
+        self.gzip_level = gzip_level
+        self.gzip_min_size = gzip_min_size
+        self.workers = workers
+        self.fail_on_broken_links = fail_on_broken_links
+        self.per_page = per_page
+        self.plugins = PluginRunner(plugins, profile_plugins) if plugins else None
+        # heading ids and a {{ Toc }} list, collected while converting
+        self.toc = toc
+        self.navigation = None
+        # pages whose menu, breadcrumbs or listing changed since the last build
+        self.navigation_affected = set()
+        self.link_checker = LinkChecker() if check_links else None
+        self.assets = (
+            AssetPipeline(static_dir, self.build_cache) if fingerprint else None
+        )
+        self.search_index = None
+        if search and not self.in_memory:
+            self.search_index = SearchIndex(os.path.join(cache_dir, "search.json"))
+
+        output_dirs = [os.path.normpath(target.output_dir) for target in self.targets]
+        if len(set(output_dirs)) != len(output_dirs):
+            raise ValueError("Each target needs its own output directory")
+
+    def prepare_targets(self, partial=False):
+        if self.link_checker is not None:
+            self.link_checker.add_static(self.static_dir)
+        if self.assets is not None:
+            self.assets.scan()
+            print(
+                f"Assets: {len(self.assets.manifest)} files, {self.assets.hashed} hashed"
+            )
+        if partial:
+            # static files are in place from the last full build
+            return
+        for output in self.outputs:
+            self.copy_static_to_output(output)
+            if self.assets is not None and not self.in_memory:
+                output.write_text("asset-manifest.json", self.assets.manifest_json())
+
+    def copy_static_to_output(self, output):
+        if self.assets is not None:
+            files = self.assets.manifest
+        else:
+            files = {url: url for url in static_urls(self.static_dir)}
+        for url, published in files.items():
+            source_path = os.path.join(self.static_dir, *url[1:].split("/"))
+            if url.endswith(".css") and (self.minify or self.assets is not None):
+                css = read_text(source_path)
+                if self.assets is not None:
+                    # url() references to fingerprinted files
+                    css = self.assets.rewrite_css(url, css)
+                if self.minify:
+                    css = minify_cached(css, ".css", self.build_cache)
+                output.write_text(published[1:], css)
+            else:
+                output.copy_file(source_path, published[1:])
+
+    def page_template(self, source_path, variables):
+        # front matter "template: blog.html", else the nearest page.html of
+        # the page's directory in templates/, else the site template
+        name = variables.get("template")
+        if name:
+            return self.templates.load_name(name)
+        directory = os.path.relpath(os.path.dirname(source_path), self.content_dir)
+        path = self.templates.find("" if directory == os.curdir else directory)
+        return self.templates.load(path if path is not None else self.template_path)
+
+    def build_page(self, source_path, date="", summary=""):
+        variables, markdown_content = read_page(source_path)
+        template = self.page_template(source_path, variables)
+        url = page_url(source_path, self.content_dir)
+        context = ConversionContext(
+            collect_text=self.search_index is not None,
+            collect_links=self.link_checker is not None,
+            plugins=self.plugins,
+            collect_toc=self.toc,
+        )
+        html_content = self.render_content(markdown_content, context)
+        title = page_title(markdown_content, variables)
+        mtime = os.path.getmtime(source_path)
+        page = Page(source_path, url, title, mtime, date, summary)
+        if self.search_index is not None:
+            self.search_index.add_page(page.url, title, context.text_nodes)
+        if self.link_checker is not None:
+            self.link_checker.add_output(page.url)
+            self.link_checker.add_page(source_path, page.url, context.links)
+
+        relative_path = output_path(source_path, self.content_dir, "")
+        listing_pages = 1
+        if self.navigation is not None:
+            variables = {**self.navigation.variables(url), **variables}
+            if url.endswith("/"):
+                listing_pages = self.navigation.page_count(url)
+        if context.toc is not None:
+            variables = {"Toc": toc_html(context.toc), **variables}
+        html = self.render_output(template, title, html_content, variables, url)
+        self.write_outputs(source_path, relative_path, html)
+
+        # further pages of a long section listing: /blog/page/2/, ...
+        for number in range(2, listing_pages + 1):
+            listing = listing_url(url, number)
+            variables.update(self.navigation.variables(url, number))
+            html = self.render_output(template, title, html_content, variables, listing)
+            self.write_outputs(
+                source_path, os.path.join(listing.strip("/"), "index.html"), html
+            )
+            if self.link_checker is not None:
+                self.link_checker.add_output(listing)
+        return page
+
+    def render_content(self, markdown_content, context):
+        # Page bodies, and what their conversion collected, are kept in the
+        # build cache by content hash, so a restored cache skips parsing.
+        # Plugins run code the generator version doesn't cover, so pages
+        # rendered with them are never stored.
+        if self.plugins is not None:
+            return render_markdown(markdown_content, self.engine, self.cache, context)
+        digest = hashlib.sha256(repr((self.engine, context.cache_key)).encode("utf-8"))
+        digest.update(markdown_content.encode("utf-8"))
+        key = digest.hexdigest()
+        cached = self.build_cache.read_blob("pages", key)
+        if cached is not None:
+            entry = json.loads(cached)
+            context.restore(entry["collected"])
+            return entry["html"]
+        html_content = render_markdown(
+            markdown_content, self.engine, self.cache, context
+        )
+        entry = {"html": html_content, "collected": context.collected()}
+        self.build_cache.write_blob("pages", key, json.dumps(entry).encode("utf-8"))
+        return html_content
+
+    def render_output(self, template, title, html_content, variables, url):
+        html = fill_template(template, title, html_content, variables)
+        if self.plugins is not None:
+            html = self.plugins.run("page", html, url)
+        return html
+
+    def write_outputs(self, source_path, relative_path, html):
+        manifest = self.assets.manifest if self.assets is not None else None
+        for target, output in zip(self.targets, self.outputs):
+            print(f"Generating page from {source_path} to {output.path(relative_path)}")
+            page_html = apply_basepath(html, target.basepath, manifest)
+            if self.minify:
+                page_html = minify_cached(page_html, ".html", self.build_cache)
+            output.write_text(relative_path, page_html)
+
+    def feed_section(self, page):
+        # pages below content/<section>/, but not the section's own index
+        section, _, rest = page.url.strip("/").partition("/")
+        if rest and section in self.feed_sections:
+            return section
+        return None
+
+    def selected_pages(self, pages, changed, patterns):
+        # source paths matching the patterns, plus the pages whose menu,
+        # breadcrumbs or listing show them and changed with them
+        selected = set(select_paths([page[0] for page in pages], patterns))
+        urls = {url for source_path, url, *_ in pages if source_path in selected}
+        affected = self.navigation.affected(urls.intersection(changed))
+        for source_path, url, *_ in pages:
+            if url in affected:
+                selected.add(source_path)
+        return selected
+
+    def skip_page(self, source_path, url, title, date="", summary=""):
+        # keep a page that isn't rebuilt in the sitemap, feeds, search index
+        # and the set of known outputs
+        mtime = os.path.getmtime(source_path)
+        page = Page(source_path, url, title, mtime, date, summary)
+        if self.search_index is not None:
+            self.search_index.keep_page(url)
+        if self.link_checker is not None:
+            self.link_checker.add_output(url)
+            if url.endswith("/"):
+                for number in range(2, self.navigation.page_count(url) + 1):
+                    self.link_checker.add_output(listing_url(url, number))
+        return page
+
+    def build(self, patterns=None):
+        # patterns (paths, directories or globs of content files) build only
+        # the matching pages and the pages depending on them; other outputs
+        # are left as they are
+        partial = patterns is not None
+        self.prepare_targets(partial)
+
+        sitemaps = [
+            SitemapWriter(
+                target.output_dir, self.build_cache, self.site_url, target.basepath
+            )
+            for target in self.targets
+            if not self.in_memory
+        ]
+        feeds = {}
+
+        paths = find_markdown_files(self.content_dir)
+        pages, changed = scan_pages(paths, self.content_dir, self.build_cache)
+        self.navigation = Navigation(pages, self.per_page)
+        self.navigation_affected = self.navigation.affected(changed)
+        selected = self.selected_pages(pages, changed, patterns) if partial else None
+        if partial:
+            print(f"Partial build: {len(selected)} of {len(pages)} pages")
+
+        for source_path, url, title, date, summary in pages:
+            if selected is None or source_path in selected:
+                page = self.build_page(source_path, date, summary)
+            else:
+                page = self.skip_page(source_path, url, title, date, summary)
+            for sitemap in sitemaps:
+                sitemap.add(page.url, page.lastmod)
+            section = self.feed_section(page)
+            if section is not None and not self.in_memory:
+                if section not in feeds:
+                    if self.link_checker is not None:
+                        self.link_checker.add_output(f"/{section}/feed.xml")
+                    feeds[section] = [
+                        FeedWriter(
+                            target.output_dir,
+                            self.build_cache,
+                            section,
+                            self.site_url,
+                            target.basepath,
+                        )
+                        for target in self.targets
+                    ]
+                for feed in feeds[section]:
+                    feed.add(page.url, page.title, page.updated, page.summary)
+
+        for sitemap in sitemaps:
+            if sitemap.close():
+                print(
+                    f"Wrote sitemap for {sitemap.url_count} pages to {sitemap.output_dir}"
+                )
+        for section, section_feeds in feeds.items():
+            for feed, output in zip(section_feeds, self.outputs):
+                if feed.close():
+                    print(f"Wrote feed {feed.path}")
+                # removed with the section's last page
+                output.written.add(f"{section}/feed.xml")
+        if self.search_index is not None:
+            self.write_search_index()
+        if not self.in_memory:
+            outputs = self.remove_stale_outputs(partial)
+        if self.gzip and not self.in_memory:
+            self.compress_targets()
+        if not self.in_memory:
+            self.write_deploy_manifests(outputs)
+        if self.plugins is not None and self.plugins.profile:
+            self.plugins.stop()
+            print("Plugin profile:")
+            for line in self.plugins.report():
+                print(f"  {line}")
+        if self.link_checker is not None:
+            self.check_links()
+
+    def remove_stale_outputs(self, partial=False):
+        # per target, the paths its deploy manifest lists as outputs
+        outputs = []
+        for output in self.outputs:
+            paths, removed = remove_stale_outputs(output, partial)
+            outputs.append(paths)
+            print(
+                f"Outputs {output.root}: "
+                f"{len(output.written) - output.unchanged} written, "
+                f"{output.unchanged} unchanged, {removed} stale removed"
+            )
+        return outputs
+
+    def write_deploy_manifests(self, outputs):
+        for target, paths in zip(self.targets, outputs):
+            files = write_deploy_manifest(target.output_dir, self.build_cache, paths)
+            print(f"Deploy manifest: {len(files)} files in {target.output_dir}")
+
+    def check_links(self):
+        checker = self.link_checker
+        checker.add_output("/sitemap.xml")
+        broken = checker.broken()
+        if not broken:
+            print(f"Links: {len(checker.references)} internal references checked")
+            return
+        report = checker.report(broken)
+        if self.fail_on_broken_links:
+            raise BrokenLinksError(
+                f"{len(broken)} broken internal references:\n{report}"
+            )
+        print(report)
+        print(
+            f"Links: {len(broken)} of {len(checker.references)} internal references broken"
+        )
+
+    def compress_targets(self):
+        for target in self.targets:
+            stats = compress_outputs(
+                target.output_dir,
+                self.build_cache,
+                self.gzip_level,
+                self.gzip_min_size,
+                self.workers,
+            )
+            print(
+                f"Gzip {target.output_dir}: {stats['compressed']} compressed, "
+                f"{stats['cached']} from cache, {stats['kept']} unchanged"
+            )
+
+    def write_search_index(self):
+        start = time.perf_counter()
+        index = self.search_index
+        index.remove_missing()
+        written = 0
+        for target in self.targets:
+            written += index.write(
+                os.path.join(target.output_dir, "search"), target.basepath
+            )
+        index.save()
+        index.finish()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Search index: {len(index.pages)} pages, {written} files written ({elapsed:.1f} ms)"
+        )
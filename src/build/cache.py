@@ -0,0 +1,68 @@
+import json
+import os
+
+from src.build.pages import write_text
+from src.build.store import (
+    LocalStore,
+    MemoryStore,
+    decode_entry,
+    encode_entry,
+    export_store,
+    generator_version,
+    import_store,
+)
+
+
+class BuildCache:
+    # Small JSON state files kept between builds in the cache directory, and
+    # blobs (rendered pages, minified and compressed outputs) in a
+    # content-addressed store that can be exported and restored elsewhere.
+    # With root=None nothing is written to disk (the dev server's cache).
+    def __init__(self, root=".flatpy-cache", store=None, version=None):
+        self.root = root
+        self._state = {} if root is None else None
+        if store is None:
+            store = MemoryStore() if root is None else LocalStore(self.path("store"))
+        self.store = store
+        self.version = version if version is not None else generator_version()
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def load_json(self, name, default=None):
+        if self._state is not None:
+            text = self._state.get(name)
+            return default if text is None else json.loads(text)
+        path = self.path(name)
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except ValueError:
+                # a truncated state file just means a cold cache
+                return default
+
+    def save_json(self, name, data):
+        if self._state is not None:
+            self._state[name] = json.dumps(data, separators=(",", ":"))
+            return
+        write_text(self.path(name), json.dumps(data, separators=(",", ":")))
+
+    def read_blob(self, namespace, key):
+        raw = self.store.get(f"{namespace}/{key}")
+        if raw is None:
+            return None
+        # None for entries of another generator version or damaged ones
+        return decode_entry(raw, self.version)
+
+    def write_blob(self, namespace, key, data):
+        self.store.put(f"{namespace}/{key}", encode_entry(data, self.version))
+
+    def export_to(self, destination):
+        # only the store: the JSON state files are mostly keyed by mtimes,
+        # which don't survive a move to another checkout
+        return export_store(self.store, destination, self.version)
+
+    def import_from(self, source):
+        return import_store(self.store, source, self.version)
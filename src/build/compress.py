@@ -0,0 +1,101 @@
+# Pre-compressed .gz siblings for text outputs, for servers that serve
+# precompressed files (e.g. nginx gzip_static)
+import gzip
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.build.deploy import MANIFEST_NAME
+
+COMPRESS_EXTENSIONS = {".html", ".css", ".js", ".svg", ".xml", ".json"}
+MIN_SIZE = 1024
+DEFAULT_LEVEL = 9
+
+
+def gzip_bytes(data, level=DEFAULT_LEVEL):
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def find_compressible(output_dir, min_size=MIN_SIZE):
+    paths = []
+    for dir_path, _, file_names in os.walk(output_dir):
+        for file_name in file_names:
+            if os.path.splitext(file_name)[1].lower() not in COMPRESS_EXTENSIONS:
+                continue
+            if file_name == MANIFEST_NAME and dir_path == output_dir:
+                # written after compression, and only read by deploy tools
+                continue
+            path = os.path.join(dir_path, file_name)
+            if os.path.getsize(path) >= min_size:
+                paths.append(path)
+    return sorted(paths)
+
+
+def compress_file(path, cache, level, previous):
+    # Returns (path, digest, how): "kept" when the existing .gz was made from
+    # the same bytes, "cached" when it was copied from the build cache.
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    gz_path = path + ".gz"
+
+    if previous == [digest, level] and os.path.exists(gz_path):
+        return path, digest, "kept"
+
+    key = f"{digest}-{level}"
+    compressed = cache.read_blob("gzip", key)
+    how = "cached"
+    if compressed is None:
+        compressed = gzip_bytes(data, level)
+        cache.write_blob("gzip", key, compressed)
+        how = "compressed"
+    with open(gz_path, "wb") as f:
+        f.write(compressed)
+    return path, digest, how
+
+
+def remove_stale_gzip(stale_paths):
+    # .gz files this build wrote earlier for outputs that were removed or
+    # fell below the size threshold; other .gz files (static archives, ...)
+    # aren't ours to remove
+    removed = 0
+    for path in stale_paths:
+        if os.path.exists(path + ".gz"):
+            os.remove(path + ".gz")
+            removed += 1
+    return removed
+
+
+def compress_outputs(
+    output_dir, cache, level=DEFAULT_LEVEL, min_size=MIN_SIZE, workers=None
+):
+    if not 1 <= level <= 9:
+        raise ValueError("Compression level must be between 1 and 9")
+
+    state = cache.load_json("gzip.json", {})
+    paths = find_compressible(output_dir, min_size)
+    # zlib releases the GIL while compressing, so threads run in parallel
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda path: compress_file(path, cache, level, state.get(path)), paths
+            )
+        )
+
+    stats = {"compressed": 0, "cached": 0, "kept": 0}
+    for path, digest, how in results:
+        state[path] = [digest, level]
+        stats[how] += 1
+    compressed_paths = set(paths)
+    prefix = os.path.join(output_dir, "")
+    stale_paths = [
+        path
+        for path in state
+        if path.startswith(prefix) and path not in compressed_paths
+    ]
+    stats["removed"] = remove_stale_gzip(stale_paths)
+    for path in stale_paths:
+        del state[path]
+    cache.save_json("gzip.json", state)
+    return stats
@@ -0,0 +1,121 @@
+# Deploy manifest: every output file's sha256, written next to the outputs
+# so a deploy can upload only the files that differ from the last one.
+import json
+import os
+
+from src.build.assets import file_hash
+from src.build.output import same_bytes
+
+MANIFEST_NAME = "deploy-manifest.json"
+
+
+def previous_outputs(output_dir):
+    # paths the last build wrote through its output, listed in the deploy
+    # manifest it left behind; so a fresh checkout of the output directory
+    # knows them without any cache state
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            outputs = json.load(f).get("outputs", [])
+    except (FileNotFoundError, ValueError):
+        return set()
+    return {
+        relative_path
+        for relative_path in outputs
+        if not os.path.isabs(relative_path)
+        and not os.path.normpath(relative_path).startswith("..")
+    }
+
+
+def remove_stale_outputs(output, partial=False):
+    # Files the last build wrote through this output that this build didn't,
+    # such as pages whose source was deleted. Returns the paths to list in
+    # the new manifest and the number of files removed. A partial build only
+    # wrote some files, so it removes nothing and lists both sets.
+    previous = previous_outputs(output.root)
+    if partial:
+        return previous | output.written, 0
+    removed = 0
+    for relative_path in sorted(previous - output.written):
+        path = output.path(relative_path)
+        if not os.path.exists(path):
+            continue
+        os.remove(path)
+        removed += 1
+        if os.path.exists(path + ".gz"):
+            os.remove(path + ".gz")
+        remove_empty_dirs(os.path.dirname(path), output.root)
+    return set(output.written), removed
+
+
+def remove_empty_dirs(directory, root):
+    root = os.path.normpath(root)
+    directory = os.path.normpath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        if os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+def scan_outputs(output_dir, cache):
+    # "/"-separated relative path -> sha256 of every file below output_dir.
+    # Hashes are cached by (mtime, size), and unchanged outputs keep their
+    # mtimes, so only files written by this build are read.
+    state = cache.load_json("deploy.json", {})
+    key = os.path.normpath(output_dir)
+    previous = state.get(key, {})
+    entries = {}
+    files = {}
+    for dir_path, dir_names, file_names in os.walk(output_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(dir_path, file_name)
+            relative = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if relative == MANIFEST_NAME:
+                continue
+            stat = os.stat(path)
+            entry = previous.get(relative)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                digest = entry[2]
+            else:
+                digest = file_hash(path)
+            entries[relative] = [stat.st_mtime_ns, stat.st_size, digest]
+            files[relative] = digest
+    if entries != previous:
+        state[key] = entries
+        cache.save_json("deploy.json", state)
+    return files
+
+
+def manifest_json(files, outputs=()):
+    # "outputs" are the files written through the build's output, the ones
+    # the next build may remove as stale
+    manifest = {"files": files, "outputs": sorted(outputs)}
+    return json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+
+
+def write_deploy_manifest(output_dir, cache, outputs=()):
+    files = scan_outputs(output_dir, cache)
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    data = manifest_json(files, outputs).encode("utf-8")
+    if not same_bytes(path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+    return files
+
+
+def load_manifest(path):
+    # a manifest file, or an output directory containing one
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_NAME)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+
+def diff_manifests(old, new):
+    # (added, changed, removed) relative paths, sorted
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    changed = sorted(path for path in new.keys() & old.keys() if new[path] != old[path])
+    return added, changed, removed
@@ -0,0 +1,78 @@
+# RSS feed for a content section (e.g. content/blog/). Only the newest
+# max_items pages are kept while pages stream in, so memory stays bounded.
+import hashlib
+import heapq
+import os
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+from src.build.sitemap import XML_HEADER, join_url, replace_if_changed
+
+MAX_FEED_ITEMS = 20
+
+
+class FeedWriter:
+    def __init__(
+        self,
+        output_dir,
+        cache,
+        section,
+        site_url="",
+        basepath="/",
+        title=None,
+        max_items=MAX_FEED_ITEMS,
+    ):
+        self.output_dir = output_dir
+        self.cache = cache
+        self.section = section
+        self.site_url = site_url
+        self.basepath = basepath
+        self.title = title or section.capitalize()
+        self.max_items = max_items
+        self._items = []
+
+    @property
+    def path(self):
+        return os.path.join(self.output_dir, self.section, "feed.xml")
+
+    def add(self, url, title, updated, summary=None):
+        item = (updated, url, title, summary or "")
+        if len(self._items) < self.max_items:
+            heapq.heappush(self._items, item)
+        elif item > self._items[0]:
+            heapq.heapreplace(self._items, item)
+
+    def link(self, url):
+        return escape(join_url(self.site_url, self.basepath, url))
+
+    def close(self):
+        items = sorted(self._items, reverse=True)
+        lines = [XML_HEADER, '<rss version="2.0">\n<channel>\n']
+        lines.append(f"  <title>{escape(self.title)}</title>\n")
+        lines.append(f"  <link>{self.link(f'/{self.section}/')}</link>\n")
+        lines.append(f"  <description>{escape(self.title)}</description>\n")
+        for updated, url, title, summary in items:
+            link = self.link(url)
+            lines.append(
+                f"  <item><title>{escape(title)}</title><link>{link}</link>"
+                f"<guid>{link}</guid>"
+                f"<pubDate>{formatdate(updated, usegmt=True)}</pubDate>"
+            )
+            if summary:
+                lines.append(f"<description>{escape(summary)}</description>")
+            lines.append("</item>\n")
+        lines.append("</channel>\n</rss>\n")
+
+        digest = hashlib.sha256()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line)
+                digest.update(line.encode("utf-8"))
+        return replace_if_changed(
+            self.cache,
+            "feeds.json",
+            self.path,
+            digest.hexdigest(),
+            [(self.path + ".tmp", self.path)],
+        )
@@ -0,0 +1,73 @@
+# Build-time check of internal links and images. References are collected
+# from the conversion context while pages render and resolved against a set
+# of known output paths once every page is known, so the cost is one set
+# lookup per link and the generated HTML is never read back.
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+from src.build.static import static_urls
+from src.nodes.textnode import TextType
+
+
+class BrokenLinksError(Exception):
+    pass
+
+
+def url_paths(url):
+    # every path a link to url may be served from: /blog/tom/ is also
+    # /blog/tom/index.html, and GitHub Pages redirects /blog/tom to it
+    if url.endswith("/"):
+        return (url, url + "index.html")
+    if url.endswith("/index.html"):
+        return (url, url[: -len("index.html")])
+    return (url,)
+
+
+def resolve_link(url, page_url):
+    # the site path an internal reference points at, or None for external
+    # URLs and same-page anchors
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        # relative to the directory the page is served from
+        path = page_url[: page_url.rfind("/") + 1] + path
+    trailing_slash = path.endswith("/")
+    path = posixpath.normpath(path)
+    if trailing_slash and path != "/":
+        path += "/"
+    return path
+
+
+class LinkChecker:
+    def __init__(self):
+        self.known = set()
+        self.references = []
+
+    def add_output(self, url):
+        self.known.update(url_paths(url))
+
+    def add_static(self, static_dir):
+        self.known.update(static_urls(static_dir))
+
+    def add_page(self, source_path, page_url, links):
+        for text_type, url in links:
+            path = resolve_link(url, page_url)
+            if path is not None:
+                self.references.append((source_path, text_type, url, path))
+
+    def broken(self):
+        known = self.known
+        return [
+            (source_path, text_type, url)
+            for source_path, text_type, url, path in self.references
+            if path not in known and path + "/" not in known
+        ]
+
+    def report(self, broken):
+        lines = []
+        for source_path, text_type, url in broken:
+            kind = "image" if text_type == TextType.IMAGE else "link"
+            lines.append(f"{source_path}: broken {kind} {url}")
+        return "\n".join(lines)
@@ -0,0 +1,102 @@
+# Metadata-only page scan: front matter, first heading and a summary, read
+# in growing chunks that stop as soon as they are known. Bodies are never
+# rendered, and only a prefix of each file is usually read.
+import codecs
+import os
+import re
+
+from src.nodes.blocknode import BlockType
+from src.nodes.textnode import TextType
+from src.parsers import block_to_block_type, split_front_matter, text_to_textnodes
+
+# the heading extract_title looks for
+_TITLE = re.compile(r"^#\s+.+$")
+
+CHUNK_SIZE = 4096
+SUMMARY_LENGTH = 200
+# give up looking for a summary past this many bytes
+MAX_SUMMARY_BYTES = 65536
+
+
+def summary_text(block):
+    # plain text of a paragraph with markdown syntax and images dropped;
+    # empty for paragraphs made only of links and images ("< Back Home")
+    nodes = text_to_textnodes(block.replace("\n", " "))
+    if all(node.text_type in (TextType.LINK, TextType.IMAGE) for node in nodes):
+        return ""
+    text = "".join(node.text for node in nodes if node.text_type != TextType.IMAGE)
+    text = " ".join(text.split())
+    if len(text) > SUMMARY_LENGTH:
+        text = text[: SUMMARY_LENGTH - 1].rsplit(" ", 1)[0] + "…"
+    return text
+
+
+def parse_metadata(text, complete):
+    # (variables, title, summary) from a file prefix, or None when more of
+    # the file is needed. The title is None when the file has no heading.
+    if text.startswith("---\n") and not complete:
+        if text.find("\n---\n", 3) == -1:
+            return None
+    variables, body = split_front_matter(text)
+
+    lines = body.split("\n")
+    if not complete:
+        # the last line may continue in the next chunk
+        lines.pop()
+
+    title = variables.get("title")
+    summary = variables.get("summary")
+    index = 0
+    if not title:
+        for index, line in enumerate(lines):
+            if _TITLE.match(line):
+                title = line[1:].strip()
+                break
+        else:
+            return (variables, None, summary or "") if complete else None
+        index += 1
+    if summary is not None:
+        return variables, title, summary
+
+    # first paragraph after the heading
+    block = []
+    for line in lines[index:] + ([""] if complete else []):
+        if line.strip():
+            block.append(line)
+            continue
+        if block:
+            markdown = "\n".join(block).strip()
+            if block_to_block_type(markdown) == BlockType.PARAGRAPH:
+                summary = summary_text(markdown)
+                if summary:
+                    return variables, title, summary
+            block = []
+    if complete or len(text) >= MAX_SUMMARY_BYTES:
+        return variables, title, ""
+    return None
+
+
+def read_metadata(path, chunk_size=CHUNK_SIZE):
+    # {"title", "date", "summary", front matter...} of a markdown file
+    # bytes are decoded incrementally: a text mode file would decode ahead
+    # of what is needed
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        text = ""
+        while True:
+            chunk = f.read(chunk_size)
+            complete = not chunk
+            text += decoder.decode(chunk, final=complete)
+            parsed = parse_metadata(text.replace("\r\n", "\n"), complete)
+            if parsed is not None:
+                break
+            # double the read size, so long files need few reads
+            chunk_size *= 2
+    variables, title, summary = parsed
+    if title is None:
+        raise Exception(f"No h1 header found in {os.path.normpath(path)}")
+    metadata = dict(variables)
+    metadata["title"] = title
+    metadata.setdefault("date", "")
+    metadata["summary"] = summary
+    return metadata
@@ -0,0 +1,154 @@
+# Whitespace minification for HTML and CSS outputs. The HTML minifier is
+# incremental: it takes the page in chunks and never builds a document tree,
+# keeping only an unfinished tag or text run between chunks.
+import hashlib
+import re
+
+# comments, doctype/tags, or text up to the next tag
+_HTML_TOKEN = re.compile(r"<!--.*?-->|<[^>]*>?|[^<]+", re.DOTALL)
+_TAG_NAME = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)")
+_WHITESPACE = re.compile(r"\s+")
+
+# content of these elements is kept byte for byte
+RAW_TAGS = {"pre", "textarea", "script", "style"}
+# and these hold text, not markup: a "<" in a script is no tag, so their
+# content is copied up to the literal closing tag without tokenizing it
+RAW_TEXT_TAGS = {"textarea", "script", "style"}
+
+# whitespace next to these tags doesn't render; between inline elements it
+# shows as a space
+BLOCK_TAGS = set(
+    "html head body title meta link script style div p pre blockquote ul ol li"
+    " dl dt dd h1 h2 h3 h4 h5 h6 hr table thead tbody tfoot tr th td section"
+    " article nav aside header footer main figure figcaption form".split()
+)
+
+# comments are dropped and quoted strings kept as they are; matched in one
+# pass so "/*" inside a string isn't a comment
+_CSS_SKIP = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.DOTALL)
+# whitespace before ":" stays: in a selector it is a descendant combinator
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*|(:)\s+")
+
+
+class HTMLMinifier:
+    def __init__(self):
+        self._pending = ""
+        self._raw_depth = 0
+        # the closing tag that ends the open raw text element, if any
+        self._raw_end = None
+        # whitespace seen since the last token, decided by the next tag
+        self._space = False
+        self._after_block = True
+
+    def feed(self, chunk):
+        text = self._pending + chunk
+        held = ""
+        comment = text.rfind("<!--")
+        if comment != -1 and text.find("-->", comment + 4) == -1:
+            # an unclosed comment may contain ">", wait for its end
+            text, held = text[:comment], text[comment:]
+        out = []
+        position = self._minify(text, out, final=False)
+        self._pending = text[position:] + held
+        return "".join(out)
+
+    def close(self):
+        text, self._pending = self._pending, ""
+        out = []
+        self._minify(text, out, final=True)
+        return "".join(out)
+
+    def _minify(self, text, out, final):
+        # appends the minified text to out; returns how far it got, as the
+        # last token may continue in the next chunk
+        position = 0
+        while position < len(text):
+            if self._raw_end is not None:
+                match = self._raw_end.search(text, position)
+                if match is None:
+                    # keep what may be the start of the closing tag
+                    end = len(text) if final else len(text) - len(self._raw_end.pattern)
+                    if end > position:
+                        out.append(text[position:end])
+                        position = end
+                    break
+                out.append(text[position : match.start()])  # noqa: E203
+                position = match.start()
+                self._raw_end = None
+            match = _HTML_TOKEN.match(text, position)
+            if match.end() == len(text) and not final:
+                break
+            out.append(self._token(match.group()))
+            position = match.end()
+        return position
+
+    def _token(self, token):
+        if token.startswith("<"):
+            if token.startswith("<!--"):
+                # comments are dropped, except conditional comments
+                return token if self._raw_depth or token.startswith("<!--[if") else ""
+            match = _TAG_NAME.match(token)
+            name = match.group(1).lower() if match else ""
+            if name in RAW_TAGS:
+                if token.startswith("</"):
+                    self._raw_depth = max(self._raw_depth - 1, 0)
+                elif not token.endswith("/>"):
+                    self._raw_depth += 1
+                    if name in RAW_TEXT_TAGS:
+                        self._raw_end = re.compile(f"</{name}", re.IGNORECASE)
+            # the doctype counts as a block
+            block = not match or name in BLOCK_TAGS
+            space = self._space and not (block or self._after_block)
+            self._space = False
+            self._after_block = block
+            return " " + token if space else token
+        if self._raw_depth:
+            return token
+        if token.isspace():
+            self._space = True
+            return ""
+        self._after_block = False
+        return _WHITESPACE.sub(" ", token)
+
+
+def minify_html(html, chunk_size=65536):
+    minifier = HTMLMinifier()
+    out = [
+        minifier.feed(html[start : start + chunk_size])  # noqa: E203
+        for start in range(0, len(html), chunk_size)
+    ]
+    out.append(minifier.close())
+    return "".join(out)
+
+
+def minify_css(css):
+    out = []
+    position = 0
+    for match in _CSS_SKIP.finditer(css):
+        out.append(_minify_css_code(css[position : match.start()]))  # noqa: E203
+        if not match.group().startswith("/*"):
+            out.append(match.group())
+        position = match.end()
+    out.append(_minify_css_code(css[position:]))
+    return "".join(out).strip()
+
+
+def _minify_css_code(css):
+    css = _WHITESPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1\2", css)
+    return css.replace(";}", "}")
+
+
+MINIFIERS = {".html": minify_html, ".css": minify_css}
+
+
+def minify_cached(text, kind, cache):
+    # results are cached by input hash, so unchanged pages and stylesheets
+    # are not minified again
+    key = f"{hashlib.sha256(text.encode('utf-8')).hexdigest()}{kind}"
+    cached = cache.read_blob("minify", key)
+    if cached is not None:
+        return cached.decode("utf-8")
+    result = MINIFIERS[kind](text)
+    cache.write_blob("minify", key, result.encode("utf-8"))
+    return result
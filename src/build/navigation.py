@@ -0,0 +1,199 @@
+# Site navigation derived from the content tree: one entry per page, linked
+# to the index page of its directory. The model is built once per build from
+# the page metadata, and templates get pre-rendered menu, breadcrumb and
+# section listing fragments from it.
+import os
+
+from src.build.metadata import read_metadata
+from src.build.pages import page_url
+from src.nodes.htmlnode import escape_attr, escape_text
+
+PER_PAGE = 10
+
+
+def parent_url(url):
+    # /blog/tom/ -> /blog/, /blog/post.html -> /blog/, /blog/ -> /
+    if url == "/":
+        return None
+    stripped = url.rstrip("/")
+    return stripped[: stripped.rfind("/") + 1]
+
+
+def listing_url(section_url, number):
+    return section_url if number == 1 else f"{section_url}page/{number}/"
+
+
+def _link(entry):
+    return f'<a href="{escape_attr(entry.url)}">{escape_text(entry.title)}</a>'
+
+
+def _listing_item(entry):
+    if not entry.summary:
+        return f"<li>{_link(entry)}</li>"
+    return f"<li>{_link(entry)}<p>{escape_text(entry.summary)}</p></li>"
+
+
+class NavEntry:
+    __slots__ = ("url", "title", "date", "summary", "source_path", "parent", "children")
+
+    def __init__(self, url, title, date="", summary="", source_path=None):
+        self.url = url
+        self.title = title
+        self.date = date
+        self.summary = summary
+        # None for directories without an index page
+        self.source_path = source_path
+        self.parent = None
+        self.children = []
+
+    @property
+    def is_page(self):
+        return self.source_path is not None
+
+    def __repr__(self):
+        return f"NavEntry({self.url}, {self.title}, {len(self.children)} children)"
+
+
+def scan_pages(paths, content_dir, cache):
+    # (source_path, url, title, date, summary) for each page, and the urls
+    # of pages whose metadata changed, appeared or disappeared since the
+    # last build. Only front matter and the first heading and paragraph are
+    # read, and the results are cached by modification time and size, so
+    # unchanged pages are not opened at all.
+    previous = cache.load_json("navigation.json", {})
+    state = {}
+    pages = []
+    changed = []
+    for source_path in paths:
+        stat = os.stat(source_path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        cached = previous.get(source_path)
+        if cached is not None and cached[:2] == key:
+            metadata = cached[2:]
+        else:
+            page = read_metadata(source_path)
+            metadata = [page["title"], page["date"], page["summary"]]
+        url = page_url(source_path, content_dir)
+        if cached is None or cached[2:] != metadata:
+            changed.append(url)
+        state[source_path] = key + metadata
+        pages.append((source_path, url, *metadata))
+    for source_path in previous.keys() - state.keys():
+        changed.append(page_url(source_path, content_dir))
+    if state != previous:
+        cache.save_json("navigation.json", state)
+    return pages, changed
+
+
+class Navigation:
+    def __init__(self, pages, per_page=PER_PAGE):
+        if per_page <= 0:
+            raise ValueError("per_page must be positive")
+        self.per_page = per_page
+        self.entries = {}
+        for source_path, url, title, date, summary in pages:
+            self.entries[url] = NavEntry(url, title, date, summary, source_path)
+        for entry in list(self.entries.values()):
+            self._attach(entry)
+        for entry in self.entries.values():
+            # newest first when pages have dates, then by title
+            entry.children.sort(key=lambda child: child.title)
+            entry.children.sort(key=lambda child: child.date, reverse=True)
+        self.root = self.entries.get("/")
+        self.menu = self._render_menu()
+
+    def _attach(self, entry):
+        while entry.parent is None and entry.url != "/":
+            url = parent_url(entry.url)
+            parent = self.entries.get(url)
+            created = parent is None
+            if created:
+                name = url.rstrip("/").rpartition("/")[2]
+                parent = self.entries[url] = NavEntry(url, name.capitalize() or "Home")
+            entry.parent = parent
+            parent.children.append(entry)
+            if not created:
+                break
+            entry = parent
+
+    def _render_menu(self):
+        if self.root is None:
+            return ""
+        items = "".join(
+            f"<li>{_link(child)}</li>" for child in self.page_children(self.root)
+        )
+        return f'<ul class="menu">{items}</ul>' if items else ""
+
+    def page_children(self, entry):
+        return [child for child in entry.children if child.is_page]
+
+    def page_count(self, url):
+        count = len(self.page_children(self.entries[url]))
+        return max(1, -(-count // self.per_page))
+
+    def breadcrumbs(self, url):
+        entry = self.entries[url]
+        trail = [f"<li>{escape_text(entry.title)}</li>"]
+        entry = entry.parent
+        while entry is not None:
+            item = _link(entry) if entry.is_page else escape_text(entry.title)
+            trail.append(f"<li>{item}</li>")
+            entry = entry.parent
+        return f'<ol class="breadcrumbs">{"".join(reversed(trail))}</ol>'
+
+    def listing(self, url, number=1):
+        children = self.page_children(self.entries[url])
+        start = (number - 1) * self.per_page
+        end = start + self.per_page
+        items = "".join(_listing_item(child) for child in children[start:end])
+        return f'<ul class="listing">{items}</ul>' if items else ""
+
+    def pagination(self, url, number=1):
+        count = self.page_count(url)
+        if count == 1:
+            return ""
+        links = []
+        if number > 1:
+            links.append(
+                f'<a href="{listing_url(url, number - 1)}" rel="prev">Newer</a>'
+            )
+        links.append(f"<span>{number} / {count}</span>")
+        if number < count:
+            links.append(
+                f'<a href="{listing_url(url, number + 1)}" rel="next">Older</a>'
+            )
+        return f'<nav class="pagination">{" ".join(links)}</nav>'
+
+    def variables(self, url, number=1):
+        return {
+            "Menu": self.menu,
+            "Breadcrumbs": self.breadcrumbs(url),
+            "Listing": self.listing(url, number),
+            "Pagination": self.pagination(url, number),
+        }
+
+    def affected(self, urls):
+        # pages whose navigation fragments change when the title or date of
+        # the given pages change: the sections listing them and the pages
+        # below them (breadcrumbs), or every page for a menu entry
+        affected = set()
+        for url in urls:
+            entry = self.entries.get(url)
+            if entry is not None:
+                parent = entry.parent
+            elif url != "/":
+                # a removed page
+                parent = self.entries.get(parent_url(url))
+            else:
+                parent = None
+            if parent is not None and parent is self.root:
+                return {url for url, entry in self.entries.items() if entry.is_page}
+            if parent is not None and parent.is_page:
+                affected.add(parent.url)
+            stack = list(entry.children) if entry is not None else []
+            while stack:
+                child = stack.pop()
+                if child.is_page:
+                    affected.add(child.url)
+                stack.extend(child.children)
+        return affected
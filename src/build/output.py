@@ -0,0 +1,68 @@
+import os
+
+
+def same_bytes(path, data):
+    # compares sizes first, so most changed files are never read
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+class DirectoryOutput:
+    # Generated files written below a target's output directory. Files whose
+    # bytes didn't change are not rewritten, so their mtimes survive and a
+    # sync to the server only transfers real changes.
+    def __init__(self, root):
+        self.root = root
+        # "/"-separated relative paths written (or kept) by this build
+        self.written = set()
+        self.unchanged = 0
+
+    def path(self, relative_path):
+        return os.path.join(self.root, relative_path)
+
+    def write_bytes(self, relative_path, data):
+        self.written.add(relative_path.replace(os.sep, "/"))
+        path = self.path(relative_path)
+        if same_bytes(path, data):
+            self.unchanged += 1
+            return False
+        dest_dir = os.path.dirname(path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return True
+
+    def write_text(self, relative_path, text):
+        return self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def copy_file(self, source_path, relative_path):
+        with open(source_path, "rb") as f:
+            return self.write_bytes(relative_path, f.read())
+
+
+class MemoryOutput:
+    # Build output kept in memory, as "/"-separated relative path -> bytes
+    def __init__(self):
+        self.files = {}
+
+    def path(self, relative_path):
+        return "memory:/" + relative_path.replace(os.sep, "/")
+
+    def write_bytes(self, relative_path, data):
+        self.files[relative_path.replace(os.sep, "/")] = data
+
+    def write_text(self, relative_path, text):
+        self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def copy_file(self, source_path, relative_path):
+        with open(source_path, "rb") as f:
+            self.write_bytes(relative_path, f.read())
+
+    def __len__(self):
+        return len(self.files)
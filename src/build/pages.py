@@ -0,0 +1,157 @@
+import fnmatch
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+from src.parsers import extract_title, render_markdown, split_front_matter
+
+# href="/..." and src="/..." up to any query string or fragment
+_ROOT_URL = re.compile(r'(href|src)="/([^"?#]*)')
+
+
+class NoPagesMatchError(ValueError):
+    pass
+
+
+def date_timestamp(date):
+    # seconds since the epoch of a front matter date ("2024-05-01", or an
+    # ISO 8601 date and time); None when missing or not a date
+    try:
+        value = datetime.fromisoformat(str(date).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class Page:
+    __slots__ = ("source_path", "url", "title", "mtime", "date", "summary")
+
+    def __init__(self, source_path, url, title, mtime, date="", summary=""):
+        self.source_path = source_path
+        self.url = url
+        self.title = title
+        self.mtime = mtime
+        self.date = date
+        self.summary = summary
+
+    @property
+    def updated(self):
+        # the front matter date; the source file's mtime changes with every
+        # checkout, so it is only used for pages without one
+        timestamp = date_timestamp(self.date)
+        return self.mtime if timestamp is None else timestamp
+
+    @property
+    def lastmod(self):
+        return time.strftime("%Y-%m-%d", time.gmtime(self.updated))
+
+    def __repr__(self):
+        return f"Page({self.url}, {self.title})"
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_text(path, text):
+    # Create destination directory if it doesn't exist
+    dest_dir = os.path.dirname(path)
+    if dest_dir and not os.path.exists(dest_dir):
+        os.makedirs(dest_dir)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def read_page(path):
+    # (front matter variables, markdown body)
+    return split_front_matter(read_text(path))
+
+
+def render_page(
+    markdown_content, template, engine="tree", cache=None, context=None, variables=None
+):
+    # Convert markdown to HTML
+    html_content = render_markdown(markdown_content, engine, cache, context)
+
+    # Extract title, unless the front matter sets one
+    title = page_title(markdown_content, variables)
+    return title, fill_template(template, title, html_content, variables)
+
+
+def page_title(markdown_content, variables=None):
+    if variables and variables.get("title"):
+        return variables["title"]
+    return extract_title(markdown_content)
+
+
+def fill_template(template, title, html_content, variables=None):
+    variables = dict(variables) if variables else {}
+    variables["Title"] = title
+    variables["Content"] = html_content
+    return template.render(variables)
+
+
+def apply_basepath(html, basepath, assets=None):
+    if not assets:
+        # Replace href and src paths with basepath
+        html = html.replace('href="/', f'href="{basepath}/')
+        return html.replace('src="/', f'src="{basepath}/')
+
+    # Same rewrite, also swapping asset paths for their fingerprinted names
+    def replace(match):
+        path = "/" + match.group(2)
+        return f'{match.group(1)}="{basepath}{assets.get(path, path)}'
+
+    return _ROOT_URL.sub(replace, html)
+
+
+def output_path(source_path, content_dir, output_dir):
+    # Convert content/blog/glorfindel/index.md -> docs/blog/glorfindel/index.html
+    relative_path = os.path.relpath(source_path, content_dir)
+    return os.path.join(output_dir, relative_path[:-3] + ".html")
+
+
+def page_url(source_path, content_dir):
+    # content/blog/tom/index.md -> /blog/tom/, content/about.md -> /about.html
+    relative_path = os.path.relpath(source_path, content_dir).replace(os.sep, "/")
+    relative_path = relative_path[:-3] + ".html"
+    if relative_path == "index.html":
+        return "/"
+    if relative_path.endswith("/index.html"):
+        return "/" + relative_path[: -len("index.html")]
+    return "/" + relative_path
+
+
+def find_markdown_files(content_dir):
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(content_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.endswith(".md"):
+                paths.append(os.path.join(dir_path, file_name))
+    return paths
+
+
+def select_paths(paths, patterns):
+    # paths matching any of the patterns: a file, a directory or a glob
+    # such as content/blog/tom/** ("*" also matches "/")
+    patterns = [os.path.normpath(pattern) for pattern in patterns]
+    selected = []
+    for path in paths:
+        normalized = os.path.normpath(path)
+        for pattern in patterns:
+            if (
+                normalized == pattern
+                or normalized.startswith(pattern + os.sep)
+                or fnmatch.fnmatchcase(normalized, pattern)
+            ):
+                selected.append(path)
+                break
+    if not selected:
+        raise NoPagesMatchError(f"No pages match {', '.join(patterns)}")
+    return selected
@@ -0,0 +1,131 @@
+# Static full-text search index: term -> pages with term counts, written as
+# one small JSON shard per leading character so a client only downloads the
+# shards for the terms it searches for.
+import json
+import os
+import re
+from collections import Counter
+
+from src.build.output import same_bytes
+from src.build.pages import write_text
+from src.build.sitemap import join_url
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(text.lower()) if len(word) > 1]
+
+
+def shard_key(term):
+    first = term[0]
+    if "a" <= first <= "z" or "0" <= first <= "9":
+        return first
+    return "_"
+
+
+class SearchIndex:
+    # Keeps every page's term counts in a state file between builds, so a
+    # build only rewrites the shards whose postings actually changed.
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.pages = {}
+        self.next_id = 0
+        self.postings = {}
+        self.dirty_shards = set()
+        self._seen = set()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.next_id = state["next_id"]
+        self.pages = state["pages"]
+        for page in self.pages.values():
+            self._add_postings(page["id"], page["terms"])
+
+    def save(self):
+        state = {"next_id": self.next_id, "pages": self.pages}
+        write_text(self.state_path, json.dumps(state, separators=(",", ":")))
+
+    def _add_postings(self, page_id, terms):
+        for term, count in terms.items():
+            shard = self.postings.setdefault(shard_key(term), {})
+            shard.setdefault(term, {})[page_id] = count
+
+    def _remove_postings(self, page_id, terms):
+        for term in terms:
+            key = shard_key(term)
+            shard = self.postings[key]
+            del shard[term][page_id]
+            if not shard[term]:
+                del shard[term]
+            self.dirty_shards.add(key)
+
+    def add_page(self, url, title, text_nodes):
+        counts = Counter()
+        for text_node in text_nodes:
+            counts.update(tokenize(text_node.text))
+        terms = dict(counts)
+        self._seen.add(url)
+
+        page = self.pages.get(url)
+        if page is not None and page["terms"] == terms and page["title"] == title:
+            return False
+
+        if page is None:
+            page = self.pages[url] = {"id": self.next_id, "title": title, "terms": {}}
+            self.next_id += 1
+
+        self._remove_postings(page["id"], page["terms"])
+        page["title"] = title
+        page["terms"] = terms
+        self._add_postings(page["id"], terms)
+        self.dirty_shards.update(shard_key(term) for term in terms)
+        return True
+
+    def keep_page(self, url):
+        # a page left out of a partial build stays indexed as it is
+        self._seen.add(url)
+
+    def remove_missing(self):
+        # pages indexed by an earlier build that no longer exist
+        for url in [url for url in self.pages if url not in self._seen]:
+            page = self.pages.pop(url)
+            self._remove_postings(page["id"], page["terms"])
+
+    def write(self, output_dir, basepath="/"):
+        # page urls in pages.json include the target's basepath, so a client
+        # can link to them as they are
+        written = 0
+        pages_path = os.path.join(output_dir, "pages.json")
+        pages = {
+            page["id"]: [join_url("", basepath, url), page["title"]]
+            for url, page in self.pages.items()
+        }
+        data = json.dumps(pages, separators=(",", ":"))
+        if not same_bytes(pages_path, data.encode("utf-8")):
+            write_text(pages_path, data)
+            written += 1
+
+        for key in sorted(set(self.postings) | self.dirty_shards):
+            shard_path = os.path.join(output_dir, f"{key}.json")
+            if key not in self.dirty_shards and os.path.exists(shard_path):
+                continue
+            shard = self.postings.get(key)
+            if not shard:
+                if os.path.exists(shard_path):
+                    os.remove(shard_path)
+                continue
+            data = {
+                term: sorted(pages.items()) for term, pages in sorted(shard.items())
+            }
+            write_text(shard_path, json.dumps(data, separators=(",", ":")))
+            written += 1
+        return written
+
+    def finish(self):
+        self.dirty_shards.clear()
+        self._seen.clear()
@@ -0,0 +1,281 @@
+# Development server: builds the site into memory and serves it from there
+# with strong ETags, 304 responses and gzip. A watcher thread rebuilds on
+# source changes and pushes a reload event to open pages over server-sent
+# events.
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from src.build.compress import COMPRESS_EXTENSIONS, MIN_SIZE, gzip_bytes
+from src.build.output import MemoryOutput
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = '
+    "function () { location.reload(); };</script>"
+).encode("utf-8")
+KEEPALIVE_SECONDS = 15
+
+
+class Resource:
+    __slots__ = (
+        "data",
+        "etag",
+        "gzip_etag",
+        "content_type",
+        "compressible",
+        "gzipped",
+    )
+
+    def __init__(self, path, data):
+        self.data = data
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # the gzip body is a different representation with its own ETag
+        self.gzip_etag = f'"{digest}-gzip"'
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith(("json", "xml")):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.compressible = (
+            os.path.splitext(path)[1].lower() in COMPRESS_EXTENSIONS
+            and len(data) >= MIN_SIZE
+        )
+        self.gzipped = None
+
+
+def inject_live_reload(html):
+    index = html.rfind(b"</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SCRIPT
+    return html[:index] + LIVE_RELOAD_SCRIPT + html[index:]
+
+
+def watched_files(paths):
+    # (mtime, size) of every file below the given files and directories
+    snapshot = {}
+    for root in paths:
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            snapshot[root] = (stat.st_mtime_ns, stat.st_size)
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class DevServer:
+    # make_builder(output) returns a SiteBuilder writing to that output; a
+    # fresh builder is made for every rebuild so templates and navigation
+    # are reloaded, while the builder can share a BlockCache between runs.
+    def __init__(
+        self,
+        make_builder,
+        watch_paths,
+        host="127.0.0.1",
+        port=8888,
+        basepath="",
+        live_reload=True,
+        poll_interval=0.5,
+    ):
+        self.make_builder = make_builder
+        self.watch_paths = watch_paths
+        self.basepath = basepath.rstrip("/")
+        self.live_reload = live_reload
+        self.poll_interval = poll_interval
+        self.site = {}
+        self.version = 0
+        self._changed = threading.Condition()
+        self._stopped = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), DevRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.dev = self
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.basepath}/"
+
+    def rebuild(self):
+        start = time.perf_counter()
+        output = MemoryOutput()
+        try:
+            self.make_builder(output).build()
+        except Exception as e:
+            # keep serving the last good build
+            print(f"Build failed: {e}")
+            return False
+
+        previous = self.site
+        site = {}
+        for path, data in output.files.items():
+            if self.live_reload and path.endswith(".html"):
+                data = inject_live_reload(data)
+            resource = Resource(path, data)
+            old = previous.get(path)
+            if old is not None and old.etag == resource.etag:
+                resource = old
+            site[path] = resource
+        with self._changed:
+            self.site = site
+            self.version += 1
+            self._changed.notify_all()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Built {len(site)} files in memory ({elapsed:.1f} ms)")
+        return True
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def wait_for_build(self, version, timeout):
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.version != version or self.stopped, timeout
+            )
+            return self.version
+
+    def resolve(self, request_path):
+        # (status, resource or redirect location)
+        path = unquote(urlsplit(request_path).path)
+        if self.basepath:
+            if path != self.basepath and not path.startswith(self.basepath + "/"):
+                return HTTPStatus.NOT_FOUND, self.site.get("404.html")
+            path = path[len(self.basepath) :] or "/"  # noqa: E203
+        relative = path.lstrip("/")
+        if not relative or relative.endswith("/"):
+            relative += "index.html"
+        resource = self.site.get(relative)
+        if resource is not None:
+            return HTTPStatus.OK, resource
+        if relative + "/index.html" in self.site:
+            return HTTPStatus.MOVED_PERMANENTLY, f"{self.basepath}{path}/"
+        return HTTPStatus.NOT_FOUND, self.site.get("404.html")
+
+    def watch(self):
+        snapshot = watched_files(self.watch_paths)
+        while not self._stopped.wait(self.poll_interval):
+            current = watched_files(self.watch_paths)
+            if current != snapshot:
+                snapshot = current
+                self.rebuild()
+
+    def serve_forever(self):
+        self.rebuild()
+        threading.Thread(target=self.watch, daemon=True).start()
+        print(f"Serving on {self.address}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._stopped.set()
+        with self._changed:
+            self._changed.notify_all()
+        self.httpd.server_close()
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == LIVE_RELOAD_PATH:
+            self.stream_reloads()
+        else:
+            self.respond(send_body=True)
+
+    def respond(self, send_body):
+        dev = self.server.dev
+        status, resource = dev.resolve(self.path)
+        if status == HTTPStatus.MOVED_PERMANENTLY:
+            self.send_response(status)
+            self.send_header("Location", resource)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if resource is None:
+            body = b"Not found"
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+
+        use_gzip = resource.compressible and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        )
+        etag = resource.gzip_etag if use_gzip else resource.etag
+        if status == HTTPStatus.OK and not self.if_none_match().isdisjoint(
+            (resource.etag, resource.gzip_etag)
+        ):
+            # either variant's ETag validates: both come from the same data
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            if resource.compressible:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = resource.data
+        if use_gzip:
+            if resource.gzipped is None:
+                resource.gzipped = gzip_bytes(body, 6)
+            body = resource.gzipped
+        self.send_response(status)
+        self.send_header("Content-Type", resource.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # always revalidate, unchanged files then only cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        if resource.compressible:
+            self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def if_none_match(self):
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+    def stream_reloads(self):
+        dev = self.server.dev
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        version = dev.version
+        try:
+            self.wfile.write(b"retry: 1000\n\n")
+            self.wfile.flush()
+            while not dev.stopped:
+                current = dev.wait_for_build(version, KEEPALIVE_SECONDS)
+                if current != version:
+                    version = current
+                    self.wfile.write(f"data: {version}\n\n".encode("utf-8"))
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
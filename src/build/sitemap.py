@@ -0,0 +1,119 @@
+# Streaming sitemap.xml writer. URLs are written to disk as pages are
+# generated, so memory doesn't grow with the page count, and the files are
+# only replaced when the URLs or their lastmod dates changed.
+import hashlib
+import os
+from xml.sax.saxutils import escape
+
+MAX_SITEMAP_URLS = 50000
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def join_url(site_url, basepath, path):
+    return site_url.rstrip("/") + basepath.rstrip("/") + path
+
+
+def replace_if_changed(cache, state_name, key, digest, moves):
+    # moves: (temporary path, final path) pairs written by this build. They
+    # replace the final files unless the previous build recorded the same
+    # digest and every final file is still there.
+    state = cache.load_json(state_name, {})
+    unchanged = state.get(key) == digest and all(
+        os.path.exists(final) for _, final in moves
+    )
+    for temporary, final in moves:
+        if unchanged:
+            os.remove(temporary)
+        else:
+            os.replace(temporary, final)
+    if not unchanged:
+        state[key] = digest
+        cache.save_json(state_name, state)
+    return not unchanged
+
+
+class SitemapWriter:
+    def __init__(self, output_dir, cache, site_url="", basepath="/"):
+        self.output_dir = output_dir
+        self.cache = cache
+        self.site_url = site_url
+        self.basepath = basepath
+        self.max_urls = MAX_SITEMAP_URLS
+        self.url_count = 0
+        self._digest = hashlib.sha256()
+        self._part_count = 0
+        self._file = None
+
+    def part_path(self, number):
+        return os.path.join(self.output_dir, f"sitemap-{number}.xml")
+
+    def loc(self, url):
+        return escape(join_url(self.site_url, self.basepath, url))
+
+    def add(self, url, lastmod=None):
+        if self._file is None or self.url_count % self.max_urls == 0:
+            self._start_part()
+        entry = f"  <url><loc>{self.loc(url)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        entry += "</url>\n"
+        self._file.write(entry)
+        self._digest.update(entry.encode("utf-8"))
+        self.url_count += 1
+
+    def _start_part(self):
+        self._end_part()
+        self._part_count += 1
+        path = self.part_path(self._part_count) + ".tmp"
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(XML_HEADER)
+        self._file.write(f'<urlset xmlns="{SITEMAP_NS}">\n')
+
+    def _end_part(self):
+        if self._file is not None:
+            self._file.write("</urlset>\n")
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        if self._part_count == 0:
+            self._start_part()
+        self._end_part()
+
+        index_path = os.path.join(self.output_dir, "sitemap.xml")
+        if self._part_count == 1:
+            # a single part is the sitemap itself
+            moves = [(self.part_path(1) + ".tmp", index_path)]
+        else:
+            # past max_urls, sitemap.xml becomes an index of the parts
+            moves = [
+                (self.part_path(n) + ".tmp", self.part_path(n))
+                for n in range(1, self._part_count + 1)
+            ]
+            with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(XML_HEADER)
+                f.write(f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+                for n in range(1, self._part_count + 1):
+                    loc = self.loc(f"/sitemap-{n}.xml")
+                    f.write(f"  <sitemap><loc>{loc}</loc></sitemap>\n")
+                f.write("</sitemapindex>\n")
+            moves.append((index_path + ".tmp", index_path))
+
+        self._digest.update(f"{self._part_count} {self.loc('/')}".encode("utf-8"))
+        changed = replace_if_changed(
+            self.cache, "sitemaps.json", index_path, self._digest.hexdigest(), moves
+        )
+        if changed:
+            self._remove_stale_parts()
+        return changed
+
+    def _remove_stale_parts(self):
+        # parts left over from an earlier, larger build
+        first = self._part_count + 1 if self._part_count > 1 else 1
+        number = first
+        while os.path.exists(self.part_path(number)):
+            os.remove(self.part_path(number))
+            number += 1
@@ -0,0 +1,12 @@
+import os
+
+
+def static_urls(static_dir):
+    # root-relative URL of every file below static_dir
+    urls = []
+    for dir_path, dir_names, file_names in os.walk(static_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            relative = os.path.relpath(os.path.join(dir_path, file_name), static_dir)
+            urls.append("/" + relative.replace(os.sep, "/"))
+    return urls
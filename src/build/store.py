@@ -0,0 +1,199 @@
+# Content-addressed storage behind the build cache. Entries are looked up by
+# a hash of their inputs and carry the generator version and a sha256 of
+# their data, so a store copied between machines (or a half-written file)
+# can only produce cache misses, never stale output.
+import hashlib
+import io
+import os
+import re
+import tarfile
+import threading
+
+ENTRY_MAGIC = b"flatpy-cache 1"
+
+# "<namespace>/<key>", where keys start with a hex digest; never a path
+# outside the store
+_KEY = re.compile(r"[a-z_]+/[0-9a-f]{2}[\w.-]*")
+
+# src/, whose code decides what every cache entry contains
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_VERSIONS = {}
+
+
+def generator_version(source_root=SOURCE_ROOT):
+    # hash of the generator's own source: any change to the parsers,
+    # renderers or build steps invalidates every cached entry
+    version = _VERSIONS.get(source_root)
+    if version is not None:
+        return version
+    digest = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(source_root):
+        dir_names[:] = sorted(
+            name for name in dir_names if name not in ("tests", "__pycache__")
+        )
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".py"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            relative = os.path.relpath(path, source_root).replace(os.sep, "/")
+            digest.update(relative.encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    version = _VERSIONS[source_root] = digest.hexdigest()[:16]
+    return version
+
+
+def encode_entry(data, version):
+    digest = hashlib.sha256(data).hexdigest()
+    header = b" ".join([ENTRY_MAGIC, version.encode("ascii"), digest.encode("ascii")])
+    return header + b"\n" + data
+
+
+def decode_entry(raw, version):
+    # the entry's data, or None when it was written by another version of
+    # the generator or doesn't match its hash
+    header, newline, data = raw.partition(b"\n")
+    if not newline:
+        return None
+    parts = header.rsplit(b" ", 2)
+    if len(parts) != 3 or parts[0] != ENTRY_MAGIC:
+        return None
+    if parts[1].decode("ascii", "replace") != version:
+        return None
+    if hashlib.sha256(data).hexdigest().encode("ascii") != parts[2]:
+        return None
+    return data
+
+
+def valid_key(key):
+    return _KEY.fullmatch(key) is not None and not key.endswith(".tmp")
+
+
+class LocalStore:
+    # Store backend keeping one file per entry below a directory. Other
+    # backends (a shared bucket, ...) implement the same get/put/delete/keys.
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        namespace, _, name = key.partition("/")
+        return os.path.join(self.root, namespace, name[:2], name)
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def put(self, key, raw):
+        # written under a temporary name first, so concurrent writers and
+        # interrupted builds never leave a truncated entry behind
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(raw)
+        os.replace(temporary, path)
+
+    def delete(self, key):
+        path = self.path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return
+        for namespace in sorted(os.listdir(self.root)):
+            namespace_dir = os.path.join(self.root, namespace)
+            if not os.path.isdir(namespace_dir):
+                continue
+            for dir_path, dir_names, file_names in os.walk(namespace_dir):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    key = f"{namespace}/{file_name}"
+                    if valid_key(key):
+                        yield key
+
+
+class MemoryStore:
+    # Store backend kept in a dict, for builds that must not touch the disk
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, raw):
+        self.entries[key] = raw
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+    def keys(self):
+        yield from sorted(self.entries)
+
+
+def is_tarball(path):
+    return path.endswith((".tar", ".tar.gz", ".tgz"))
+
+
+def export_store(store, destination, version):
+    # copies every entry of the current version to a directory or a
+    # .tar/.tar.gz file; returns the number of entries exported
+    entries = (
+        (key, raw)
+        for key, raw in ((key, store.get(key)) for key in store.keys())
+        if raw is not None and decode_entry(raw, version) is not None
+    )
+    count = 0
+    if not is_tarball(destination):
+        target = LocalStore(destination)
+        for key, raw in entries:
+            target.put(key, raw)
+            count += 1
+        return count
+
+    directory = os.path.dirname(destination)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    mode = "w" if destination.endswith(".tar") else "w:gz"
+    temporary = destination + ".tmp"
+    with tarfile.open(temporary, mode) as tar:
+        for key, raw in entries:
+            info = tarfile.TarInfo(key)
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+            count += 1
+    os.replace(temporary, destination)
+    return count
+
+
+def _tar_entries(source):
+    with tarfile.open(source, "r:*") as tar:
+        for member in tar:
+            if member.isfile() and valid_key(member.name):
+                yield member.name, tar.extractfile(member).read()
+
+
+def import_store(store, source, version):
+    # adds the valid entries of an exported directory or tarball to the
+    # store; returns (imported, skipped) counts
+    if not os.path.exists(source):
+        raise ValueError(f"No exported cache at {source}")
+    if is_tarball(source):
+        entries = _tar_entries(source)
+    elif os.path.isdir(source):
+        exported = LocalStore(source)
+        entries = ((key, exported.get(key)) for key in exported.keys())
+    else:
+        raise ValueError(f"No exported cache at {source}")
+    imported = skipped = 0
+    for key, raw in entries:
+        if raw is None or decode_entry(raw, version) is None:
+            skipped += 1
+            continue
+        store.put(key, raw)
+        imported += 1
+    return imported, skipped
@@ -0,0 +1,20 @@
+class Target:
+    def __init__(self, basepath="/", output_dir="docs"):
+        self.basepath = basepath
+        self.output_dir = output_dir
+
+    def __eq__(self, other):
+        if not isinstance(other, Target):
+            return False
+        return self.basepath == other.basepath and self.output_dir == other.output_dir
+
+    def __repr__(self):
+        return f"Target({self.basepath}, {self.output_dir})"
+
+
+def parse_target(spec):
+    # "BASEPATH=DIR", e.g. "/flatpy-staging=docs-staging"
+    basepath, separator, output_dir = spec.partition("=")
+    if not separator or not basepath or not output_dir:
+        raise ValueError(f"Invalid target: {spec} (expected BASEPATH=DIR)")
+    return Target(basepath, output_dir)
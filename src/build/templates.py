@@ -0,0 +1,196 @@
+# Small template engine: {{ Variable }}, {% include "name" %},
+# {% extends "name" %} and {% block name %}...{% endblock %}. Layouts,
+# blocks and includes are resolved when a template is compiled, leaving a
+# flat list of literal strings and variable slots, so rendering a page is a
+# single join. Parsed files are cached by the hash of their text.
+import hashlib
+import os
+import re
+
+_TOKEN = re.compile(r"\{\{\s*(\w+)\s*\}\}|\{%\s*(\w+)\s*(.*?)\s*%\}", re.DOTALL)
+_NAME = re.compile(r"\"([^\"]+)\"|'([^']+)'|(\w+)$")
+
+# the template looked up in each directory of templates/ for the pages of
+# the matching content directory
+DIRECTORY_TEMPLATE = "page.html"
+
+LITERAL = 0
+VARIABLE = 1
+BLOCK = 2
+INCLUDE = 3
+
+_PARSED = {}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Template:
+    __slots__ = ("segments", "slots")
+
+    def __init__(self, segments, slots):
+        # segments holds the literal text, with None for every variable;
+        # slots lists (segment index, variable name)
+        self.segments = segments
+        self.slots = slots
+
+    def render(self, variables):
+        out = list(self.segments)
+        for index, name in self.slots:
+            out[index] = variables.get(name, "")
+        return "".join(out)
+
+    @property
+    def variables(self):
+        return {name for _, name in self.slots}
+
+    def __repr__(self):
+        return f"Template({len(self.segments)} segments, {len(self.slots)} slots)"
+
+
+def _tag_name(tag, argument):
+    match = _NAME.match(argument)
+    if match is None:
+        raise TemplateError(f"Invalid {tag} tag argument: {argument!r}")
+    return next(group for group in match.groups() if group is not None)
+
+
+def parse_template(text):
+    # Returns (parent layout name or None, nodes). Nodes are (kind, value)
+    # pairs; blocks carry (name, child nodes).
+    parent = None
+    root = []
+    stack = [(None, root)]
+    position = 0
+    for match in _TOKEN.finditer(text):
+        nodes = stack[-1][1]
+        if match.start() > position:
+            nodes.append((LITERAL, text[position : match.start()]))  # noqa: E203
+        position = match.end()
+
+        variable, tag, argument = match.groups()
+        if variable is not None:
+            nodes.append((VARIABLE, variable))
+        elif tag == "extends":
+            if parent is not None or len(stack) > 1:
+                raise TemplateError("extends must appear once, outside blocks")
+            parent = _tag_name(tag, argument)
+        elif tag == "include":
+            nodes.append((INCLUDE, _tag_name(tag, argument)))
+        elif tag == "block":
+            children = []
+            nodes.append((BLOCK, (_tag_name(tag, argument), children)))
+            stack.append((match.group(), children))
+        elif tag == "endblock":
+            if len(stack) == 1:
+                raise TemplateError("endblock without a block")
+            stack.pop()
+        else:
+            raise TemplateError(f"Unknown template tag: {tag}")
+    if len(stack) > 1:
+        raise TemplateError(f"Unclosed {stack[-1][0]}")
+    if position < len(text):
+        root.append((LITERAL, text[position:]))
+    return parent, root
+
+
+def parse_cached(text):
+    key = hashlib.sha256(text.encode("utf-8")).digest()
+    parsed = _PARSED.get(key)
+    if parsed is None:
+        parsed = _PARSED[key] = parse_template(text)
+    return parsed
+
+
+def _collect_blocks(nodes, blocks):
+    # the most derived template's definition of a block wins
+    for kind, value in nodes:
+        if kind == BLOCK:
+            name, children = value
+            blocks.setdefault(name, children)
+            _collect_blocks(children, blocks)
+
+
+class TemplateLoader:
+    # Loads and compiles templates by name from the templates directory;
+    # compiled templates are kept for the lifetime of the loader.
+    def __init__(self, root="templates"):
+        self.root = root
+        self._compiled = {}
+        self._directory_templates = {}
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def _read(self, path):
+        if not os.path.isfile(path):
+            raise TemplateError(f"Template not found: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def load(self, path):
+        template = self._compiled.get(path)
+        if template is None:
+            template = self._compiled[path] = self.compile(self._read(path))
+        return template
+
+    def load_name(self, name):
+        return self.load(self.path(name))
+
+    def compile(self, text):
+        blocks = {}
+        parent, nodes = parse_cached(text)
+        seen = set()
+        while parent is not None:
+            # blocks of the child override those of its layout
+            if parent in seen:
+                raise TemplateError(f"Circular extends: {parent}")
+            seen.add(parent)
+            _collect_blocks(nodes, blocks)
+            parent, nodes = parse_cached(self._read(self.path(parent)))
+
+        segments = []
+        slots = []
+        self._flatten(nodes, blocks, segments, slots, ())
+        return Template(segments, slots)
+
+    def _flatten(self, nodes, blocks, segments, slots, including):
+        for kind, value in nodes:
+            if kind == LITERAL:
+                if segments and segments[-1] is not None:
+                    segments[-1] += value
+                else:
+                    segments.append(value)
+            elif kind == VARIABLE:
+                slots.append((len(segments), value))
+                segments.append(None)
+            elif kind == BLOCK:
+                name, children = value
+                self._flatten(
+                    blocks.get(name, children), blocks, segments, slots, including
+                )
+            else:
+                if value in including:
+                    raise TemplateError(f"Circular include: {value}")
+                _, included = parse_cached(self._read(self.path(value)))
+                self._flatten(included, blocks, segments, slots, including + (value,))
+
+    def find(self, directory):
+        # nearest templates/<directory>/page.html, walking up to the root;
+        # None when no directory on the way has one
+        if directory in self._directory_templates:
+            return self._directory_templates[directory]
+        path = self.path(os.path.join(directory, DIRECTORY_TEMPLATE))
+        if os.path.isfile(path):
+            found = path
+        elif directory:
+            found = self.find(os.path.dirname(directory))
+        else:
+            found = None
+        self._directory_templates[directory] = found
+        return found
+
+
+def compile_template(text, root="templates"):
+    return TemplateLoader(root).compile(text)
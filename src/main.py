@@ -1,89 +1,50 @@
+import argparse
+import importlib
 import os
 import shutil
 import sys
 
-from src.parsers import extract_title, markdown_to_html_node
-
-
-def copy_file(source_path, dest_path):
-    with open(source_path, "rb") as source_file:
-        with open(dest_path, "wb") as dest_file:
-            while True:
-                chunk = source_file.read(8192)
-                if not chunk:
-                    break
-                dest_file.write(chunk)
-
-
-def copy_static_to_docs(source_dir="static", dest_dir="docs"):
-    print(f"Starting copy from {source_dir} to {dest_dir}")
-
-    if os.path.exists(dest_dir):
-        print(f"Removing existing directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
-
-    print(f"Creating directory: {dest_dir}")
-    os.mkdir(dest_dir)
-
-    if not os.path.exists(source_dir):
-        print(f"Warning: source directory {source_dir} not found")
-        return
-
-    copy_directory_contents(source_dir, dest_dir)
-    print("Copy completed!")
-
-
-def copy_directory_contents(source_dir, dest_dir):
-    for item in os.listdir(source_dir):
-        source_path = os.path.join(source_dir, item)
-        dest_path = os.path.join(dest_dir, item)
-
-        if os.path.isfile(source_path):
-            print(f"Copying file: {source_path} -> {dest_path}")
-            copy_file(source_path, dest_path)
-        else:
-            print(f"Creating directory: {dest_path}")
-            os.mkdir(dest_path)
-            copy_directory_contents(source_path, dest_path)
-
-
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+from src.build import SiteBuilder, Target, parse_target
+from src.build.builder import CACHE_DIR
+from src.build.cache import BuildCache
+from src.build.compress import DEFAULT_LEVEL, MIN_SIZE
+from src.build.deploy import diff_manifests, load_manifest
+from src.build.links import BrokenLinksError
+from src.build.pages import (
+    NoPagesMatchError,
+    apply_basepath,
+    read_page,
+    read_text,
+    render_page,
+    write_text,
+)
+from src.build.server import DevServer
+from src.build.templates import compile_template
+from src.parsers import ENGINES, BlockCache
+
+
+def generate_page(
+    from_path, template_path, dest_path, basepath="/", engine="tree", cache=None
+):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
-    # Read markdown file
-    with open(from_path, "r", encoding="utf-8") as f:
-        markdown_content = f.read()
-
-    # Read template file
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
-
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
-
-    # Extract title
-    title = extract_title(markdown_content)
-
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
-
-    # Replace href and src paths with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}/')
-    final_html = final_html.replace('src="/', f'src="{basepath}/')
+    variables, markdown_content = read_page(from_path)
+    template = compile_template(read_text(template_path))
 
-    # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    _, final_html = render_page(
+        markdown_content, template, engine, cache, variables=variables
+    )
+    write_text(dest_path, apply_basepath(final_html, basepath))
 
-    # Write final HTML to destination
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(final_html)
 
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    engine="tree",
+    cache=None,
+):
     for item in os.listdir(dir_path_content):
         current_path = os.path.join(dir_path_content, item)
 
@@ -95,28 +56,291 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
             # Change .md to .html
             dest_path = dest_path[:-3] + ".html"
 
-            generate_page(current_path, template_path, dest_path, basepath)
+            generate_page(
+                current_path, template_path, dest_path, basepath, engine, cache
+            )
 
         elif os.path.isdir(current_path):
             # This is a directory - recurse into it
-            generate_pages_recursive(current_path, template_path, dest_dir_path, basepath)
-
-
-def main():
-    # Get basepath from CLI argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-
-    # Delete everything in docs directory
-    if os.path.exists("docs"):
-        shutil.rmtree("docs")
-
-    # Copy static files to docs
-    copy_static_to_docs()
-
-    # Generate all pages from content directory recursively
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+            generate_pages_recursive(
+                current_path, template_path, dest_dir_path, basepath, engine, cache
+            )
+
+
+def target_arg(spec):
+    try:
+        return parse_target(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def plugin_arg(spec):
+    # "package.module:ClassName", instantiated without arguments
+    module_name, _, class_name = spec.partition(":")
+    if not module_name or not class_name:
+        raise argparse.ArgumentTypeError(f"Expected MODULE:CLASS, got {spec!r}")
+    try:
+        plugin_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise argparse.ArgumentTypeError(f"Cannot load plugin {spec}: {e}")
+    return plugin_class()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default="tree",
+        help="rendering engine: the node tree, or direct string rendering",
+    )
+    parser.add_argument(
+        "--target",
+        dest="targets",
+        action="append",
+        type=target_arg,
+        metavar="BASEPATH=DIR",
+        help="render into DIR with BASEPATH; repeat to build several targets "
+        "from one parse (default: the basepath argument into docs)",
+    )
+    parser.add_argument(
+        "--site-url",
+        default="",
+        help="absolute site URL used in sitemap.xml and feeds, "
+        "e.g. https://user.github.io",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="publish static assets under content-hashed names "
+        "(index.3f2a9c.css) and rewrite references to them",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip redundant whitespace from HTML pages and CSS files",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write precompressed .gz files next to HTML/CSS/JS/SVG outputs",
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        choices=range(1, 10),
+        default=DEFAULT_LEVEL,
+        metavar="1-9",
+        help=f"gzip compression level (default: {DEFAULT_LEVEL})",
+    )
+    parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=MIN_SIZE,
+        metavar="BYTES",
+        help=f"only compress outputs of at least this size (default: {MIN_SIZE})",
+    )
+    parser.add_argument(
+        "--no-link-check",
+        dest="check_links",
+        action="store_false",
+        help="don't check internal links and images after the build",
+    )
+    parser.add_argument(
+        "--fail-on-broken-links",
+        action="store_true",
+        help="exit with an error when an internal link or image is broken",
+    )
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        type=plugin_arg,
+        default=[],
+        metavar="MODULE:CLASS",
+        help="run a build plugin (repeatable, applied in order)",
+    )
+    parser.add_argument(
+        "--profile-plugins",
+        action="store_true",
+        help="report the time and memory each plugin takes",
+    )
+    parser.add_argument(
+        "--only",
+        dest="patterns",
+        action="append",
+        metavar="PATH",
+        help="rebuild only matching content files and the pages listing them, "
+        "e.g. 'content/blog/tom/**' (repeatable); other outputs are kept",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="delete the output directories before building",
+    )
+    parser.add_argument(
+        "--toc",
+        action="store_true",
+        help="add heading ids and a {{ Toc }} template variable",
+    )
+    parser.add_argument(
+        "--no-search",
+        dest="search",
+        action="store_false",
+        help="don't generate the search index under <output>/search/",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main serve")
+    # an empty basepath serves the site at the root, with links unchanged
+    parser.add_argument("basepath", nargs="?", default="")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="tree")
+    parser.add_argument("--fingerprint", action="store_true")
+    parser.add_argument("--minify", action="store_true")
+    parser.add_argument("--toc", action="store_true")
+    parser.add_argument(
+        "--no-live-reload",
+        dest="live_reload",
+        action="store_false",
+        help="don't reload open pages after a rebuild",
+    )
+    return parser.parse_args(argv)
+
+
+def serve(args):
+    # Build into memory and rebuild on changes; blocks stay cached between
+    # rebuilds, so an edit only re-renders the blocks that changed
+    cache = BlockCache()
+    # kept in memory: the rebuild loop writes nothing to disk
+    build_cache = BuildCache(None)
+    target = Target(args.basepath, "docs")
+
+    def make_builder(output):
+        return SiteBuilder(
+            targets=[target],
+            engine=args.engine,
+            cache=cache,
+            build_cache=build_cache,
+            fingerprint=args.fingerprint,
+            minify=args.minify,
+            toc=args.toc,
+            output=output,
+        )
+
+    server = DevServer(
+        make_builder,
+        ["content", "static", "templates", "template.html"],
+        args.host,
+        args.port,
+        args.basepath,
+        args.live_reload,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_cache_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main cache")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument(
+        "path", help="directory, or .tar/.tar.gz file, to export to or import from"
+    )
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    return parser.parse_args(argv)
+
+
+def cache_command(args):
+    # Move the build cache between machines, e.g. between CI runs. Only
+    # entries of this generator version are exported, and imported entries
+    # are checked against their hashes and version first.
+    cache = BuildCache(args.cache_dir)
+    if args.action == "export":
+        count = cache.export_to(args.path)
+        print(f"Exported {count} cache entries to {args.path}")
+    else:
+        try:
+            imported, skipped = cache.import_from(args.path)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"Imported {imported} cache entries from {args.path} ({skipped} skipped)")
+
+
+def parse_diff_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main diff")
+    parser.add_argument("old", help="previous deploy manifest, or its output directory")
+    parser.add_argument(
+        "new", nargs="?", default="docs", help="current manifest or output directory"
+    )
+    return parser.parse_args(argv)
+
+
+def diff_command(args):
+    # files to upload (A/M) and delete (D) to bring a deploy of the old
+    # manifest up to date
+    added, changed, removed = diff_manifests(
+        load_manifest(args.old), load_manifest(args.new)
+    )
+    for status, paths in (("A", added), ("M", changed), ("D", removed)):
+        for path in paths:
+            print(f"{status} {path}")
+    print(
+        f"{len(added)} added, {len(changed)} changed, {len(removed)} removed",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        return serve(parse_serve_args(argv[1:]))
+    if argv[:1] == ["diff"]:
+        return diff_command(parse_diff_args(argv[1:]))
+    if argv[:1] == ["cache"]:
+        return cache_command(parse_cache_args(argv[1:]))
+    args = parse_args(argv)
+    targets = args.targets or [Target(args.basepath, "docs")]
+
+    # Outputs are updated in place: unchanged files keep their mtimes and
+    # stale ones are removed. --clean starts from empty output directories.
+    if args.clean:
+        for target in targets:
+            if os.path.exists(target.output_dir):
+                shutil.rmtree(target.output_dir)
+
+    # Copy static files to every target and generate all pages from the
+    # content directory, parsing each page once for all targets
+    builder = SiteBuilder(
+        targets=targets,
+        engine=args.engine,
+        search=args.search,
+        site_url=args.site_url,
+        fingerprint=args.fingerprint,
+        minify=args.minify,
+        gzip=args.gzip,
+        gzip_level=args.gzip_level,
+        gzip_min_size=args.gzip_min_size,
+        check_links=args.check_links,
+        fail_on_broken_links=args.fail_on_broken_links,
+        plugins=args.plugins,
+        profile_plugins=args.profile_plugins,
+        toc=args.toc,
+    )
+    try:
+        builder.build(args.patterns)
+    except (BrokenLinksError, NoPagesMatchError) as e:
+        sys.exit(str(e))
+
+    cache = builder.cache
+    print(
+        f"Block cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.1%})"
+    )
 
 
 if __name__ == "__main__":
@@ -1,5 +1,14 @@
+from src.nodes.arena import NodeArena
 from src.nodes.blocknode import BlockType
 from src.nodes.htmlnode import HTMLNode, LeafNode, ParentNode
 from src.nodes.textnode import TextNode, TextType
 
-__all__ = ["TextNode", "TextType", "HTMLNode", "LeafNode", "ParentNode", "BlockType"]
+__all__ = [
+    "TextNode",
+    "TextType",
+    "HTMLNode",
+    "LeafNode",
+    "ParentNode",
+    "BlockType",
+    "NodeArena",
+]
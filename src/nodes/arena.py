@@ -0,0 +1,207 @@
+# Compact, array-backed alternative to a tree of HTMLNode objects. Every
+# node is an index into parallel arrays, leaf text lives in one shared
+# buffer addressed by offsets, and props are stored once in a table.
+# The buffer is built from the leaf values rather than being the markdown
+# source: paragraphs join their lines, quotes and lists lose their markers
+# and inline markup is split off, so most leaf text isn't a slice of it.
+from array import array
+
+from src.nodes.htmlnode import (
+    EMPTY_PROPS,
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    close_tag,
+    escape_text,
+    open_tag,
+)
+
+NO_NODE = -1
+
+
+class NodeArena:
+    __slots__ = (
+        "tag_names",
+        "tag_ids",
+        "props_table",
+        "tags",
+        "props_ids",
+        "parents",
+        "first_child",
+        "last_child",
+        "next_sibling",
+        "text_start",
+        "text_end",
+        "_chunks",
+        "_length",
+    )
+
+    def __init__(self):
+        # tag id 0 is "no tag", props id 0 is "no props"
+        self.tag_names = [None]
+        self.tag_ids = {None: 0}
+        self.props_table = [EMPTY_PROPS]
+        self.tags = array("H")
+        self.props_ids = array("i")
+        self.parents = array("i")
+        self.first_child = array("i")
+        self.last_child = array("i")
+        self.next_sibling = array("i")
+        # parent nodes have text_start == -1
+        self.text_start = array("i")
+        self.text_end = array("i")
+        self._chunks = []
+        self._length = 0
+
+    def __len__(self):
+        return len(self.tags)
+
+    def _tag_id(self, tag):
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self.tag_ids[tag] = len(self.tag_names)
+            self.tag_names.append(tag)
+        return tag_id
+
+    def _add(self, tag, parent, props, start, end):
+        index = len(self.tags)
+        self.tags.append(self._tag_id(tag))
+        if props:
+            self.props_ids.append(len(self.props_table))
+            self.props_table.append(props)
+        else:
+            self.props_ids.append(0)
+        self.parents.append(parent)
+        self.first_child.append(NO_NODE)
+        self.last_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.text_start.append(start)
+        self.text_end.append(end)
+        if parent != NO_NODE:
+            last = self.last_child[parent]
+            if last == NO_NODE:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[last] = index
+            self.last_child[parent] = index
+        return index
+
+    def add_parent(self, tag, parent=NO_NODE, props=None):
+        return self._add(tag, parent, props, -1, -1)
+
+    def add_leaf(self, tag, value, parent=NO_NODE, props=None):
+        if value is None:
+            raise ValueError("LeafNode must have a value")
+        start = self._length
+        if value:
+            self._chunks.append(value)
+            self._length += len(value)
+        return self._add(tag, parent, props, start, self._length)
+
+    @property
+    def buffer(self):
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def is_leaf(self, index):
+        return self.text_start[index] != -1
+
+    def tag(self, index):
+        return self.tag_names[self.tags[index]]
+
+    def value(self, index):
+        start = self.text_start[index]
+        if start == -1:
+            return None
+        end = self.text_end[index]
+        return self.buffer[start:end]
+
+    def props(self, index):
+        return self.props_table[self.props_ids[index]]
+
+    def children(self, index):
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def to_html(self, index=0):
+        return "".join(self.render_fragments(index, []))
+
+    def render_fragments(self, index, out):
+        buffer = self.buffer
+        append = out.append
+        tag_names = self.tag_names
+        props_table = self.props_table
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        # same walk as htmlnode.render_fragments: pending close tags are
+        # pushed as strings, nodes as their indices
+        stack = [index]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                append(item)
+                continue
+            tag = tag_names[self.tags[item]]
+            props = props_table[self.props_ids[item]]
+            start = self.text_start[item]
+            if start != -1:
+                end = self.text_end[item]
+                value = escape_text(buffer[start:end])
+                if not tag:
+                    append(value)
+                else:
+                    append(open_tag(tag, props))
+                    append(value)
+                    append(close_tag(tag))
+                continue
+            if not tag:
+                raise ValueError("All parent nodes must have a tag")
+            child = first_child[item]
+            if child == NO_NODE:
+                raise ValueError("All parent nodes must have children")
+            append(open_tag(tag, props))
+            stack.append(close_tag(tag))
+            children = []
+            while child != NO_NODE:
+                children.append(child)
+                child = next_sibling[child]
+            stack.extend(reversed(children))
+        return out
+
+    def to_node(self, index=0):
+        # build bottom-up without recursion: in breadth-first order every
+        # child comes after its parent, so walking it backwards builds all
+        # children before the node that holds them
+        order = [index]
+        for node in order:
+            order.extend(self.children(node))
+        built = {}
+        for node in reversed(order):
+            tag = self.tag(node)
+            props = self.props(node) or None
+            if self.is_leaf(node):
+                built[node] = LeafNode(tag, self.value(node), props)
+            else:
+                children = [built.pop(child) for child in self.children(node)]
+                built[node] = ParentNode(tag, children, props)
+        return built[index]
+
+    @classmethod
+    def from_node(cls, node):
+        arena = cls()
+        stack = [(node, NO_NODE)]
+        while stack:
+            item, parent = stack.pop()
+            if not isinstance(item, HTMLNode):
+                raise TypeError("All children must be instances of HTMLNode")
+            if isinstance(item, LeafNode):
+                arena.add_leaf(item.tag, item.value, parent, item.props)
+                continue
+            if not isinstance(item, ParentNode):
+                raise TypeError(f"Unsupported node type: {type(item).__name__}")
+            index = arena.add_parent(item.tag, parent, item.props)
+            stack.extend((child, index) for child in reversed(item.children))
+        return arena
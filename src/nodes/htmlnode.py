@@ -1,24 +1,76 @@
+import sys
+from types import MappingProxyType
+
+# shared immutable empties, so leaves without children or props don't
+# each allocate their own list and dict
+EMPTY_CHILDREN = ()
+EMPTY_PROPS = MappingProxyType({})
+
+# rendered "<tag>" and "</tag>" strings, filled in on first use
+_OPEN_TAGS = {}
+_CLOSE_TAGS = {}
+
+
+def escape_text(text):
+    # most text has nothing to escape, and the substring checks are much
+    # cheaper than always running the replacements (or str.translate)
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def escape_attr(value):
+    if type(value) is not str:
+        value = str(value)
+    value = escape_text(value)
+    if '"' in value:
+        return value.replace('"', "&quot;")
+    return value
+
+
+def props_html(props):
+    return "".join([f' {key}="{escape_attr(val)}"' for key, val in props.items()])
+
+
+def open_tag(tag, props):
+    if props:
+        attrs = props_html(props)
+        return f"<{tag}{attrs}>"
+    html = _OPEN_TAGS.get(tag)
+    if html is None:
+        html = _OPEN_TAGS[tag] = f"<{tag}>"
+    return html
+
+
+def close_tag(tag):
+    html = _CLOSE_TAGS.get(tag)
+    if html is None:
+        html = _CLOSE_TAGS[tag] = f"</{tag}>"
+    return html
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag is not None else None
         self.value = value
-        self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.children = children if children is not None else EMPTY_CHILDREN
+        self.props = props if props is not None else EMPTY_PROPS
 
     def to_html(self):
         raise NotImplementedError
 
     def props_to_html(self):
-        html_string = ""
-        for key, val in self.props.items():
-            html_string += f' {key}="{val}"'
-        return html_string
+        return props_html(self.props)
 
     def __repr__(self):
-        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
+        return f"HTMLNode({self.tag}, {self.value}, {list(self.children)}, {dict(self.props)})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value")
@@ -27,12 +79,15 @@ class LeafNode(HTMLNode):
     def to_html(self):
         if self.value is None:
             raise ValueError("All leaf nodes must have a value")
+        value = escape_text(self.value)
         if not self.tag:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return value
+        return f"{open_tag(self.tag, self.props)}{value}{close_tag(self.tag)}"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if not children:
             raise ValueError("All parent nodes must have children")
@@ -41,12 +96,48 @@ class ParentNode(HTMLNode):
         super().__init__(tag, value=None, children=children, props=props)
 
     def to_html(self):
-        if not self.tag:
-            raise ValueError("All parent nodes must have a tag")
-        if not self.children:
-            raise ValueError("All parent nodes must have children")
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return "".join(render_fragments(self, []))
 
     def __repr__(self):
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+        return f"ParentNode({self.tag}, children: {self.children}, {dict(self.props)})"
+
+
+def render_fragments(node, out):
+    # Walks the tree with an explicit stack instead of recursion, so deeply
+    # nested documents can't hit the recursion limit, and appends every
+    # fragment to one list that the caller joins once. Pending close tags
+    # are pushed onto the same stack as plain strings.
+    append = out.append
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        item = pop()
+        if type(item) is str:
+            append(item)
+            continue
+        render = type(item).to_html
+        if render is LeafNode.to_html:
+            if item.value is None:
+                raise ValueError("All leaf nodes must have a value")
+            tag = item.tag
+            if not tag:
+                append(escape_text(item.value))
+            else:
+                append(open_tag(tag, item.props))
+                append(escape_text(item.value))
+                append(close_tag(tag))
+        elif render is ParentNode.to_html:
+            tag = item.tag
+            if not tag:
+                raise ValueError("All parent nodes must have a tag")
+            children = item.children
+            if not children:
+                raise ValueError("All parent nodes must have children")
+            append(open_tag(tag, item.props))
+            push(close_tag(tag))
+            stack.extend(reversed(children))
+        else:
+            # custom node types keep their own to_html
+            append(item.to_html())
+    return out
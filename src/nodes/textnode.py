@@ -8,9 +8,12 @@ class TextType(Enum):
     CODE = "`Code text`"
     LINK = "[anchor text](url)"
     IMAGE = "![alt text](url)"
+    FOOTNOTE = "[^footnote]"
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -1,14 +1,28 @@
+from src.parsers.batch import markdown_to_html_many
+from src.parsers.block_cache import BlockCache
 from src.parsers.block_parser import (
     block_to_block_type,
     extract_title,
     markdown_to_blocks,
 )
+from src.parsers.context import ConversionContext
 from src.parsers.converter import (
+    block_to_arena,
     block_to_html_node,
+    markdown_to_arena,
     markdown_to_html_node,
     text_node_to_html_node,
     text_to_children,
 )
+from src.parsers.front_matter import split_front_matter
+from src.parsers.html_renderer import (
+    ENGINES,
+    block_to_html,
+    markdown_to_html,
+    render_markdown,
+    text_to_html,
+)
+from src.parsers.plugins import Plugin, PluginRunner
 from src.parsers.text_parser import (
     extract_markdown_images,
     extract_markdown_links,
@@ -17,12 +31,25 @@ from src.parsers.text_parser import (
     split_nodes_link,
     text_to_textnodes,
 )
+from src.parsers.toc import slugify, toc_html
 
 __all__ = [
+    "BlockCache",
+    "ConversionContext",
+    "Plugin",
+    "PluginRunner",
     "text_node_to_html_node",
     "text_to_children",
     "block_to_html_node",
     "markdown_to_html_node",
+    "block_to_arena",
+    "markdown_to_arena",
+    "text_to_html",
+    "block_to_html",
+    "markdown_to_html",
+    "render_markdown",
+    "markdown_to_html_many",
+    "ENGINES",
     "split_nodes_delimiter",
     "extract_markdown_links",
     "extract_markdown_images",
@@ -32,4 +59,7 @@ __all__ = [
     "markdown_to_blocks",
     "block_to_block_type",
     "extract_title",
+    "split_front_matter",
+    "slugify",
+    "toc_html",
 ]
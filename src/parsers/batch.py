@@ -0,0 +1,78 @@
+# Batch conversion of many markdown documents, e.g. comments or
+# descriptions imported in bulk
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from src.parsers.block_cache import BlockCache
+from src.parsers.html_renderer import ENGINES
+
+# each worker process keeps its own cache across the chunks it renders
+_worker_cache = None
+
+
+def _init_worker(cache_size):
+    global _worker_cache
+    _worker_cache = BlockCache(cache_size)
+
+
+def _render_chunk(engine, documents):
+    render = ENGINES[engine]
+    return [render(markdown, _worker_cache) for markdown in documents]
+
+
+def _chunks(documents, size):
+    documents = iter(documents)
+    while True:
+        chunk = list(islice(documents, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def markdown_to_html_many(
+    documents,
+    engine="direct",
+    cache=None,
+    workers=None,
+    chunksize=256,
+    cache_size=65536,
+):
+    # Returns an iterator over the HTML of every document, in input order.
+    # All documents share one block cache (repeated snippets are rendered
+    # once) and the patterns compiled at import time. With workers > 1 the
+    # documents are rendered in chunks on a process pool; only a few chunks
+    # per worker are in flight, so arbitrarily long iterables are consumed
+    # lazily. Arguments are checked here, before the first document.
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown rendering engine: {engine}")
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    parallel = workers is not None and workers > 1
+    if parallel and cache is not None:
+        # a cache can't be shared with worker processes; each has its own
+        raise ValueError("A cache can't be used with workers, pass cache_size")
+
+    if not parallel:
+        if cache is None:
+            cache = BlockCache(cache_size)
+        return _render_serial(documents, ENGINES[engine], cache)
+    return _render_parallel(documents, engine, workers, chunksize, cache_size)
+
+
+def _render_serial(documents, render, cache):
+    for markdown in documents:
+        yield render(markdown, cache)
+
+
+def _render_parallel(documents, engine, workers, chunksize, cache_size):
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(cache_size,)
+    ) as executor:
+        pending = deque()
+        for chunk in _chunks(documents, chunksize):
+            pending.append(executor.submit(_render_chunk, engine, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+
+class BlockCache:
+    # Bounded LRU cache of rendered blocks. Entries are keyed by the block
+    # text itself: the dict lookup goes through the string's (cached) hash
+    # and only falls back to comparing text on a hash match, so colliding
+    # blocks can never share an entry.
+    def __init__(self, maxsize=65536):
+        if maxsize <= 0:
+            raise ValueError("BlockCache maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, block, render):
+        entries = self._entries
+        result = entries.get(block)
+        if result is not None:
+            entries.move_to_end(block)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = render(block)
+        entries[block] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return result
+
+    def render(self, block, render, context=None):
+        # render(block, context) through the cache. Blocks rendered for a
+        # collecting context are cached together with what they collected,
+        # which is replayed into the caller's context on every hit; blocks
+        # rendered with plugins are keyed by the plugins too.
+        if context is not None and not context.cacheable(block):
+            return render(block, context)
+        if context is None or not context.cache_key:
+            return self.get(block, render)
+
+        def render_collecting(key):
+            block_context = context.fork()
+            return render(block, block_context), block_context
+
+        result, block_context = self.get((block, context.cache_key), render_collecting)
+        context.merge(block_context)
+        return result
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries.clear()
+        self.reset_stats()
+
+    def __repr__(self):
+        return (
+            f"BlockCache({len(self._entries)}/{self.maxsize} blocks, "
+            f"{self.hits} hits, {self.misses} misses, {self.hit_rate:.1%} hit rate)"
+        )
@@ -2,14 +2,30 @@ import re
 
 from src.nodes import BlockType
 
+# compiled once at import, shared by every document
+_BLOCK_SEPARATOR = re.compile(r"\n\s*\n")
+_HEADING = re.compile(r"^#{1,6}\s+.+$")
+_UNORDERED_ITEM = re.compile(r"^\-\s+.+$")
+_ORDERED_ITEM = re.compile(r"^\d+\.\s+.+$")
+_ORDERED_NUMBER = re.compile(r"^(\d+)\.")
+_TITLE = re.compile(r"^#\s+.+$")
 
-def markdown_to_blocks(markdown):
-    raw_blocks = re.split(r"\n\s*\n", markdown.strip())
+
+def markdown_to_blocks(markdown, references=None):
+    # with a References table, link and footnote definitions are moved into
+    # it instead of becoming blocks
+    raw_blocks = _BLOCK_SEPARATOR.split(markdown.strip())
 
     blocks = []
     for block in raw_blocks:
         lines = block.splitlines()
         stripped_lines = [line.strip() for line in lines if line.strip()]
+        if (
+            references is not None
+            and stripped_lines
+            and not stripped_lines[0].startswith("```")
+        ):
+            stripped_lines = references.collect(stripped_lines)
         if stripped_lines:
             blocks.append("\n".join(stripped_lines))
 
@@ -23,7 +39,7 @@ def block_to_block_type(block):
     lines = block.splitlines()
 
     # heading: starts with 1–6 # and space
-    if re.match(r"^#{1,6}\s+.+$", lines[0]):
+    if _HEADING.match(lines[0]):
         return BlockType.HEADING
 
     # code: starts and ends with ```
@@ -35,14 +51,14 @@ def block_to_block_type(block):
         return BlockType.QUOTE
 
     # unordered list: all rows start with - and space
-    if all(re.match(r"^\-\s+.+$", line) for line in lines if line.strip()):
+    if all(_UNORDERED_ITEM.match(line) for line in lines if line.strip()):
         return BlockType.UNORDERED_LIST
 
     # ordered list: all rows start with number, dot and space (1., 2., ...)
-    if lines and all(re.match(r"^\d+\.\s+.+$", line) for line in lines if line.strip()):
+    if lines and all(_ORDERED_ITEM.match(line) for line in lines if line.strip()):
         # check that numbers start with 1
         numbers = [
-            int(re.match(r"^(\d+)\.", line).group(1)) for line in lines if line.strip()
+            int(_ORDERED_NUMBER.match(line).group(1)) for line in lines if line.strip()
         ]
         if numbers == list(range(1, len(numbers) + 1)):
             return BlockType.ORDERED_LIST
@@ -55,7 +71,7 @@ def extract_title(markdown):
     lines = markdown.splitlines()
 
     for line in lines:
-        if re.match(r"^#\s+.+$", line):
+        if _TITLE.match(line):
             return line[1:].strip()
 
     raise Exception("No h1 header found")
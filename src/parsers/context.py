@@ -0,0 +1,130 @@
+from src.nodes.textnode import TextNode, TextType
+from src.parsers.toc import SlugSet
+
+_LINK_TYPES = (TextType.LINK, TextType.IMAGE)
+
+
+class ConversionContext:
+    # Per-document state threaded through one conversion pass. Collectors
+    # (like the text nodes used for search indexing) are filled while the
+    # converter runs, so callers never have to walk the result again.
+    __slots__ = ("text_nodes", "links", "plugins", "toc", "slugs", "references")
+
+    def __init__(
+        self, collect_text=False, collect_links=False, plugins=None, collect_toc=False
+    ):
+        self.text_nodes = [] if collect_text else None
+        # (text_type, url) of every link and image, in document order
+        self.links = [] if collect_links else None
+        # a PluginRunner, shared by every context of a build
+        self.plugins = plugins
+        # (level, id, text) of every heading; headings get id attributes
+        self.toc = [] if collect_toc else None
+        self.slugs = SlugSet() if collect_toc else None
+        # link and footnote definitions of the document, if it has any
+        self.references = None
+
+    @property
+    def collecting(self):
+        return (
+            self.text_nodes is not None
+            or self.links is not None
+            or self.toc is not None
+        )
+
+    @property
+    def cache_key(self):
+        # settings that change what a block renders to or collects; cached
+        # blocks are only reused between contexts with the same key
+        key = ()
+        if self.text_nodes is not None:
+            key += ("text",)
+        if self.links is not None:
+            key += ("links",)
+        if self.plugins is not None:
+            key += ("plugins",) + self.plugins.key
+        if self.toc is not None:
+            key += ("toc",)
+        return key
+
+    def cacheable(self, block):
+        # heading ids depend on the headings before them in the document,
+        # and references on the document's definitions
+        if self.toc is not None and block.startswith("#"):
+            return False
+        return not self.references or ("][" not in block and "[^" not in block)
+
+    def add_heading(self, level, text):
+        slug = self.slugs.add(text)
+        self.toc.append((level, slug, text))
+        return slug
+
+    def transform_blocks(self, blocks):
+        if self.plugins is None or not self.plugins.has_hook("block"):
+            return blocks
+        transformed = (self.plugins.run("block", block) for block in blocks)
+        # a plugin drops a block by returning an empty string
+        return [block for block in transformed if block]
+
+    def transform_text_nodes(self, text_nodes):
+        if self.plugins is None:
+            return text_nodes
+        return self.plugins.run("text_nodes", text_nodes)
+
+    def transform_html_node(self, node, block_type):
+        if self.plugins is None:
+            return node
+        return self.plugins.run("html_node", node, block_type)
+
+    def add_text_nodes(self, text_nodes):
+        if self.text_nodes is not None:
+            self.text_nodes.extend(text_nodes)
+        if self.links is not None:
+            self.links.extend(
+                (node.text_type, node.url)
+                for node in text_nodes
+                if node.text_type in _LINK_TYPES
+            )
+
+    def fork(self):
+        # empty context with the same settings, for rendering one block
+        return ConversionContext(
+            collect_text=self.text_nodes is not None,
+            collect_links=self.links is not None,
+            plugins=self.plugins,
+            collect_toc=self.toc is not None,
+        )
+
+    def collected(self):
+        # what the conversion collected, as JSON-compatible lists
+        return {
+            "text": (
+                None
+                if self.text_nodes is None
+                else [[n.text, n.text_type.name, n.url] for n in self.text_nodes]
+            ),
+            "links": (
+                None
+                if self.links is None
+                else [[text_type.name, url] for text_type, url in self.links]
+            ),
+            "toc": self.toc,
+        }
+
+    def restore(self, collected):
+        # collectors filled from collected() of an earlier conversion
+        if self.text_nodes is not None:
+            self.text_nodes.extend(
+                TextNode(text, TextType[name], url)
+                for text, name, url in collected["text"]
+            )
+        if self.links is not None:
+            self.links.extend((TextType[name], url) for name, url in collected["links"])
+        if self.toc is not None:
+            self.toc.extend(tuple(entry) for entry in collected["toc"])
+
+    def merge(self, other):
+        if self.text_nodes is not None:
+            self.text_nodes.extend(other.text_nodes)
+        if self.links is not None:
+            self.links.extend(other.links)
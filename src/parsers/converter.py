@@ -1,9 +1,20 @@
 import re
 
-from src.nodes import BlockType, LeafNode, ParentNode, TextNode, TextType
+from src.nodes import BlockType, LeafNode, NodeArena, ParentNode, TextNode, TextType
+from src.nodes.arena import NO_NODE
 from src.parsers.block_parser import block_to_block_type, markdown_to_blocks
+from src.parsers.context import ConversionContext
+from src.parsers.highlight import TOKEN_PROPS, highlight
+from src.parsers.references import References
 from src.parsers.text_parser import text_to_textnodes
 
+_FENCE_LANGUAGE = re.compile(r"^```[ \t]*([\w+#.-]+)")
+
+_LIST_MARKERS = {
+    BlockType.UNORDERED_LIST: re.compile(r"^\-\s+"),
+    BlockType.ORDERED_LIST: re.compile(r"^\d+\.\s+"),
+}
+
 
 def text_node_to_html_node(text_node):
     if not isinstance(text_node, TextNode):
@@ -27,12 +38,46 @@ def text_node_to_html_node(text_node):
         return LeafNode(
             tag="img", value="", props={"src": text_node.url, "alt": text_node.text}
         )
+    elif text_node.text_type == TextType.FOOTNOTE:
+        link = LeafNode("a", text_node.text, {"href": f"#fn-{text_node.text}"})
+        return ParentNode("sup", [link], footnote_ref_props(text_node))
     else:
         raise ValueError(f"Unsupported TextType: {text_node.text_type}")
 
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+def footnote_ref_props(text_node):
+    # the first reference to a footnote is the target of its back link
+    return {"id": text_node.url} if text_node.url else None
+
+
+def document_blocks(markdown, context=None):
+    # Blocks of a document. Its link and footnote definitions are moved into
+    # the context while the blocks are split, creating a context if needed.
+    references = References()
+    blocks = markdown_to_blocks(markdown, references)
+    if references:
+        if context is None:
+            context = ConversionContext()
+        context.references = references
+    if context is not None:
+        blocks = context.transform_blocks(blocks)
+    return blocks, context
+
+
+def inline_text_nodes(text, context=None):
+    if context is None:
+        return text_to_textnodes(text)
+    text_nodes = text_to_textnodes(text, context.references)
+    text_nodes = context.transform_text_nodes(text_nodes)
+    context.add_text_nodes(text_nodes)
+    return text_nodes
+
+
+def text_to_children(text, context=None):
+    return text_nodes_to_children(inline_text_nodes(text, context))
+
+
+def text_nodes_to_children(text_nodes):
     children = []
     for text_node in text_nodes:
         html_node = text_node_to_html_node(text_node)
@@ -40,86 +85,278 @@ def text_to_children(text):
     return children
 
 
-def block_to_html_node(block, block_type):
+def heading_parts(block):
+    # heading level and text of the first line
+    first_line = block.splitlines()[0]
+    level = len(first_line) - len(first_line.lstrip("#"))
+    return level, first_line[level:].strip()
+
+
+def heading_props(level, text_nodes, context):
+    # id attribute of a heading when the context collects a table of contents;
+    # the entry's text is that of the heading's rendered text nodes
+    if context is None or context.toc is None:
+        return None
+    text = "".join(
+        node.text
+        for node in text_nodes
+        if node.text_type not in (TextType.IMAGE, TextType.FOOTNOTE)
+    )
+    return {"id": context.add_heading(level, text)}
+
+
+def code_block_language(block):
+    # "```python" -> "python", "" for fences without a language
+    match = _FENCE_LANGUAGE.match(block)
+    return match.group(1).lower() if match else ""
+
+
+def code_block_parts(block):
+    # (<code> props, highlighted tokens or None, code text)
+    language = code_block_language(block)
+    code_text = code_block_text(block)
+    props = {"class": f"language-{language}"} if language else None
+    tokens = highlight(code_text, language) if language else None
+    return props, tokens, code_text
+
+
+def code_block_text(block):
+    # remove code block markers (```)
+    lines = block.splitlines()
+    if lines[0].startswith("```"):
+        lines = lines[1:]
+    if lines and lines[-1].startswith("```"):
+        lines = lines[:-1]
+    code_text = "\n".join(lines)
+    # add newline at the end if it's not empty
+    if code_text and not code_text.endswith("\n"):
+        code_text += "\n"
+    return code_text
+
+
+def quote_block_text(block):
+    # remove > from each line
+    quote_lines = []
+    for line in block.splitlines():
+        if line.startswith(">"):
+            quote_lines.append(line[1:].strip())
+        else:
+            quote_lines.append(line.strip())
+    return "\n".join(quote_lines)
+
+
+def list_item_texts(block, block_type):
+    # remove "- " or "1. " markers from each non-empty line
+    marker = _LIST_MARKERS[block_type]
+    return [marker.sub("", line) for line in block.splitlines() if line.strip()]
+
+
+def block_to_html_node(block, block_type, context=None):
     if block_type == BlockType.PARAGRAPH:
         # replace newlines with spaces for paragraphs
         text = block.replace("\n", " ")
-        children = text_to_children(text)
+        children = text_to_children(text, context)
         return ParentNode("p", children)
 
     elif block_type == BlockType.HEADING:
-        # extract heading level and text
-        lines = block.splitlines()
-        first_line = lines[0]
-        level = len(first_line) - len(first_line.lstrip("#"))
-        heading_text = first_line[level:].strip()
-        children = text_to_children(heading_text)
-        return ParentNode(f"h{level}", children)
+        level, heading_text = heading_parts(block)
+        text_nodes = inline_text_nodes(heading_text, context)
+        props = heading_props(level, text_nodes, context)
+        return ParentNode(f"h{level}", text_nodes_to_children(text_nodes), props)
 
     elif block_type == BlockType.CODE:
-        # remove code block markers (```)
-        lines = block.splitlines()
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
-        code_text = "\n".join(lines)
-        # add newline at the end if it's not empty
-        if code_text and not code_text.endswith("\n"):
-            code_text += "\n"
         # for code blocks, we don't process inline markdown
-        code_node = LeafNode(tag=None, value=code_text)
-        inner_code = ParentNode("code", [code_node])
+        props, tokens, code_text = code_block_parts(block)
+        if tokens:
+            children = [
+                (
+                    LeafNode("span", text, TOKEN_PROPS[kind])
+                    if kind
+                    else LeafNode(None, text)
+                )
+                for kind, text in tokens
+            ]
+        else:
+            children = [LeafNode(tag=None, value=code_text)]
+        inner_code = ParentNode("code", children, props)
         return ParentNode("pre", [inner_code])
 
     elif block_type == BlockType.QUOTE:
-        # remove > from each line
-        lines = block.splitlines()
-        quote_lines = []
-        for line in lines:
-            if line.startswith(">"):
-                quote_lines.append(line[1:].strip())
-            else:
-                quote_lines.append(line.strip())
-        quote_text = "\n".join(quote_lines)
-        children = text_to_children(quote_text)
+        children = text_to_children(quote_block_text(block), context)
         return ParentNode("blockquote", children)
 
     elif block_type == BlockType.UNORDERED_LIST:
-        # split into list items
-        lines = block.splitlines()
-        list_items = []
-        for line in lines:
-            if line.strip():
-                # remove - and space
-                item_text = re.sub(r"^\-\s+", "", line)
-                item_children = text_to_children(item_text)
-                list_items.append(ParentNode("li", item_children))
+        list_items = [
+            ParentNode("li", text_to_children(item_text, context))
+            for item_text in list_item_texts(block, block_type)
+        ]
         return ParentNode("ul", list_items)
 
     elif block_type == BlockType.ORDERED_LIST:
-        # split into list items
-        lines = block.splitlines()
-        list_items = []
-        for line in lines:
-            if line.strip():
-                # remove number, dot and space
-                item_text = re.sub(r"^\d+\.\s+", "", line)
-                item_children = text_to_children(item_text)
-                list_items.append(ParentNode("li", item_children))
+        list_items = [
+            ParentNode("li", text_to_children(item_text, context))
+            for item_text in list_item_texts(block, block_type)
+        ]
         return ParentNode("ol", list_items)
 
     else:
         raise ValueError(f"Unknown block type: {block_type}")
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def render_block(block, context=None):
+    block_type = block_to_block_type(block)
+    html_node = block_to_html_node(block, block_type, context)
+    if context is not None:
+        html_node = context.transform_html_node(html_node, block_type)
+    return html_node
+
+
+def markdown_to_html_node(markdown, cache=None, context=None):
+    blocks, context = document_blocks(markdown, context)
     children = []
 
     for block in blocks:
-        block_type = block_to_block_type(block)
-        html_node = block_to_html_node(block, block_type)
+        if cache is not None:
+            # cached nodes are shared between documents, don't mutate them
+            html_node = cache.render(block, render_block, context)
+        else:
+            html_node = render_block(block, context)
         children.append(html_node)
 
+    if context is not None and context.references and context.references.order:
+        children.append(footnotes_to_html_node(context))
     return ParentNode("div", children)
+
+
+def footnotes_to_html_node(context):
+    # <section class="footnotes"> with the referenced footnotes, in order
+    items = []
+    for number, text in context.references.used_footnotes():
+        children = text_to_children(text, context)
+        children.append(LeafNode("a", "↩", {"href": f"#fnref-{number}"}))
+        items.append(ParentNode("li", children, {"id": f"fn-{number}"}))
+    return ParentNode("section", [ParentNode("ol", items)], {"class": "footnotes"})
+
+
+def text_node_to_arena(arena, parent, text_node):
+    # same mapping as text_node_to_html_node, added straight to the arena
+    if not isinstance(text_node, TextNode):
+        raise ValueError("Input must be a TextNode")
+
+    if text_node.text_type == TextType.TEXT:
+        return arena.add_leaf(None, text_node.text, parent)
+    elif text_node.text_type == TextType.BOLD:
+        return arena.add_leaf("b", text_node.text, parent)
+    elif text_node.text_type == TextType.ITALIC:
+        return arena.add_leaf("i", text_node.text, parent)
+    elif text_node.text_type == TextType.CODE:
+        return arena.add_leaf("code", text_node.text, parent)
+    elif text_node.text_type == TextType.LINK:
+        if text_node.url is None:
+            raise ValueError("Link TextNode must have a URL")
+        return arena.add_leaf("a", text_node.text, parent, {"href": text_node.url})
+    elif text_node.text_type == TextType.IMAGE:
+        if text_node.url is None:
+            raise ValueError("Image TextNode must have a URL")
+        return arena.add_leaf(
+            "img", "", parent, {"src": text_node.url, "alt": text_node.text}
+        )
+    elif text_node.text_type == TextType.FOOTNOTE:
+        index = arena.add_parent("sup", parent, footnote_ref_props(text_node))
+        arena.add_leaf("a", text_node.text, index, {"href": f"#fn-{text_node.text}"})
+        return index
+    else:
+        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
+
+
+def text_to_arena(arena, tag, parent, text, context=None):
+    return text_nodes_to_arena(arena, tag, parent, inline_text_nodes(text, context))
+
+
+def text_nodes_to_arena(arena, tag, parent, text_nodes, props=None):
+    if not text_nodes:
+        raise ValueError("All parent nodes must have children")
+    index = arena.add_parent(tag, parent, props)
+    for text_node in text_nodes:
+        text_node_to_arena(arena, index, text_node)
+    return index
+
+
+def block_to_arena(arena, parent, block, block_type, context=None):
+    if block_type == BlockType.PARAGRAPH:
+        return text_to_arena(arena, "p", parent, block.replace("\n", " "), context)
+
+    elif block_type == BlockType.HEADING:
+        level, heading_text = heading_parts(block)
+        text_nodes = inline_text_nodes(heading_text, context)
+        props = heading_props(level, text_nodes, context)
+        return text_nodes_to_arena(arena, f"h{level}", parent, text_nodes, props)
+
+    elif block_type == BlockType.CODE:
+        props, tokens, code_text = code_block_parts(block)
+        index = arena.add_parent("pre", parent)
+        inner_code = arena.add_parent("code", index, props)
+        if tokens:
+            for kind, text in tokens:
+                if kind:
+                    arena.add_leaf("span", text, inner_code, TOKEN_PROPS[kind])
+                else:
+                    arena.add_leaf(None, text, inner_code)
+        else:
+            arena.add_leaf(None, code_text, inner_code)
+        return index
+
+    elif block_type == BlockType.QUOTE:
+        return text_to_arena(
+            arena, "blockquote", parent, quote_block_text(block), context
+        )
+
+    elif block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        item_texts = list_item_texts(block, block_type)
+        if not item_texts:
+            raise ValueError("All parent nodes must have children")
+        tag = "ul" if block_type == BlockType.UNORDERED_LIST else "ol"
+        index = arena.add_parent(tag, parent)
+        for item_text in item_texts:
+            text_to_arena(arena, "li", index, item_text, context)
+        return index
+
+    else:
+        raise ValueError(f"Unknown block type: {block_type}")
+
+
+def block_to_arena_html(block, context=None):
+    arena = NodeArena()
+    block_to_arena(arena, NO_NODE, block, block_to_block_type(block), context)
+    return arena.to_html()
+
+
+def markdown_to_arena(markdown, context=None):
+    blocks, context = document_blocks(markdown, context)
+    if not blocks:
+        raise ValueError("All parent nodes must have children")
+
+    arena = NodeArena()
+    root = arena.add_parent("div")
+    for block in blocks:
+        block_to_arena(arena, root, block, block_to_block_type(block), context)
+    if context is not None and context.references and context.references.order:
+        footnotes_to_arena(arena, root, context)
+    return arena
+
+
+def footnotes_to_arena(arena, parent, context):
+    section = arena.add_parent("section", parent, {"class": "footnotes"})
+    items = arena.add_parent("ol", section)
+    for number, text in context.references.used_footnotes():
+        item = arena.add_parent("li", items, {"id": f"fn-{number}"})
+        for text_node in inline_text_nodes(text, context):
+            text_node_to_arena(arena, item, text_node)
+        arena.add_leaf("a", "↩", item, {"href": f"#fnref-{number}"})
+    return section
+
+
+def footnotes_arena_html(context):
+    arena = NodeArena()
+    footnotes_to_arena(arena, NO_NODE, context)
+    return arena.to_html()
@@ -0,0 +1,28 @@
+_DELIMITER = "---"
+
+
+def split_front_matter(markdown):
+    # "---" delimited "key: value" lines at the very top of a document.
+    # Returns (variables, markdown without the front matter).
+    if not markdown.startswith(_DELIMITER + "\n"):
+        return {}, markdown
+    end = markdown.find(f"\n{_DELIMITER}\n", len(_DELIMITER))
+    if end == -1:
+        if not markdown.endswith(f"\n{_DELIMITER}"):
+            return {}, markdown
+        end = len(markdown) - len(_DELIMITER) - 1
+
+    variables = {}
+    for line in markdown[len(_DELIMITER) + 1 : end].splitlines():  # noqa: E203
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        key = key.strip()
+        if not separator or not key:
+            raise ValueError(f"Invalid front matter line: {line}")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        variables[key] = value
+    return variables, markdown[end + len(_DELIMITER) + 2 :].lstrip("\n")  # noqa: E203
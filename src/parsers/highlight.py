@@ -0,0 +1,188 @@
+# Build-time syntax highlighting for fenced code blocks. Each language is a
+# single regular expression over comments, strings, numbers and words; words
+# are looked up in keyword and builtin sets. Token lists are cached by
+# (language, code hash), so a snippet repeated across pages or builds in the
+# same process is tokenized once.
+import builtins
+import hashlib
+import keyword
+import re
+from types import MappingProxyType
+
+from src.parsers.block_cache import BlockCache
+
+_NUMBER = r"\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)"
+_DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+_SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+_C_COMMENT = r"//[^\n]*|/\*.*?\*/"
+
+# props of the <span> around each kind of token, shared by all nodes
+TOKEN_PROPS = {
+    kind: MappingProxyType({"class": f"hl-{kind}"})
+    for kind in ("keyword", "builtin", "string", "comment", "number", "tag")
+}
+
+
+class Language:
+    __slots__ = ("name", "pattern", "keywords", "builtins")
+
+    def __init__(self, name, comment, string, keywords=(), builtins=(), tag=None):
+        self.name = name
+        parts = [f"(?P<comment>{comment})"] if comment else []
+        if tag:
+            parts.append(f"(?P<tag>{tag})")
+        parts += [
+            f"(?P<string>{string})",
+            f"(?P<number>{_NUMBER})",
+            r"(?P<word>[A-Za-z_$][\w$]*)",
+        ]
+        self.pattern = re.compile("|".join(parts), re.DOTALL)
+        self.keywords = frozenset(keywords)
+        self.builtins = frozenset(builtins)
+
+    def tokenize(self, code):
+        # [(css class or None, text), ...]; plain runs are merged
+        tokens = []
+        position = 0
+        for match in self.pattern.finditer(code):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == "word":
+                if text in self.keywords:
+                    kind = "keyword"
+                elif text in self.builtins:
+                    kind = "builtin"
+                else:
+                    kind = None
+            start = match.start()
+            if kind is None:
+                continue
+            if start > position:
+                tokens.append((None, code[position:start]))
+            tokens.append((kind, text))
+            position = match.end()
+        if position < len(code):
+            tokens.append((None, code[position:]))
+        return tuple(tokens)
+
+
+_C_KEYWORDS = (
+    "break case char const continue default do double else enum extern float "
+    "for goto if int long return short signed sizeof static struct switch "
+    "typedef union unsigned void volatile while"
+).split()
+
+_JS_KEYWORDS = (
+    "async await break case catch class const continue debugger default delete "
+    "do else export extends false finally for from function if import in "
+    "instanceof let new null of return static super switch this throw true try "
+    "typeof undefined var void while with yield"
+).split()
+
+_LANGUAGES = [
+    (
+        ("python", "py", "python3"),
+        Language(
+            "python",
+            r"#[^\n]*",
+            r'[rbfuRBFU]{0,2}(?:"""(?:\\.|[^\\])*?"""|'
+            r"'''(?:\\.|[^\\])*?'''|" + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + ")",
+            keyword.kwlist + keyword.softkwlist,
+            [name for name in dir(builtins) if not name.startswith("_")],
+        ),
+    ),
+    (
+        ("javascript", "js", "typescript", "ts", "jsx", "tsx"),
+        Language(
+            "javascript",
+            _C_COMMENT,
+            f"{_DOUBLE_QUOTED}|{_SINGLE_QUOTED}|`(?:\\\\.|[^`\\\\])*`",
+            _JS_KEYWORDS
+            + "abstract enum implements interface private protected public type".split(),
+            "Array Boolean console Date Error JSON Map Math Number Object Promise "
+            "RegExp Set String Symbol document window".split(),
+        ),
+    ),
+    (
+        ("bash", "sh", "shell", "zsh", "console"),
+        Language(
+            "bash",
+            r"(?<![\w$])#[^\n]*",
+            f"{_DOUBLE_QUOTED}|'[^']*'",
+            "case do done elif else esac fi for function if in select then until "
+            "while".split(),
+            "alias cd echo eval exec exit export local printf read return set "
+            "shift source test trap unset".split(),
+        ),
+    ),
+    (
+        ("json",),
+        Language("json", None, _DOUBLE_QUOTED, ("true", "false", "null")),
+    ),
+    (
+        ("css",),
+        Language(
+            "css", r"/\*.*?\*/", f"{_DOUBLE_QUOTED}|{_SINGLE_QUOTED}", ("important",)
+        ),
+    ),
+    (
+        ("html", "xml", "svg"),
+        Language(
+            "html",
+            r"<!--.*?-->",
+            f"{_DOUBLE_QUOTED}|{_SINGLE_QUOTED}",
+            tag=r"</?[A-Za-z][\w:-]*|/?>",
+        ),
+    ),
+    (
+        ("c", "h", "cpp", "c++", "java", "cs", "csharp"),
+        Language(
+            "c",
+            _C_COMMENT,
+            f"{_DOUBLE_QUOTED}|{_SINGLE_QUOTED}",
+            _C_KEYWORDS
+            + "bool catch class delete false final namespace new null nullptr "
+            "private protected public template this throw true try using "
+            "virtual".split(),
+        ),
+    ),
+    (
+        ("go", "golang"),
+        Language(
+            "go",
+            _C_COMMENT,
+            f"{_DOUBLE_QUOTED}|`[^`]*`|{_SINGLE_QUOTED}",
+            "break case chan const continue default defer else fallthrough for "
+            "func go goto if import interface map package range return select "
+            "struct switch type var true false nil".split(),
+            "append cap close copy delete len make new panic print println "
+            "recover".split(),
+        ),
+    ),
+    (
+        ("rust", "rs"),
+        Language(
+            "rust",
+            _C_COMMENT,
+            _DOUBLE_QUOTED,
+            "as async await break const continue crate dyn else enum extern false "
+            "fn for if impl in let loop match mod move mut pub ref return self "
+            "Self static struct super trait true type unsafe use where "
+            "while".split(),
+            "Box Option Result Some None Ok Err String Vec println format".split(),
+        ),
+    ),
+]
+
+LANGUAGES = {alias: language for aliases, language in _LANGUAGES for alias in aliases}
+
+highlight_cache = BlockCache(maxsize=4096)
+
+
+def highlight(code, language):
+    # cached tokens of code, or None for unknown languages
+    spec = LANGUAGES.get(language.lower())
+    if spec is None:
+        return None
+    key = (spec.name, hashlib.sha256(code.encode("utf-8")).digest())
+    return highlight_cache.get(key, lambda _: spec.tokenize(code))
@@ -0,0 +1,210 @@
+# Direct markdown -> HTML rendering. Produces the same output as
+# markdown_to_html_node(...).to_html() without building LeafNode/ParentNode
+# objects, for builds that only need the final string.
+from src.nodes import BlockType, TextType
+from src.nodes.htmlnode import escape_attr, escape_text, open_tag
+from src.parsers.block_parser import block_to_block_type
+from src.parsers.converter import (
+    block_to_arena_html,
+    code_block_parts,
+    document_blocks,
+    footnote_ref_props,
+    footnotes_arena_html,
+    heading_parts,
+    heading_props,
+    inline_text_nodes,
+    list_item_texts,
+    markdown_to_arena,
+    markdown_to_html_node,
+    quote_block_text,
+)
+from src.parsers.highlight import TOKEN_PROPS
+
+_INLINE_TAGS = {
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+_TOKEN_TAGS = {kind: open_tag("span", props) for kind, props in TOKEN_PROPS.items()}
+
+_HEADING_TAGS = {level: (f"<h{level}>", f"</h{level}>") for level in range(1, 7)}
+
+
+def text_to_html(text, out, context=None):
+    return parent_text_nodes_to_html(inline_text_nodes(text, context), out)
+
+
+def parent_text_nodes_to_html(text_nodes, out):
+    if not text_nodes:
+        # same error the tree path raises for a ParentNode without children
+        raise ValueError("All parent nodes must have children")
+    return text_nodes_to_html(text_nodes, out)
+
+
+def text_nodes_to_html(text_nodes, out):
+    append = out.append
+    for text_node in text_nodes:
+        text_type = text_node.text_type
+        if text_type == TextType.TEXT:
+            append(escape_text(text_node.text))
+        elif text_type in _INLINE_TAGS:
+            open_html, close_html = _INLINE_TAGS[text_type]
+            append(open_html)
+            append(escape_text(text_node.text))
+            append(close_html)
+        elif text_type == TextType.LINK:
+            if text_node.url is None:
+                raise ValueError("Link TextNode must have a URL")
+            append(f'<a href="{escape_attr(text_node.url)}">')
+            append(escape_text(text_node.text))
+            append("</a>")
+        elif text_type == TextType.IMAGE:
+            if text_node.url is None:
+                raise ValueError("Image TextNode must have a URL")
+            append(
+                f'<img src="{escape_attr(text_node.url)}" '
+                f'alt="{escape_attr(text_node.text)}"></img>'
+            )
+        elif text_type == TextType.FOOTNOTE:
+            number = escape_text(text_node.text)
+            append(open_tag("sup", footnote_ref_props(text_node)))
+            append(f'<a href="#fn-{escape_attr(text_node.text)}">{number}</a></sup>')
+        else:
+            raise ValueError(f"Unsupported TextType: {text_type}")
+    return out
+
+
+def block_to_html(block, block_type, out, context=None):
+    append = out.append
+    if block_type == BlockType.PARAGRAPH:
+        append("<p>")
+        text_to_html(block.replace("\n", " "), out, context)
+        append("</p>")
+
+    elif block_type == BlockType.HEADING:
+        level, heading_text = heading_parts(block)
+        text_nodes = inline_text_nodes(heading_text, context)
+        props = heading_props(level, text_nodes, context)
+        if props:
+            open_html, close_html = open_tag(f"h{level}", props), f"</h{level}>"
+        elif level in _HEADING_TAGS:
+            open_html, close_html = _HEADING_TAGS[level]
+        else:
+            open_html, close_html = f"<h{level}>", f"</h{level}>"
+        append(open_html)
+        parent_text_nodes_to_html(text_nodes, out)
+        append(close_html)
+
+    elif block_type == BlockType.CODE:
+        props, tokens, code_text = code_block_parts(block)
+        append("<pre>")
+        append(open_tag("code", props))
+        if tokens:
+            for kind, text in tokens:
+                if kind:
+                    append(_TOKEN_TAGS[kind])
+                    append(escape_text(text))
+                    append("</span>")
+                else:
+                    append(escape_text(text))
+        else:
+            append(escape_text(code_text))
+        append("</code></pre>")
+
+    elif block_type == BlockType.QUOTE:
+        append("<blockquote>")
+        text_to_html(quote_block_text(block), out, context)
+        append("</blockquote>")
+
+    elif block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        tag = "ul" if block_type == BlockType.UNORDERED_LIST else "ol"
+        item_texts = list_item_texts(block, block_type)
+        if not item_texts:
+            raise ValueError("All parent nodes must have children")
+        append(f"<{tag}>")
+        for item_text in item_texts:
+            append("<li>")
+            text_to_html(item_text, out, context)
+            append("</li>")
+        append(f"</{tag}>")
+
+    else:
+        raise ValueError(f"Unknown block type: {block_type}")
+    return out
+
+
+def render_block_html(block, context=None):
+    return "".join(block_to_html(block, block_to_block_type(block), [], context))
+
+
+def markdown_to_html(markdown, cache=None, context=None):
+    blocks, context = document_blocks(markdown, context)
+    if not blocks:
+        raise ValueError("All parent nodes must have children")
+
+    out = ["<div>"]
+    for block in blocks:
+        if cache is not None:
+            out.append(cache.render(block, render_block_html, context))
+        else:
+            block_to_html(block, block_to_block_type(block), out, context)
+    if context is not None and context.references and context.references.order:
+        footnotes_to_html(out, context)
+    out.append("</div>")
+    return "".join(out)
+
+
+def footnotes_to_html(out, context):
+    append = out.append
+    append('<section class="footnotes"><ol>')
+    for number, text in context.references.used_footnotes():
+        append(f'<li id="fn-{number}">')
+        text_nodes_to_html(inline_text_nodes(text, context), out)
+        append(f'<a href="#fnref-{number}">↩</a></li>')
+    append("</ol></section>")
+    return out
+
+
+def tree_markdown_to_html(markdown, cache=None, context=None):
+    return markdown_to_html_node(markdown, cache, context).to_html()
+
+
+def arena_markdown_to_html(markdown, cache=None, context=None):
+    if cache is None:
+        return markdown_to_arena(markdown, context).to_html()
+    # cached arena blocks are kept as their rendered HTML
+    blocks, context = document_blocks(markdown, context)
+    if not blocks:
+        raise ValueError("All parent nodes must have children")
+    out = ["<div>"]
+    out.extend(cache.render(block, block_to_arena_html, context) for block in blocks)
+    if context is not None and context.references and context.references.order:
+        out.append(footnotes_arena_html(context))
+    out.append("</div>")
+    return "".join(out)
+
+
+# rendering engines selectable per build; "tree" keeps the node tree API,
+# "arena" stores the tree in a NodeArena, "direct" skips the tree entirely.
+# Each engine caches a different kind of value, so don't share one
+# BlockCache between engines.
+ENGINES = {
+    "tree": tree_markdown_to_html,
+    "arena": arena_markdown_to_html,
+    "direct": markdown_to_html,
+}
+
+
+def render_markdown(markdown, engine="tree", cache=None, context=None):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown rendering engine: {engine}")
+    if (
+        engine != "tree"
+        and context is not None
+        and context.plugins is not None
+        and context.plugins.has_hook("html_node")
+    ):
+        # only the tree engine builds HTMLNodes
+        raise ValueError(f"HTML node plugins need the tree engine, not {engine}")
+    return ENGINES[engine](markdown, cache, context)
@@ -0,0 +1,105 @@
+# Plugin hooks run inside the existing conversion passes. A plugin
+# subclasses Plugin and overrides any of:
+#   block(block)                     markdown text of one block
+#   text_nodes(text_nodes)           inline TextNodes of one text run
+#   html_node(node, block_type)      HTMLNode of one block (tree engine)
+#   page(html, url)                  final HTML of one page
+# Hooks that are not overridden are never called. With profile=True every
+# hook call is timed and its allocations traced per plugin.
+import time
+import tracemalloc
+
+HOOKS = ("block", "text_nodes", "html_node", "page")
+
+
+class Plugin:
+    name = None
+
+    def block(self, block):
+        return block
+
+    def text_nodes(self, text_nodes):
+        return text_nodes
+
+    def html_node(self, node, block_type):
+        return node
+
+    def page(self, html, url):
+        return html
+
+
+def plugin_name(plugin):
+    return plugin.name or type(plugin).__name__
+
+
+class PluginStats:
+    __slots__ = ("calls", "seconds", "allocated")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        # bytes allocated at peak during the plugin's hook calls
+        self.allocated = 0
+
+    def __repr__(self):
+        return (
+            f"{self.calls} calls, {self.seconds * 1000:.1f} ms, "
+            f"{self.allocated / 1024:.1f} KiB allocated"
+        )
+
+
+class PluginRunner:
+    def __init__(self, plugins, profile=False):
+        self.plugins = list(plugins)
+        names = [plugin_name(plugin) for plugin in self.plugins]
+        if len(set(names)) != len(names):
+            raise ValueError("Plugin names must be unique")
+        # part of the block cache key: blocks rendered with other plugins
+        # are never reused
+        self.key = tuple(names)
+        self.profile = profile
+        self.stats = {name: PluginStats() for name in names}
+        self.hooks = {
+            hook: [
+                (name, getattr(plugin, hook))
+                for name, plugin in zip(names, self.plugins)
+                if getattr(type(plugin), hook) is not getattr(Plugin, hook)
+            ]
+            for hook in HOOKS
+        }
+
+    def has_hook(self, hook):
+        return bool(self.hooks[hook])
+
+    def run(self, hook, value, *args):
+        for name, method in self.hooks[hook]:
+            if self.profile:
+                value = self._run_profiled(name, method, value, args)
+            else:
+                value = method(value, *args)
+        return value
+
+    def _run_profiled(self, name, method, value, args):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        value = method(value, *args)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+
+        stats = self.stats[name]
+        stats.calls += 1
+        stats.seconds += elapsed
+        stats.allocated += peak - before
+        return value
+
+    def stop(self):
+        if self.profile and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self):
+        # slowest plugin first
+        ranked = sorted(self.stats.items(), key=lambda item: -item[1].seconds)
+        return [f"{name}: {stats!r}" for name, stats in ranked]
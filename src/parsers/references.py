@@ -0,0 +1,124 @@
+# Reference-style links ([text][label], [text][], ![alt][label]) and
+# footnotes ([^label]). Definitions are moved into a References table while
+# the document is split into blocks, so resolving a reference is a dict
+# lookup and needs no extra pass over the document.
+import re
+
+from src.nodes import TextNode, TextType
+
+# [label]: url "title"  /  [^label]: footnote text
+_DEFINITION = re.compile(r"\[(\^?)([^\[\]]+)\]:[ \t]*(.*)")
+_REFERENCE = re.compile(r"(!?)\[([^\[\]]*)\]\[([^\[\]]*)\]|\[\^([^\[\]\s]+)\]")
+
+
+def normalize_label(label):
+    # labels match case-insensitively, with runs of whitespace collapsed
+    return " ".join(label.split()).lower()
+
+
+def link_destination(value):
+    # url of "<url> 'title'" or "url"
+    url = value.split(None, 1)[0] if value else ""
+    if url.startswith("<") and url.endswith(">"):
+        url = url[1:-1]
+    return url
+
+
+class References:
+    __slots__ = ("links", "footnotes", "numbers", "order")
+
+    def __init__(self):
+        self.links = {}
+        self.footnotes = {}
+        # footnote label -> number, numbered by first reference
+        self.numbers = {}
+        self.order = []
+
+    def __bool__(self):
+        return bool(self.links or self.footnotes)
+
+    def collect(self, lines):
+        # the lines of a block that aren't definitions; lines following a
+        # footnote definition continue its text. As in CommonMark,
+        # definitions only start a block: after its first other line, a
+        # line like "[x]: y" is text. The first definition of a label wins.
+        kept = []
+        footnote = None
+        for line in lines:
+            match = None
+            if not kept and line.startswith("["):
+                match = _DEFINITION.fullmatch(line)
+            if match is None or not (match.group(1) or match.group(3)):
+                if footnote is not None:
+                    self.footnotes[footnote] += " " + line
+                else:
+                    kept.append(line)
+                continue
+            caret, label, value = match.groups()
+            label = normalize_label(label)
+            footnote = None
+            if caret:
+                if label not in self.footnotes:
+                    self.footnotes[label] = value
+                    footnote = label
+            else:
+                self.links.setdefault(label, link_destination(value))
+        return kept
+
+    def resolve(self, match):
+        # TextNode for a _REFERENCE match, None for an undefined label
+        footnote = match.group(4)
+        if footnote is not None:
+            label = normalize_label(footnote)
+            if label not in self.footnotes:
+                return None
+            number = self.numbers.get(label)
+            if number is not None:
+                # later references link to the footnote, without an id
+                return TextNode(str(number), TextType.FOOTNOTE)
+            number = self.numbers[label] = len(self.numbers) + 1
+            self.order.append(label)
+            # the url of a footnote reference is its id, for the back link
+            return TextNode(str(number), TextType.FOOTNOTE, f"fnref-{number}")
+
+        bang, text, label = match.groups()[:3]
+        url = self.links.get(normalize_label(label or text))
+        if url is None:
+            return None
+        return TextNode(text, TextType.IMAGE if bang else TextType.LINK, url)
+
+    def used_footnotes(self):
+        # (number, text) of every referenced footnote. Footnotes referenced
+        # from footnote texts are appended while the caller renders them.
+        index = 0
+        while index < len(self.order):
+            label = self.order[index]
+            index += 1
+            yield self.numbers[label], self.footnotes[label]
+
+
+def split_nodes_reference(old_nodes, references):
+    new_nodes = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
+            new_nodes.append(node)
+            continue
+
+        text = node.text
+        position = 0
+        for match in _REFERENCE.finditer(text):
+            resolved = references.resolve(match)
+            if resolved is None:
+                # undefined labels stay plain text
+                continue
+            start = match.start()
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.TEXT))
+            new_nodes.append(resolved)
+            position = match.end()
+        if position == 0:
+            new_nodes.append(node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
+
+    return new_nodes
@@ -1,6 +1,10 @@
 import re
 
 from src.nodes import TextNode, TextType
+from src.parsers.references import split_nodes_reference
+
+_IMAGE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -38,14 +42,12 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = _IMAGE.findall(text)
     return [(alt_text, url) for alt_text, url in matches]
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = _LINK.findall(text)
     return [(anchor_text, url) for anchor_text, url in matches]
 
 
@@ -125,7 +127,7 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
-def text_to_textnodes(text):
+def text_to_textnodes(text, references=None):
     # start with a single TextNode of type TEXT
     nodes = [TextNode(text, TextType.TEXT)] if text else []
 
@@ -135,8 +137,15 @@ def text_to_textnodes(text):
     # then split by links
     nodes = split_nodes_link(nodes)
 
-    # then split by inline formatting: code, bold, italic
+    # then split by inline code, so references inside it stay literal
     nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+
+    # then resolve [text][label] and [^footnote] against the document's
+    # definitions, in the remaining text nodes
+    if references:
+        nodes = split_nodes_reference(nodes, references)
+
+    # then split by inline formatting: bold, italic
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
 
@@ -0,0 +1,59 @@
+# Heading anchors and the table of contents collected while a document is
+# converted (ConversionContext(collect_toc=True)).
+import re
+
+from src.nodes.htmlnode import escape_attr, escape_text
+
+_SLUG_PUNCTUATION = re.compile(r"[^\w\s-]")
+_SLUG_SEPARATORS = re.compile(r"[\s_-]+")
+
+
+def slugify(text):
+    # "Why Tom Bombadil Was a Mistake?" -> "why-tom-bombadil-was-a-mistake"
+    slug = _SLUG_PUNCTUATION.sub("", text.lower())
+    slug = _SLUG_SEPARATORS.sub("-", slug).strip("-")
+    return slug or "section"
+
+
+class SlugSet:
+    # Hands out unique slugs per document: intro, intro-1, intro-2, ...
+    __slots__ = ("used", "counts")
+
+    def __init__(self):
+        self.used = set()
+        self.counts = {}
+
+    def add(self, text):
+        base = slugify(text)
+        slug = base
+        count = self.counts.get(base, 0)
+        while slug in self.used:
+            count += 1
+            slug = f"{base}-{count}"
+        self.counts[base] = count
+        self.used.add(slug)
+        return slug
+
+
+def toc_html(toc):
+    # nested lists from [(level, slug, text), ...]; the shallowest level is
+    # the root list, even when a deeper heading comes first
+    if not toc:
+        return ""
+    out = ['<ul class="toc">']
+    levels = [min(level for level, _, _ in toc)]
+    item_open = False
+    for level, slug, text in toc:
+        while level < levels[-1]:
+            out.append("</li></ul>")
+            levels.pop()
+        if item_open and level > levels[-1]:
+            # nested in the open item
+            out.append("<ul>")
+            levels.append(level)
+        elif item_open:
+            out.append("</li>")
+        out.append(f'<li><a href="#{escape_attr(slug)}">{escape_text(text)}</a>')
+        item_open = True
+    out.append("</li></ul>" * len(levels))
+    return "".join(out)
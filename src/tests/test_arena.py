@@ -0,0 +1,104 @@
+import unittest
+
+from src.nodes import LeafNode, NodeArena, ParentNode
+from src.parsers import markdown_to_arena, markdown_to_html_node
+from src.tests.test_html_renderer import DOCUMENTS
+
+
+class TestNodeArena(unittest.TestCase):
+
+    def test_build_and_render(self):
+        arena = NodeArena()
+        root = arena.add_parent("div", props={"class": "page"})
+        paragraph = arena.add_parent("p", root)
+        arena.add_leaf(None, "Hello ", paragraph)
+        arena.add_leaf("a", "world", paragraph, {"href": "/w?a=1&b=2"})
+        arena.add_leaf("img", "", root, {"src": "/i.png", "alt": "i"})
+        self.assertEqual(
+            arena.to_html(),
+            '<div class="page"><p>Hello <a href="/w?a=1&amp;b=2">world</a></p>'
+            '<img src="/i.png" alt="i"></img></div>',
+        )
+        self.assertEqual(len(arena), 5)
+        self.assertEqual(list(arena.children(root)), [paragraph, 4])
+        self.assertEqual(arena.value(3), "world")
+        self.assertIsNone(arena.value(paragraph))
+        self.assertEqual(arena.buffer, "Hello world")
+
+    def test_tags_stored_once(self):
+        arena = NodeArena()
+        root = arena.add_parent("ul")
+        for text in ("a", "b", "c"):
+            arena.add_leaf("li", text, root)
+        self.assertEqual(arena.tag_names, [None, "ul", "li"])
+        self.assertEqual(list(arena.tags), [1, 2, 2, 2])
+
+    def test_leaf_without_value_raises_error(self):
+        arena = NodeArena()
+        with self.assertRaises(ValueError):
+            arena.add_leaf("b", None)
+
+    def test_parent_without_children_raises_error(self):
+        arena = NodeArena()
+        arena.add_parent("div")
+        with self.assertRaises(ValueError) as context:
+            arena.to_html()
+        self.assertEqual(str(context.exception), "All parent nodes must have children")
+
+    def test_parent_without_tag_raises_error(self):
+        arena = NodeArena()
+        root = arena.add_parent(None)
+        arena.add_leaf("b", "x", root)
+        with self.assertRaises(ValueError) as context:
+            arena.to_html()
+        self.assertEqual(str(context.exception), "All parent nodes must have a tag")
+
+    def test_round_trip_through_nodes(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a "), LeafNode("b", "bold")]),
+                LeafNode("a", "link", {"href": "/x"}),
+            ],
+            props={"id": "main"},
+        )
+        arena = NodeArena.from_node(node)
+        self.assertEqual(arena.to_html(), node.to_html())
+        back = arena.to_node()
+        self.assertIsInstance(back, ParentNode)
+        self.assertEqual(back.to_html(), node.to_html())
+        self.assertEqual(back.props, {"id": "main"})
+
+    def test_deep_round_trip(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("blockquote", [node])
+        arena = NodeArena.from_node(node)
+        self.assertEqual(arena.to_node().to_html(), node.to_html())
+
+    def test_subtree_to_node(self):
+        arena = NodeArena()
+        root = arena.add_parent("div")
+        item = arena.add_parent("li", root)
+        arena.add_leaf(None, "x", item)
+        self.assertEqual(arena.to_node(item).to_html(), "<li>x</li>")
+        self.assertEqual(arena.to_html(item), "<li>x</li>")
+
+
+class TestMarkdownToArena(unittest.TestCase):
+
+    def test_matches_tree_rendering(self):
+        for markdown in DOCUMENTS:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(
+                    markdown_to_arena(markdown).to_html(),
+                    markdown_to_html_node(markdown).to_html(),
+                )
+
+    def test_empty_document_raises_error(self):
+        with self.assertRaises(ValueError):
+            markdown_to_arena("")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.assets import AssetPipeline, fingerprinted_path, rewrite_css_urls
+from src.build.cache import BuildCache
+from src.build.pages import apply_basepath, read_text, write_text
+from src.tests.test_builder import SiteTestCase
+
+
+class TestAssetPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self._tmp.name, "static")
+        self.cache = BuildCache(os.path.join(self._tmp.name, "cache"))
+        write_text(os.path.join(self.static_dir, "index.css"), "body {}")
+        write_text(os.path.join(self.static_dir, "images", "tom.png"), "png")
+        write_text(os.path.join(self.static_dir, "robots.txt"), "User-agent: *")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(
+            fingerprinted_path("/images/tom.png", "3f2a9cdeadbeef"),
+            "/images/tom.3f2a9c.png",
+        )
+
+    def test_scan_builds_manifest(self):
+        manifest = AssetPipeline(self.static_dir, self.cache).scan()
+        self.assertRegex(manifest["/index.css"], r"^/index\.[0-9a-f]{6}\.css$")
+        self.assertRegex(
+            manifest["/images/tom.png"], r"^/images/tom\.[0-9a-f]{6}\.png$"
+        )
+        # files outside the fingerprinted types keep their names
+        self.assertEqual(manifest["/robots.txt"], "/robots.txt")
+
+    def test_hashes_are_cached(self):
+        self.assertEqual(self.run_scan().hashed, 3)
+        self.assertEqual(self.run_scan().hashed, 0)
+
+        path = os.path.join(self.static_dir, "index.css")
+        before = self.run_scan().manifest["/index.css"]
+        write_text(path, "body { color: red }")
+        os.utime(path, ns=(1, 1))
+        pipeline = self.run_scan()
+        self.assertEqual(pipeline.hashed, 1)
+        self.assertNotEqual(pipeline.manifest["/index.css"], before)
+
+    def run_scan(self):
+        pipeline = AssetPipeline(self.static_dir, self.cache)
+        pipeline.scan()
+        return pipeline
+
+    def test_stylesheet_name_follows_referenced_files(self):
+        css_path = os.path.join(self.static_dir, "index.css")
+        write_text(css_path, "body { background: url(images/tom.png) }")
+        before = self.run_scan().manifest["/index.css"]
+        image_path = os.path.join(self.static_dir, "images", "tom.png")
+        write_text(image_path, "new png")
+        os.utime(image_path, ns=(1, 1))
+        pipeline = self.run_scan()
+        self.assertEqual(pipeline.hashed, 1)
+        self.assertNotEqual(pipeline.manifest["/index.css"], before)
+
+    def test_rewrite_css_urls(self):
+        manifest = {
+            "/images/tom.png": "/images/tom.abc123.png",
+            "/base.css": "/base.def456.css",
+        }
+        css = (
+            "@import '/base.css';\n"
+            'a { background: url( "../images/tom.png?v=1" ) }\n'
+            "b { background: url(/images/tom.png) url(data:image/png;base64,x) }\n"
+            "i { background: url(https://example.com/images/tom.png) }"
+        )
+        self.assertEqual(
+            rewrite_css_urls(css, "/css/site.css", manifest),
+            "@import '/base.def456.css';\n"
+            'a { background: url( "../images/tom.abc123.png?v=1" ) }\n'
+            "b { background: url(/images/tom.abc123.png) url(data:image/png;base64,x) }\n"
+            "i { background: url(https://example.com/images/tom.png) }",
+        )
+
+    def test_manifest_json_lists_fingerprinted_files(self):
+        pipeline = self.run_scan()
+        css = pipeline.manifest["/index.css"]
+        manifest = json.loads(pipeline.manifest_json())
+        self.assertEqual(manifest["index.css"], css[1:])
+        self.assertNotIn("robots.txt", manifest)
+
+
+class TestApplyBasepath(unittest.TestCase):
+
+    HTML = (
+        '<link href="/index.css" /><img src="/images/tom.png?v=1" alt="x">'
+        '<a href="/blog/tom/">Tom</a><a href="https://example.com/">x</a>'
+    )
+
+    def test_without_assets(self):
+        self.assertEqual(
+            apply_basepath(self.HTML, "/flatpy"),
+            '<link href="/flatpy/index.css" /><img src="/flatpy/images/tom.png?v=1" '
+            'alt="x"><a href="/flatpy/blog/tom/">Tom</a>'
+            '<a href="https://example.com/">x</a>',
+        )
+
+    def test_with_assets(self):
+        assets = {
+            "/index.css": "/index.abc123.css",
+            "/images/tom.png": "/images/tom.def456.png",
+        }
+        self.assertEqual(
+            apply_basepath(self.HTML, "/flatpy", assets),
+            '<link href="/flatpy/index.abc123.css" />'
+            '<img src="/flatpy/images/tom.def456.png?v=1" alt="x">'
+            '<a href="/flatpy/blog/tom/">Tom</a><a href="https://example.com/">x</a>',
+        )
+
+
+class TestSiteFingerprinting(SiteTestCase):
+
+    def test_build_rewrites_template_and_content_references(self):
+        write_text(self.path("static", "images", "tom.png"), "png")
+        output_dir = self.path("docs")
+        builder = self.make_builder([Target("/site", output_dir)], fingerprint=True)
+        self.build(builder)
+        manifest = builder.assets.manifest
+        tom = read_text(os.path.join(output_dir, "blog", "tom", "index.html"))
+        self.assertIn(f'href="/site{manifest["/index.css"]}"', tom)
+        self.assertIn(f'src="/site{manifest["/images/tom.png"]}"', tom)
+
+    def test_build_rewrites_stylesheet_references(self):
+        write_text(self.path("static", "images", "tom.png"), "png")
+        write_text(
+            self.path("static", "index.css"),
+            "body { background: url(/images/tom.png) }",
+        )
+        output_dir = self.path("docs")
+        builder = self.make_builder([Target("/", output_dir)], fingerprint=True)
+        self.build(builder)
+        manifest = builder.assets.manifest
+        css = read_text(os.path.join(output_dir, manifest["/index.css"][1:]))
+        self.assertEqual(
+            css, f"body {{ background: url({manifest['/images/tom.png']}) }}"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from src.parsers import BlockCache, markdown_to_html_many, render_markdown
+from src.tests.test_html_renderer import DOCUMENTS
+
+
+class TestMarkdownToHTMLMany(unittest.TestCase):
+
+    def test_results_in_order(self):
+        expected = [render_markdown(markdown) for markdown in DOCUMENTS]
+        self.assertEqual(list(markdown_to_html_many(DOCUMENTS)), expected)
+
+    def test_accepts_any_iterable(self):
+        documents = (f"Comment **{i}**" for i in range(5))
+        results = list(markdown_to_html_many(documents, engine="tree"))
+        self.assertEqual(results[3], "<div><p>Comment <b>3</b></p></div>")
+
+    def test_is_lazy(self):
+        results = markdown_to_html_many(iter(["# One", "not **closed"]))
+        self.assertEqual(next(results), "<div><h1>One</h1></div>")
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_shares_cache_across_documents(self):
+        cache = BlockCache()
+        documents = ["Thanks!", "Thanks!", "# Title\n\nThanks!"]
+        list(markdown_to_html_many(documents, cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_worker_pool_matches_serial(self):
+        documents = DOCUMENTS * 5
+        expected = list(markdown_to_html_many(documents))
+        results = list(markdown_to_html_many(documents, workers=2, chunksize=3))
+        self.assertEqual(results, expected)
+
+    def test_invalid_arguments(self):
+        # raised by the call itself, before any document is rendered
+        with self.assertRaises(ValueError):
+            markdown_to_html_many(["x"], engine="fast")
+        with self.assertRaises(ValueError):
+            markdown_to_html_many(["x"], chunksize=0)
+        with self.assertRaises(ValueError):
+            markdown_to_html_many(["x"], cache=BlockCache(), workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+from src.parsers import (
+    BlockCache,
+    ConversionContext,
+    markdown_to_html_node,
+    render_markdown,
+)
+from src.tests.test_html_renderer import DOCUMENTS
+
+
+class TestBlockCache(unittest.TestCase):
+
+    def test_get_renders_once(self):
+        cache = BlockCache()
+        calls = []
+
+        def render(block):
+            calls.append(block)
+            return block.upper()
+
+        self.assertEqual(cache.get("a", render), "A")
+        self.assertEqual(cache.get("a", render), "A")
+        self.assertEqual(calls, ["a"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_bounded_lru(self):
+        cache = BlockCache(maxsize=2)
+        cache.get("a", str.upper)
+        cache.get("b", str.upper)
+        cache.get("a", str.upper)
+        cache.get("c", str.upper)
+        self.assertEqual(len(cache), 2)
+        # "b" was least recently used, so it was evicted
+        cache.get("b", str.upper)
+        self.assertEqual(cache.misses, 4)
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            BlockCache(maxsize=0)
+
+    def test_empty_hit_rate_and_clear(self):
+        cache = BlockCache()
+        self.assertEqual(cache.hit_rate, 0.0)
+        cache.get("a", str.upper)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_edit_rerenders_only_changed_block(self):
+        paragraphs = [f"Paragraph number {i} with **bold**" for i in range(100)]
+        cache = BlockCache()
+        markdown_to_html_node("\n\n".join(paragraphs), cache)
+        self.assertEqual(cache.misses, 100)
+
+        cache.reset_stats()
+        paragraphs[42] = "An edited _paragraph_"
+        node = markdown_to_html_node("\n\n".join(paragraphs), cache)
+        self.assertEqual((cache.hits, cache.misses), (99, 1))
+        self.assertIn("<p>An edited <i>paragraph</i></p>", node.to_html())
+
+    def test_engines_match_uncached_output(self):
+        markdown = "\n\n".join(DOCUMENTS)
+        for engine in ("tree", "arena", "direct"):
+            with self.subTest(engine=engine):
+                cache = BlockCache()
+                expected = render_markdown(markdown, engine)
+                self.assertEqual(render_markdown(markdown, engine, cache), expected)
+                self.assertEqual(render_markdown(markdown, engine, cache), expected)
+                self.assertEqual(cache.hits, cache.misses)
+
+    def test_collected_text_nodes_replayed_on_hit(self):
+        markdown = "# Title\n\nSome **bold** text"
+        for engine in ("tree", "arena", "direct"):
+            with self.subTest(engine=engine):
+                expected = ConversionContext(collect_text=True)
+                render_markdown(markdown, engine, context=expected)
+
+                cache = BlockCache()
+                for _ in range(2):
+                    context = ConversionContext(collect_text=True)
+                    render_markdown(markdown, engine, cache, context)
+                    self.assertEqual(context.text_nodes, expected.text_nodes)
+                self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_collecting_and_plain_entries_kept_apart(self):
+        cache = BlockCache()
+        markdown_to_html_node("Some text", cache)
+        context = ConversionContext(collect_text=True)
+        markdown_to_html_node("Some text", cache, context)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(context.text_nodes), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
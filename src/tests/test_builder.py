@@ -0,0 +1,147 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.build import SiteBuilder, Target, parse_target
+from src.build.pages import NoPagesMatchError, read_text, select_paths, write_text
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" />{{ Content }}'
+
+
+class SiteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.content_dir = self.path("content")
+        self.static_dir = self.path("static")
+        self.template_path = self.path("template.html")
+        write_text(self.template_path, TEMPLATE)
+        write_text(self.path("static", "index.css"), "body {}")
+        write_text(self.path("content", "index.md"), "# Home\n\n[Tom](/blog/tom/) here")
+        write_text(
+            self.path("content", "blog", "tom", "index.md"),
+            "# Tom\n\n![tom](/images/tom.png)",
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def make_builder(self, targets, **kwargs):
+        kwargs.setdefault("cache_dir", self.path("cache"))
+        return SiteBuilder(
+            content_dir=self.content_dir,
+            template_path=self.template_path,
+            static_dir=self.static_dir,
+            targets=targets,
+            **kwargs,
+        )
+
+    def build(self, builder):
+        with redirect_stdout(io.StringIO()):
+            builder.build()
+        return builder
+
+
+class TestSiteBuilder(SiteTestCase):
+
+    def test_build_several_targets_from_one_parse(self):
+        targets = [
+            Target("/flatpy", self.path("prod")),
+            Target("/flatpy-staging", self.path("staging")),
+        ]
+        builder = self.build(self.make_builder(targets))
+
+        prod = read_text(self.path("prod", "index.html"))
+        staging = read_text(self.path("staging", "index.html"))
+        self.assertIn('<link href="/flatpy/index.css" />', prod)
+        self.assertIn('<a href="/flatpy/blog/tom/">Tom</a>', prod)
+        self.assertIn('<link href="/flatpy-staging/index.css" />', staging)
+        self.assertIn('<a href="/flatpy-staging/blog/tom/">Tom</a>', staging)
+        self.assertTrue(os.path.exists(self.path("staging", "index.css")))
+        self.assertTrue(
+            os.path.exists(self.path("staging", "blog", "tom", "index.html"))
+        )
+        # 2 blocks per page, each rendered once for both targets
+        self.assertEqual(builder.cache.misses, 4)
+        self.assertEqual(builder.cache.hits, 0)
+
+    def test_duplicate_output_dirs_raise_error(self):
+        with self.assertRaises(ValueError):
+            self.make_builder([Target("/a", "out"), Target("/b", "out/")])
+
+    def test_default_target(self):
+        builder = SiteBuilder()
+        self.assertEqual(builder.targets, [Target("/", "docs")])
+
+
+class TestPartialBuild(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write_text(self.template_path, "{{ Content }}{{ Listing }}")
+        write_text(self.path("content", "blog", "index.md"), "# Blog")
+        write_text(self.path("content", "blog", "sam", "index.md"), "# Sam")
+        self.targets = [Target("/", self.path("docs"))]
+        self.build(self.make_builder(self.targets))
+        # marks outputs a partial build must leave alone
+        write_text(self.output("blog", "sam"), "stale")
+
+    def output(self, *parts):
+        return self.path("docs", *parts, "index.html")
+
+    def build_only(self, *patterns):
+        with redirect_stdout(io.StringIO()):
+            self.make_builder(self.targets).build(list(patterns))
+
+    def test_only_selected_pages_rebuilt(self):
+        write_text(self.path("content", "blog", "tom", "index.md"), "# Tom\n\nv2")
+        self.build_only(os.path.join(self.content_dir, "blog", "tom", "**"))
+        self.assertIn("v2", read_text(self.output("blog", "tom")))
+        self.assertEqual(read_text(self.output("blog", "sam")), "stale")
+        self.assertTrue(os.path.exists(self.path("docs", "index.css")))
+        self.assertIn("/blog/sam/", read_text(self.path("docs", "sitemap.xml")))
+
+    def test_section_listing_rebuilt_with_page(self):
+        write_text(self.path("content", "blog", "tom", "index.md"), "# Tom Renamed")
+        self.build_only(os.path.join(self.content_dir, "blog", "tom", "index.md"))
+        self.assertIn("Tom Renamed", read_text(self.output("blog")))
+        self.assertEqual(read_text(self.output("blog", "sam")), "stale")
+
+
+class TestSelectPaths(unittest.TestCase):
+
+    def test_select_paths(self):
+        paths = ["content/index.md", "content/blog/tom/index.md", "content/blog/x.md"]
+        self.assertEqual(
+            select_paths(paths, ["content/blog/tom/**"]), ["content/blog/tom/index.md"]
+        )
+        self.assertEqual(select_paths(paths, ["content/blog/"]), paths[1:])
+        self.assertEqual(select_paths(paths, ["./content/index.md"]), paths[:1])
+        self.assertEqual(select_paths(paths, ["content/*.md"]), paths)
+        with self.assertRaises(NoPagesMatchError):
+            select_paths(paths, ["content/missing.md"])
+
+
+class TestParseTarget(unittest.TestCase):
+
+    def test_parse_target(self):
+        self.assertEqual(
+            parse_target("/flatpy-staging=docs-staging"),
+            Target("/flatpy-staging", "docs-staging"),
+        )
+
+    def test_invalid_target(self):
+        for spec in ("/flatpy", "=docs", "/flatpy="):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_target(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
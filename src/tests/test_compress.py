@@ -0,0 +1,87 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.build.cache import BuildCache
+from src.build.compress import compress_outputs, gzip_bytes
+from src.build.pages import write_text
+
+BIG_HTML = "<p>" + "Tolkien " * 500 + "</p>"
+
+
+class TestCompressOutputs(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self._tmp.name, "docs")
+        self.cache = BuildCache(os.path.join(self._tmp.name, "cache"))
+        write_text(self.path("index.html"), BIG_HTML)
+        write_text(self.path("blog", "index.html"), BIG_HTML + "blog")
+        write_text(self.path("small.css"), "body {}")
+        write_text(self.path("notes.txt"), BIG_HTML)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.output_dir, *parts)
+
+    def test_gzip_bytes_is_deterministic(self):
+        self.assertEqual(gzip_bytes(b"abc"), gzip_bytes(b"abc"))
+        self.assertEqual(gzip.decompress(gzip_bytes(b"abc", 1)), b"abc")
+
+    def test_compresses_eligible_outputs(self):
+        stats = compress_outputs(self.output_dir, self.cache, workers=2)
+        self.assertEqual(stats["compressed"], 2)
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), BIG_HTML)
+        self.assertTrue(os.path.exists(self.path("blog", "index.html.gz")))
+        # below the size threshold, or not a compressed type
+        self.assertFalse(os.path.exists(self.path("small.css.gz")))
+        self.assertFalse(os.path.exists(self.path("notes.txt.gz")))
+
+    def test_unchanged_outputs_keep_previous_gzip(self):
+        compress_outputs(self.output_dir, self.cache)
+        mtime = os.stat(self.path("index.html.gz")).st_mtime_ns
+        stats = compress_outputs(self.output_dir, self.cache)
+        self.assertEqual((stats["kept"], stats["compressed"]), (2, 0))
+        self.assertEqual(os.stat(self.path("index.html.gz")).st_mtime_ns, mtime)
+
+        write_text(self.path("index.html"), BIG_HTML + "changed")
+        stats = compress_outputs(self.output_dir, self.cache)
+        self.assertEqual((stats["kept"], stats["compressed"]), (1, 1))
+
+    def test_recreated_outputs_reuse_cached_gzip(self):
+        compress_outputs(self.output_dir, self.cache)
+        os.remove(self.path("index.html.gz"))
+        stats = compress_outputs(self.output_dir, self.cache)
+        self.assertEqual((stats["cached"], stats["kept"]), (1, 1))
+        self.assertTrue(os.path.exists(self.path("index.html.gz")))
+
+    def test_level_change_recompresses(self):
+        compress_outputs(self.output_dir, self.cache, level=9)
+        stats = compress_outputs(self.output_dir, self.cache, level=1)
+        self.assertEqual(stats["compressed"], 2)
+
+    def test_stale_gzip_removed(self):
+        compress_outputs(self.output_dir, self.cache)
+        os.remove(self.path("blog", "index.html"))
+        stats = compress_outputs(self.output_dir, self.cache)
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(self.path("blog", "index.html.gz")))
+
+    def test_other_gzip_files_kept(self):
+        write_text(self.path("files", "archive.tar.gz"), "not ours")
+        compress_outputs(self.output_dir, self.cache)
+        stats = compress_outputs(self.output_dir, self.cache)
+        self.assertEqual(stats["removed"], 0)
+        self.assertTrue(os.path.exists(self.path("files", "archive.tar.gz")))
+
+    def test_invalid_level(self):
+        with self.assertRaises(ValueError):
+            compress_outputs(self.output_dir, self.cache, level=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
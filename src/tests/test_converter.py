@@ -202,6 +202,32 @@ code block here
         )
         self.assertEqual(html, expected)
 
+    def test_codeblock_escaped_once(self):
+        md = """
+```
+if a < b && c > d:
+    print("&amp;")
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><pre><code>if a &lt; b &amp;&amp; c &gt; d:\nprint("&amp;amp;")\n</code></pre></div>',
+        )
+
+    def test_link_and_image_escaped(self):
+        md = '[< Back](/search?q=a&b=c) and ![a "quoted" alt](/img.png)'
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><p><a href="/search?q=a&amp;b=c">&lt; Back</a> and '
+            '<img src="/img.png" alt="a &quot;quoted&quot; alt"></img></p></div>',
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import shutil
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from src.build import Target
+from src.build.deploy import MANIFEST_NAME, diff_manifests, load_manifest
+from src.build.output import DirectoryOutput
+from src.build.pages import write_text
+from src.main import main
+from src.tests.test_builder import SiteTestCase
+
+OLD_MTIME = 1_000_000_000
+
+
+class TestDirectoryOutput(SiteTestCase):
+
+    def test_unchanged_files_not_rewritten(self):
+        output = DirectoryOutput(self.path("out"))
+        self.assertTrue(output.write_text(os.path.join("a", "b.html"), "same"))
+        path = self.path("out", "a", "b.html")
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+        self.assertFalse(output.write_text(os.path.join("a", "b.html"), "same"))
+        self.assertEqual(os.stat(path).st_mtime, OLD_MTIME)
+        self.assertTrue(output.write_text(os.path.join("a", "b.html"), "new"))
+        self.assertEqual((output.written, output.unchanged), ({"a/b.html"}, 1))
+
+
+class TestDeployManifest(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.targets = [Target("/", self.path("docs"))]
+
+    def build_site(self, *patterns):
+        builder = self.make_builder(self.targets)
+        with redirect_stdout(io.StringIO()):
+            builder.build(list(patterns) if patterns else None)
+
+    def mtimes(self):
+        mtimes = {}
+        for dir_path, _, file_names in os.walk(self.path("docs")):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                os.utime(path, (OLD_MTIME, OLD_MTIME))
+                mtimes[path] = OLD_MTIME
+        return mtimes
+
+    def current_mtimes(self, paths):
+        return {path: os.stat(path).st_mtime for path in paths}
+
+    def test_rebuild_keeps_unchanged_outputs(self):
+        self.build_site()
+        before = self.mtimes()
+        self.build_site()
+        self.assertEqual(self.current_mtimes(before), before)
+
+    def test_manifest_and_diff(self):
+        self.build_site()
+        old = load_manifest(self.path("docs"))
+        self.assertIn("index.html", old)
+        self.assertIn("index.css", old)
+        self.assertNotIn(MANIFEST_NAME, old)
+        shutil.copy(self.path("docs", MANIFEST_NAME), self.path("old.json"))
+
+        write_text(self.path("content", "index.md"), "# Home v2")
+        write_text(self.path("content", "about.md"), "# About")
+        shutil.rmtree(self.path("content", "blog"))
+        self.build_site()
+        new = load_manifest(self.path("docs"))
+        added, changed, removed = diff_manifests(old, new)
+        self.assertIn("about.html", added)
+        self.assertIn("index.html", changed)
+        self.assertNotIn("index.css", changed)
+        self.assertIn("blog/tom/index.html", removed)
+        # stale outputs are removed without wiping the output directory
+        self.assertFalse(os.path.exists(self.path("docs", "blog")))
+
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            main(["diff", self.path("old.json"), self.path("docs")])
+        self.assertIn("A about.html\n", out.getvalue())
+        self.assertIn("M index.html\n", out.getvalue())
+        self.assertIn("D blog/tom/index.html\n", out.getvalue())
+
+    def test_stale_outputs_removed_without_cache_state(self):
+        self.build_site()
+        # a fresh checkout of the output directory, without the build cache
+        shutil.rmtree(self.path("cache"))
+        shutil.rmtree(self.path("content", "blog"))
+        self.build_site()
+        self.assertFalse(os.path.exists(self.path("docs", "blog")))
+        self.assertTrue(os.path.exists(self.path("docs", "index.html")))
+        self.assertTrue(os.path.exists(self.path("docs", "sitemap.xml")))
+
+    def test_partial_build_keeps_other_outputs(self):
+        self.build_site()
+        self.build_site(os.path.join(self.content_dir, "index.md"))
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "tom", "index.html")))
+        self.build_site()
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "tom", "index.html")))
+        with open(self.path("docs", MANIFEST_NAME), encoding="utf-8") as f:
+            self.assertIn("blog/tom/index.html", json.load(f)["files"])
+
+
+if __name__ == "__main__":
+    unittest.main()
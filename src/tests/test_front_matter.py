@@ -0,0 +1,31 @@
+import unittest
+
+from src.parsers import split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+
+    def test_split_front_matter(self):
+        markdown = '---\ntitle: "Tom: a mistake"\n# a comment\ntemplate: blog.html\n---\n\n# Tom'
+        self.assertEqual(
+            split_front_matter(markdown),
+            ({"title": "Tom: a mistake", "template": "blog.html"}, "# Tom"),
+        )
+
+    def test_without_front_matter(self):
+        for markdown in ("# Tom\n---\n", "---\ntitle: unclosed\n\n# Tom", ""):
+            with self.subTest(markdown=markdown):
+                self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_front_matter_only(self):
+        self.assertEqual(
+            split_front_matter("---\nlayout: x\n---"), ({"layout": "x"}, "")
+        )
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n# Tom")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from src.parsers import render_markdown
+from src.parsers.converter import code_block_language
+from src.parsers.highlight import LANGUAGES, highlight, highlight_cache
+
+PYTHON = "```python\ndef f(x):\n    # add <one>\n    return len('a') + 1\n```"
+
+
+class TestHighlight(unittest.TestCase):
+
+    def test_python_tokens(self):
+        self.assertEqual(
+            highlight("if x: print('a')  # hi\n", "python"),
+            (
+                ("keyword", "if"),
+                (None, " x: "),
+                ("builtin", "print"),
+                (None, "("),
+                ("string", "'a'"),
+                (None, ")  "),
+                ("comment", "# hi"),
+                (None, "\n"),
+            ),
+        )
+
+    def test_strings_hide_comments_and_keywords(self):
+        tokens = highlight('const s = "// not a comment if";', "js")
+        self.assertIn(("string", '"// not a comment if"'), tokens)
+        self.assertNotIn("comment", [kind for kind, _ in tokens])
+
+    def test_aliases(self):
+        self.assertIs(LANGUAGES["py"], LANGUAGES["python"])
+        self.assertIs(LANGUAGES["sh"], LANGUAGES["bash"])
+        self.assertIsNone(highlight("x", "brainfuck"))
+
+    def test_tokens_cover_code(self):
+        code = 'x = {"a": [1, 2.5e3, true, null]} /* done */'
+        for language in ("json", "javascript", "css", "c", "go", "rust", "html"):
+            with self.subTest(language=language):
+                tokens = highlight(code, language)
+                self.assertEqual("".join(text for _, text in tokens), code)
+
+    def test_repeated_snippets_tokenized_once(self):
+        code = "let unique_snippet_for_cache_test = 1;"
+        highlight(code, "js")
+        hits = highlight_cache.hits
+        self.assertIs(highlight(code, "javascript"), highlight(code, "js"))
+        self.assertEqual(highlight_cache.hits, hits + 2)
+
+    def test_fence_language(self):
+        self.assertEqual(code_block_language("```Python\nx\n```"), "python")
+        self.assertEqual(code_block_language("``` c++\nx\n```"), "c++")
+        self.assertEqual(code_block_language("```\nx\n```"), "")
+
+
+class TestHighlightedCodeBlocks(unittest.TestCase):
+
+    def test_engines_render_highlighted_code(self):
+        # (block splitting strips the indentation of code lines)
+        expected = (
+            '<div><pre><code class="language-python">'
+            '<span class="hl-keyword">def</span> f(x):\n'
+            '<span class="hl-comment"># add &lt;one&gt;</span>\n'
+            '<span class="hl-keyword">return</span> '
+            '<span class="hl-builtin">len</span>(<span class="hl-string">'
+            "'a'</span>) + "
+            '<span class="hl-number">1</span>\n</code></pre></div>'
+        )
+        for engine in ("tree", "arena", "direct"):
+            with self.subTest(engine=engine):
+                self.assertEqual(render_markdown(PYTHON, engine), expected)
+
+    def test_unknown_and_missing_language(self):
+        for engine in ("tree", "arena", "direct"):
+            with self.subTest(engine=engine):
+                self.assertEqual(
+                    render_markdown("```cobol\nMOVE A\n```", engine),
+                    '<div><pre><code class="language-cobol">MOVE A\n</code></pre></div>',
+                )
+                self.assertEqual(
+                    render_markdown("```\nx < 1\n```", engine),
+                    "<div><pre><code>x &lt; 1\n</code></pre></div>",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
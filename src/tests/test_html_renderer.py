@@ -0,0 +1,73 @@
+import unittest
+
+from src.nodes import BlockType
+from src.parsers import (
+    block_to_html,
+    markdown_to_html,
+    markdown_to_html_node,
+    render_markdown,
+)
+
+DOCUMENTS = [
+    "# Heading\n\nThis is **bold** and _italic_ with `code`.",
+    "Paragraph line 1\nline 2 with [a link](/blog/?a=1&b=2)",
+    '![Alt "text"](/images/a.png) after an image',
+    "```\nif a < b:\n    return **a**\n```",
+    "```\n```",
+    "> quote line\n> with **bold**",
+    "- one\n- two with _italic_\n- three",
+    "1. first\n2. second\n3. third",
+    "###### Deep heading\n\n## Second <heading>",
+    '[< Back Home](/)\n\n# Title\n\n> "Quoted" & escaped',
+]
+
+
+class TestMarkdownToHTML(unittest.TestCase):
+
+    def test_matches_tree_rendering(self):
+        for markdown in DOCUMENTS:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(
+                    markdown_to_html(markdown),
+                    markdown_to_html_node(markdown).to_html(),
+                )
+
+    def test_block_to_html_appends_fragments(self):
+        out = ["<div>"]
+        block_to_html("- item", BlockType.UNORDERED_LIST, out)
+        self.assertEqual("".join(out), "<div><ul><li>item</li></ul>")
+
+    def test_empty_document_raises_like_tree(self):
+        with self.assertRaises(ValueError) as context:
+            markdown_to_html("")
+        self.assertEqual(str(context.exception), "All parent nodes must have children")
+
+    def test_unclosed_delimiter_raises_like_tree(self):
+        with self.assertRaises(ValueError):
+            markdown_to_html("This is **broken")
+
+    def test_unknown_block_type_raises_error(self):
+        with self.assertRaises(ValueError):
+            block_to_html("text", "not a block type", [])
+
+
+class TestRenderMarkdown(unittest.TestCase):
+
+    def test_engines_produce_identical_output(self):
+        markdown = "\n\n".join(DOCUMENTS)
+        self.assertEqual(
+            render_markdown(markdown, engine="direct"),
+            render_markdown(markdown, engine="tree"),
+        )
+
+    def test_default_engine_is_tree(self):
+        self.assertEqual(render_markdown("# Hi"), "<div><h1>Hi</h1></div>")
+
+    def test_unknown_engine_raises_error(self):
+        with self.assertRaises(ValueError) as context:
+            render_markdown("# Hi", engine="fast")
+        self.assertEqual(str(context.exception), "Unknown rendering engine: fast")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import sys
 import unittest
 
 from src.nodes import HTMLNode, LeafNode, ParentNode
@@ -23,6 +24,47 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode()
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode(tag="img", props={"src": "/a?x=1&y=2", "alt": 'say "hi" <now>'})
+        self.assertEqual(
+            node.props_to_html(),
+            ' src="/a?x=1&amp;y=2" alt="say &quot;hi&quot; &lt;now&gt;"',
+        )
+
+    def test_props_to_html_non_string_value(self):
+        node = HTMLNode(tag="img", props={"width": 100})
+        self.assertEqual(node.props_to_html(), ' width="100"')
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (
+            HTMLNode(),
+            LeafNode("b", "x"),
+            ParentNode("p", [LeafNode("b", "x")]),
+        ):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_missing_children_and_props_are_shared(self):
+        first = LeafNode("b", "one")
+        second = LeafNode("i", "two")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+        self.assertEqual(first.props, {})
+        with self.assertRaises(TypeError):
+            first.props["href"] = "/"
+
+    def test_explicit_empty_props_stay_mutable(self):
+        props = {}
+        node = LeafNode("a", "link", props)
+        node.props["href"] = "/"
+        self.assertIs(node.props, props)
+        self.assertEqual(node.to_html(), '<a href="/">link</a>')
+
+    def test_tags_are_interned(self):
+        level = 2
+        first = ParentNode(f"h{level}", [LeafNode(None, "a")])
+        second = ParentNode("".join(["h", str(level)]), [LeafNode(None, "b")])
+        self.assertIs(first.tag, second.tag)
+
 
 class TestLeafNode(unittest.TestCase):
 
@@ -34,6 +76,14 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("a", "Click me!", {"href": "https://example.com"})
         self.assertEqual(node.to_html(), '<a href="https://example.com">Click me!</a>')
 
+    def test_leaf_to_html_escapes_value(self):
+        node = LeafNode("b", 'a < b && "c" > d')
+        self.assertEqual(node.to_html(), '<b>a &lt; b &amp;&amp; "c" &gt; d</b>')
+
+    def test_leaf_to_html_escapes_raw_text(self):
+        node = LeafNode(None, "<script>")
+        self.assertEqual(node.to_html(), "&lt;script&gt;")
+
 
 class TestParentNode(unittest.TestCase):
 
@@ -67,6 +117,49 @@ class TestParentNode(unittest.TestCase):
             parent_node.to_html()
         self.assertEqual(str(context.exception), "All parent nodes must have a tag")
 
+    def test_to_html_deeply_nested(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("blockquote", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<blockquote>" * depth + "<b>deep</b>"))
+        self.assertTrue(html.endswith("</blockquote>" * depth))
+
+    def test_to_html_matches_recursive_rendering(self):
+        def recursive_html(node):
+            if isinstance(node, LeafNode):
+                if not node.tag:
+                    return node.value
+                return f"<{node.tag}{node.props_to_html()}>{node.value}</{node.tag}>"
+            inner = "".join(recursive_html(child) for child in node.children)
+            return f"<{node.tag}{node.props_to_html()}>{inner}</{node.tag}>"
+
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")]),
+                ParentNode(
+                    "ul",
+                    [
+                        ParentNode("li", [LeafNode("a", "x", {"href": "/a"})]),
+                        ParentNode(
+                            "li", [LeafNode("img", "", {"src": "/i", "alt": "y"})]
+                        ),
+                    ],
+                    props={"class": "list"},
+                ),
+            ],
+        )
+        self.assertEqual(node.to_html(), recursive_html(node))
+
+    def test_nested_leaf_without_value_raises_error(self):
+        leaf = LeafNode("b", "x")
+        leaf.value = None
+        with self.assertRaises(ValueError) as context:
+            ParentNode("p", [leaf]).to_html()
+        self.assertEqual(str(context.exception), "All leaf nodes must have a value")
+
     def test_parent_init_no_children_raises_error(self):
         with self.assertRaises(ValueError) as context:
             ParentNode("div", [])
@@ -0,0 +1,92 @@
+import unittest
+
+from src.build import Target
+from src.build.links import BrokenLinksError, LinkChecker, resolve_link
+from src.build.pages import write_text
+from src.nodes.textnode import TextType
+from src.parsers import ConversionContext, render_markdown
+from src.tests.test_builder import SiteTestCase
+
+
+class TestResolveLink(unittest.TestCase):
+
+    def test_internal_links(self):
+        self.assertEqual(resolve_link("/blog/tom/", "/"), "/blog/tom/")
+        self.assertEqual(resolve_link("/blog/tom/#top", "/"), "/blog/tom/")
+        self.assertEqual(resolve_link("/images/a%20b.png", "/"), "/images/a b.png")
+        self.assertEqual(resolve_link("../tom/", "/blog/majesty/"), "/blog/tom/")
+        self.assertEqual(resolve_link("tom.png", "/about.html"), "/tom.png")
+
+    def test_external_links_ignored(self):
+        for url in (
+            "https://www.boot.dev",
+            "//cdn.example.com/a.js",
+            "mailto:a@b.c",
+            "#top",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(resolve_link(url, "/"))
+
+
+class TestLinkChecker(unittest.TestCase):
+
+    def test_broken_references(self):
+        checker = LinkChecker()
+        checker.add_output("/")
+        checker.add_output("/blog/tom/")
+        links = [
+            (TextType.LINK, "/blog/tom"),
+            (TextType.LINK, "/blog/tom/index.html"),
+            (TextType.LINK, "/index.html"),
+            (TextType.LINK, "/blog/typo"),
+            (TextType.IMAGE, "/images/missing.png"),
+        ]
+        checker.add_page("content/index.md", "/", links)
+        self.assertEqual(
+            checker.broken(),
+            [
+                ("content/index.md", TextType.LINK, "/blog/typo"),
+                ("content/index.md", TextType.IMAGE, "/images/missing.png"),
+            ],
+        )
+
+    def test_links_collected_by_every_engine(self):
+        markdown = "[a](/a) and ![b](/b.png)\n\n- [c](https://c.dev)"
+        for engine in ("tree", "arena", "direct"):
+            with self.subTest(engine=engine):
+                context = ConversionContext(collect_links=True)
+                render_markdown(markdown, engine, context=context)
+                self.assertEqual(
+                    context.links,
+                    [
+                        (TextType.LINK, "/a"),
+                        (TextType.IMAGE, "/b.png"),
+                        (TextType.LINK, "https://c.dev"),
+                    ],
+                )
+
+
+class TestBuilderLinks(SiteTestCase):
+
+    def test_broken_image_reported(self):
+        builder = self.make_builder([Target("/", self.path("docs"))])
+        self.build(builder)
+        broken = builder.link_checker.broken()
+        self.assertEqual([url for _, _, url in broken], ["/images/tom.png"])
+
+    def test_fail_on_broken_links(self):
+        builder = self.make_builder(
+            [Target("/", self.path("docs"))], fail_on_broken_links=True
+        )
+        with self.assertRaises(BrokenLinksError):
+            self.build(builder)
+
+        write_text(self.path("static", "images", "tom.png"), "png")
+        builder = self.make_builder(
+            [Target("/", self.path("docs"))], fail_on_broken_links=True
+        )
+        self.build(builder)
+
+
+if __name__ == "__main__":
+    unittest.main()
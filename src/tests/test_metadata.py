@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from src.build.metadata import parse_metadata, read_metadata, summary_text
+
+POST = """---
+date: 2024-02-01
+---
+[< Back Home](/)
+
+![Tom](/images/tom.png)
+
+# Why Tom Bombadil Was a Mistake
+
+In the **vast** weave of [the legendarium](/), there is Tom.
+
+More text.
+"""
+
+
+class TestMetadata(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, data):
+        path = os.path.join(self._tmp.name, "post.md")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_read_metadata(self):
+        self.assertEqual(
+            read_metadata(self.write(POST.encode("utf-8"))),
+            {
+                "date": "2024-02-01",
+                "title": "Why Tom Bombadil Was a Mistake",
+                "summary": "In the vast weave of the legendarium, there is Tom.",
+            },
+        )
+
+    def test_stops_reading_early(self):
+        # the tail is not even valid UTF-8; it must never be decoded
+        filler = b"More text.\n" * 100
+        path = self.write(POST.encode("utf-8") + filler + b"\xff" * 1000000)
+        metadata = read_metadata(path, chunk_size=64)
+        self.assertEqual(metadata["title"], "Why Tom Bombadil Was a Mistake")
+
+    def test_needs_more_text(self):
+        self.assertIsNone(parse_metadata("---\ndate: 2024", False))
+        self.assertIsNone(parse_metadata("# Tom", False))
+        self.assertIsNone(parse_metadata("# Tom\n\nFirst para", False))
+        self.assertEqual(
+            parse_metadata("# Tom\n\nFirst para\n\n", False), ({}, "Tom", "First para")
+        )
+        self.assertEqual(parse_metadata("# Tom", True), ({}, "Tom", ""))
+
+    def test_front_matter_title_and_summary(self):
+        front_matter = b"---\ntitle: Tom\nsummary: Short\n---\n"
+        path = self.write(front_matter + b"Body\n" * 10 + b"\xff" * 10)
+        metadata = read_metadata(path, chunk_size=8)
+        self.assertEqual((metadata["title"], metadata["summary"]), ("Tom", "Short"))
+
+    def test_missing_title(self):
+        with self.assertRaises(Exception):
+            read_metadata(self.write(b"No heading\n\nat all"))
+
+    def test_summary_text(self):
+        self.assertEqual(summary_text("[< Back Home](/)"), "")
+        summary = summary_text("word " * 100)
+        self.assertLessEqual(len(summary), 200)
+        self.assertTrue(summary.endswith("word…"))
+
+
+if __name__ == "__main__":
+    unittest.main()
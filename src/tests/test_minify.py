@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.cache import BuildCache
+from src.build.minify import HTMLMinifier, minify_cached, minify_css, minify_html
+from src.build.pages import read_text
+from src.tests.test_builder import SiteTestCase
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <!-- layout > -->
+  <body>
+    <p>Frodo   and
+      Sam</p>
+    <pre><code>def f():
+    return  1
+</code></pre>
+    <b>one</b> <i>two</i>
+  </body>
+</html>
+"""
+
+MINIFIED = (
+    "<!DOCTYPE html><html><body><p>Frodo and Sam</p>"
+    "<pre><code>def f():\n    return  1\n</code></pre>"
+    "<b>one</b> <i>two</i></body></html>"
+)
+
+
+class TestMinifyHTML(unittest.TestCase):
+
+    def test_minify_html(self):
+        self.assertEqual(minify_html(PAGE), MINIFIED)
+
+    def test_chunk_boundaries(self):
+        # tags, whitespace runs and <pre> split across chunks
+        for size in (1, 2, 3, 7, 16):
+            with self.subTest(size=size):
+                self.assertEqual(minify_html(PAGE, chunk_size=size), MINIFIED)
+
+    def test_feed_returns_finished_output(self):
+        minifier = HTMLMinifier()
+        self.assertEqual(minifier.feed("<p>a  "), "<p>")
+        self.assertEqual(minifier.feed(" b</p>\n<p"), "a b</p>")
+        self.assertEqual(minifier.close(), "<p")
+
+    def test_inline_elements_split_across_lines(self):
+        html = "<blockquote><b>a</b>\n<b>b</b>\n  <i>c</i></blockquote>\n<p>d</p>"
+        self.assertEqual(
+            minify_html(html),
+            "<blockquote><b>a</b> <b>b</b> <i>c</i></blockquote><p>d</p>",
+        )
+        for size in (1, 2, 5):
+            self.assertEqual(minify_html(html, size), minify_html(html))
+
+    def test_less_than_in_script(self):
+        html = (
+            "<SCRIPT>if (a < b && c <d) { f(); }</Script>\n"
+            "  <p>after   the  script</p>"
+        )
+        expected = "<SCRIPT>if (a < b && c <d) { f(); }</Script><p>after the script</p>"
+        for size in (1, 2, 3, 7, 16, 65536):
+            with self.subTest(size=size):
+                self.assertEqual(minify_html(html, size), expected)
+
+    def test_raw_elements_kept(self):
+        html = "<script>\n  var a  =  1;\n</script>\n<textarea> x  y </textarea>"
+        self.assertEqual(
+            minify_html(html),
+            "<script>\n  var a  =  1;\n</script><textarea> x  y </textarea>",
+        )
+
+
+class TestMinifyCSS(unittest.TestCase):
+
+    def test_minify_css(self):
+        css = "/* theme */\nh1, h2 {\n  color: #fff;\n  margin : 0 ;\n}\na > b { }\n"
+        self.assertEqual(minify_css(css), "h1,h2{color:#fff;margin :0}a>b{}")
+
+    def test_css_strings_and_descendant_pseudo_classes_kept(self):
+        self.assertEqual(
+            minify_css('a :hover { content: " a > b " }'), 'a :hover{content:" a > b "}'
+        )
+        self.assertEqual(
+            minify_css("a::after{content:'/* x */';}"), "a::after{content:'/* x */'}"
+        )
+
+    def test_results_cached_by_input_hash(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = BuildCache(root)
+            self.assertEqual(minify_cached(PAGE, ".html", cache), MINIFIED)
+            blobs = [
+                files for _, _, files in os.walk(os.path.join(root, "store", "minify"))
+            ]
+            self.assertEqual(sum(map(len, blobs)), 1)
+            key = next(name for files in blobs for name in files)
+            cache.write_blob("minify", key, b"cached")
+            self.assertEqual(minify_cached(PAGE, ".html", cache), "cached")
+
+
+class TestBuilderMinify(SiteTestCase):
+
+    def test_build_minifies_pages_and_css(self):
+        self.build(self.make_builder([Target("/", self.path("docs"))], minify=True))
+        self.assertEqual(read_text(self.path("docs", "index.css")), "body{}")
+        html = read_text(self.path("docs", "index.html"))
+        self.assertNotIn("\n", html)
+        self.assertIn("<h1>Home</h1>", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.cache import BuildCache
+from src.build.navigation import Navigation, parent_url, scan_pages
+from src.build.pages import read_text, write_text
+from src.tests.test_builder import SiteTestCase
+
+PAGES = [
+    ("content/index.md", "/", "Home", "", ""),
+    ("content/blog/index.md", "/blog/", "Blog", "", ""),
+    ("content/blog/tom/index.md", "/blog/tom/", "Tom", "2024-02-01", ""),
+    (
+        "content/blog/glorfindel/index.md",
+        "/blog/glorfindel/",
+        "Glorfindel",
+        "2024-03-01",
+        "",
+    ),
+    (
+        "content/blog/majesty/index.md",
+        "/blog/majesty/",
+        "Majesty & more",
+        "2024-01-01",
+        "On <LOTR>",
+    ),
+    ("content/docs/intro.md", "/docs/intro.html", "Intro", "", ""),
+    ("content/contact/index.md", "/contact/", "Contact", "", ""),
+]
+
+
+class TestNavigation(unittest.TestCase):
+
+    def setUp(self):
+        self.navigation = Navigation(PAGES, per_page=2)
+
+    def test_parent_url(self):
+        self.assertEqual(parent_url("/blog/tom/"), "/blog/")
+        self.assertEqual(parent_url("/blog/post.html"), "/blog/")
+        self.assertEqual(parent_url("/blog/"), "/")
+        self.assertIsNone(parent_url("/"))
+
+    def test_menu_links_top_level_pages(self):
+        self.assertEqual(
+            self.navigation.menu,
+            '<ul class="menu"><li><a href="/blog/">Blog</a></li>'
+            '<li><a href="/contact/">Contact</a></li></ul>',
+        )
+
+    def test_breadcrumbs(self):
+        self.assertEqual(
+            self.navigation.breadcrumbs("/blog/tom/"),
+            '<ol class="breadcrumbs"><li><a href="/">Home</a></li>'
+            '<li><a href="/blog/">Blog</a></li><li>Tom</li></ol>',
+        )
+        # content/docs/ has no index page to link to
+        self.assertEqual(
+            self.navigation.breadcrumbs("/docs/intro.html"),
+            '<ol class="breadcrumbs"><li><a href="/">Home</a></li>'
+            "<li>Docs</li><li>Intro</li></ol>",
+        )
+
+    def test_paginated_listing_newest_first(self):
+        self.assertEqual(self.navigation.page_count("/blog/"), 2)
+        self.assertEqual(
+            self.navigation.listing("/blog/"),
+            '<ul class="listing"><li><a href="/blog/glorfindel/">Glorfindel</a></li>'
+            '<li><a href="/blog/tom/">Tom</a></li></ul>',
+        )
+        self.assertEqual(
+            self.navigation.listing("/blog/", 2),
+            '<ul class="listing"><li><a href="/blog/majesty/">Majesty &amp; more</a>'
+            "<p>On &lt;LOTR&gt;</p></li></ul>",
+        )
+        self.assertEqual(
+            self.navigation.pagination("/blog/", 2),
+            '<nav class="pagination"><a href="/blog/" rel="prev">Newer</a> '
+            "<span>2 / 2</span></nav>",
+        )
+        self.assertEqual(self.navigation.pagination("/contact/"), "")
+        self.assertEqual(self.navigation.listing("/contact/"), "")
+
+    def test_affected_pages(self):
+        self.assertEqual(self.navigation.affected(["/blog/tom/"]), {"/blog/"})
+        self.assertEqual(self.navigation.affected(["/blog/removed/"]), {"/blog/"})
+        # a menu entry changes every page
+        self.assertEqual(len(self.navigation.affected(["/blog/"])), len(PAGES))
+
+    def test_invalid_per_page(self):
+        with self.assertRaises(ValueError):
+            Navigation(PAGES, per_page=0)
+
+
+class TestScanPages(unittest.TestCase):
+
+    def test_unchanged_pages_not_reread(self):
+        with tempfile.TemporaryDirectory() as root:
+            content_dir = os.path.join(root, "content")
+            tom = os.path.join(content_dir, "tom.md")
+            write_text(tom, "---\ndate: 2024-02-01\n---\n# Tom\n\nBombadil.")
+            cache = BuildCache(os.path.join(root, "cache"))
+
+            pages, changed = scan_pages([tom], content_dir, cache)
+            self.assertEqual(
+                pages, [(tom, "/tom.html", "Tom", "2024-02-01", "Bombadil.")]
+            )
+            self.assertEqual(changed, ["/tom.html"])
+
+            pages, changed = scan_pages([tom], content_dir, cache)
+            self.assertEqual(changed, [])
+
+            pages, changed = scan_pages([], content_dir, cache)
+            self.assertEqual(changed, ["/tom.html"])
+
+
+class TestBuilderNavigation(SiteTestCase):
+
+    def test_listing_pages_written(self):
+        write_text(self.template_path, "{{ Breadcrumbs }}{{ Listing }}{{ Pagination }}")
+        for name in ("a", "b", "c"):
+            write_text(
+                self.path("content", "blog", name, "index.md"), f"# {name.upper()}"
+            )
+        write_text(self.path("content", "blog", "index.md"), "# Blog")
+        builder = self.make_builder([Target("/flatpy", self.path("docs"))], per_page=3)
+        self.build(builder)
+
+        first = read_text(self.path("docs", "blog", "index.html"))
+        self.assertIn('<a href="/flatpy/blog/a/">A</a>', first)
+        self.assertIn('<a href="/flatpy/blog/page/2/" rel="next">', first)
+        second = read_text(self.path("docs", "blog", "page", "2", "index.html"))
+        self.assertIn('<a href="/flatpy/blog/tom/">Tom</a>', second)
+        self.assertIn("<span>2 / 2</span>", second)
+        self.assertIn(
+            "<li>Tom</li>", read_text(self.path("docs", "blog", "tom", "index.html"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
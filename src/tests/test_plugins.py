@@ -0,0 +1,126 @@
+import unittest
+
+from src.build import Target
+from src.build.pages import read_text, write_text
+from src.nodes.textnode import TextNode, TextType
+from src.parsers import (
+    BlockCache,
+    ConversionContext,
+    Plugin,
+    PluginRunner,
+    render_markdown,
+)
+from src.tests.test_builder import SiteTestCase
+
+
+class Admonitions(Plugin):
+    # "!!! note Text" -> a quote block
+    def block(self, block):
+        if not block.startswith("!!! "):
+            return block
+        kind, _, text = block[4:].partition(" ")
+        return f"> **{kind.capitalize()}:** {text}"
+
+
+class DropComments(Plugin):
+    def block(self, block):
+        return "" if block.startswith("//") else block
+
+
+class RewriteLinks(Plugin):
+    name = "rewrite-links"
+
+    def text_nodes(self, text_nodes):
+        return [
+            (
+                TextNode(node.text, node.text_type, node.url[:-3] + "/")
+                if node.text_type == TextType.LINK and node.url.endswith(".md")
+                else node
+            )
+            for node in text_nodes
+        ]
+
+
+class CodeClass(Plugin):
+    def html_node(self, node, block_type):
+        if node.tag == "pre":
+            node.props = {"class": "code"}
+        return node
+
+
+class Footer(Plugin):
+    def page(self, html, url):
+        return html.replace("</body>", f"<footer>{url}</footer></body>")
+
+
+MARKDOWN = "!!! note Read [Tom](tom.md)\n\n// hidden\n\n```\ncode\n```"
+
+
+class TestPlugins(unittest.TestCase):
+
+    def render(self, engine, plugins, cache=None, profile=False):
+        context = ConversionContext(plugins=PluginRunner(plugins, profile))
+        return render_markdown(MARKDOWN, engine, cache, context), context
+
+    def test_block_and_inline_hooks_in_every_engine(self):
+        expected = (
+            '<div><blockquote><b>Note:</b> Read <a href="tom/">Tom</a></blockquote>'
+            "<pre><code>code\n</code></pre></div>"
+        )
+        plugins = [Admonitions(), DropComments(), RewriteLinks()]
+        for engine in ("tree", "arena", "direct"):
+            for cache in (None, BlockCache()):
+                with self.subTest(engine=engine, cache=cache is not None):
+                    self.assertEqual(self.render(engine, plugins, cache)[0], expected)
+
+    def test_html_node_hook(self):
+        html, _ = self.render("tree", [CodeClass()])
+        self.assertIn('<pre class="code">', html)
+        for engine in ("arena", "direct"):
+            with self.subTest(engine=engine):
+                with self.assertRaises(ValueError):
+                    self.render(engine, [CodeClass()])
+
+    def test_cache_keyed_by_plugins(self):
+        cache = BlockCache()
+        with_plugin, _ = self.render("direct", [DropComments()], cache)
+        without = render_markdown(MARKDOWN, "direct", cache)
+        self.assertNotIn("hidden", with_plugin)
+        self.assertIn("hidden", without)
+
+    def test_only_overridden_hooks_run(self):
+        runner = PluginRunner([Admonitions(), RewriteLinks()])
+        self.assertEqual([name for name, _ in runner.hooks["block"]], ["Admonitions"])
+        self.assertFalse(runner.has_hook("page"))
+
+    def test_profile(self):
+        _, context = self.render("tree", [Admonitions(), RewriteLinks()], profile=True)
+        runner = context.plugins
+        runner.stop()
+        # one block hook call per block, one inline call per text run (the
+        # quote and the "// hidden" paragraph)
+        self.assertEqual(runner.stats["Admonitions"].calls, 3)
+        self.assertEqual(runner.stats["rewrite-links"].calls, 2)
+        self.assertGreater(runner.stats["rewrite-links"].allocated, 0)
+        self.assertEqual(len(runner.report()), 2)
+
+    def test_duplicate_names(self):
+        with self.assertRaises(ValueError):
+            PluginRunner([Footer(), Footer()])
+
+
+class TestBuilderPlugins(SiteTestCase):
+
+    def test_page_hook(self):
+        write_text(self.template_path, "<body>{{ Content }}</body>")
+        builder = self.make_builder(
+            [Target("/", self.path("docs"))], plugins=[Footer()], profile_plugins=True
+        )
+        self.build(builder)
+        html = read_text(self.path("docs", "blog", "tom", "index.html"))
+        self.assertTrue(html.endswith("<footer>/blog/tom/</footer></body>"))
+        self.assertEqual(builder.plugins.stats["Footer"].calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
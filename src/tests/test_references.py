@@ -0,0 +1,135 @@
+import unittest
+
+from src.nodes import TextNode, TextType
+from src.parsers import (
+    ENGINES,
+    BlockCache,
+    ConversionContext,
+    markdown_to_blocks,
+    render_markdown,
+    text_to_textnodes,
+)
+from src.parsers.references import References
+
+DOCUMENT = """# Tom
+
+Read [the book][LotR], [Tolkien][] and ![cover][img].[^1]
+
+Again[^note] and[^1] [missing][nope].
+
+[lotr]: https://example.com/lotr "The book"
+[tolkien]: <https://example.com/jrr>
+[img]: /cover.png
+[^1]: About [Tolkien][].
+[^note]: Continued
+on the next line.[^3]
+[^3]: Nested.
+[^unused]: Never referenced.
+"""
+
+
+class TestReferences(unittest.TestCase):
+
+    def test_definitions_collected_while_splitting_blocks(self):
+        references = References()
+        blocks = markdown_to_blocks(DOCUMENT, references)
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(references.links["lotr"], "https://example.com/lotr")
+        self.assertEqual(references.links["tolkien"], "https://example.com/jrr")
+        self.assertEqual(
+            references.footnotes["note"], "Continued on the next line.[^3]"
+        )
+        # without a table the definitions stay text
+        self.assertEqual(len(markdown_to_blocks(DOCUMENT)), 4)
+
+    def test_code_blocks_keep_definition_lines(self):
+        references = References()
+        blocks = markdown_to_blocks("```\n[a]: b\n```", references)
+        self.assertEqual(blocks, ["```\n[a]: b\n```"])
+        self.assertFalse(references)
+
+    def test_definitions_only_start_a_paragraph(self):
+        references = References()
+        blocks = markdown_to_blocks("Some text\n[x]: y\nmore text", references)
+        self.assertEqual(blocks, ["Some text\n[x]: y\nmore text"])
+        self.assertFalse(references)
+        html = render_markdown("Some text\n[x]: y\nmore [x][]")
+        self.assertEqual(html, "<div><p>Some text [x]: y more [x][]</p></div>")
+
+    def test_resolve_references(self):
+        references = References()
+        references.collect(["[Ref]: /url", "[^n]: note"])
+        self.assertEqual(
+            text_to_textnodes("a [link][ref] ![img][REF] [^n] [^n] [x][y]", references),
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "/url"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "/url"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("1", TextType.FOOTNOTE, "fnref-1"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("1", TextType.FOOTNOTE),
+                TextNode(" [x][y]", TextType.TEXT),
+            ],
+        )
+
+    def test_render(self):
+        html = render_markdown(DOCUMENT, "tree")
+        self.assertIn('<a href="https://example.com/lotr">the book</a>', html)
+        self.assertIn('<img src="/cover.png" alt="cover"></img>', html)
+        self.assertIn('<sup id="fnref-1"><a href="#fn-1">1</a></sup>', html)
+        self.assertIn('and<sup><a href="#fn-1">1</a></sup>', html)
+        self.assertIn("[missing][nope]", html)
+        self.assertNotIn("lotr]:", html)
+        self.assertTrue(
+            html.endswith(
+                '<section class="footnotes"><ol>'
+                '<li id="fn-1">About <a href="https://example.com/jrr">Tolkien</a>.'
+                '<a href="#fnref-1">↩</a></li>'
+                '<li id="fn-2">Continued on the next line.'
+                '<sup id="fnref-3"><a href="#fn-3">3</a></sup>'
+                '<a href="#fnref-2">↩</a></li>'
+                '<li id="fn-3">Nested.<a href="#fnref-3">↩</a></li>'
+                "</ol></section></div>"
+            )
+        )
+        self.assertNotIn("Never referenced", html)
+
+    def test_references_in_inline_code_stay_literal(self):
+        markdown = "Write `[^1]` here.[^1]\n\n[^1]: note"
+        expected = (
+            '<div><p>Write <code>[^1]</code> here.<sup id="fnref-1">'
+            '<a href="#fn-1">1</a></sup></p><section class="footnotes"><ol>'
+            '<li id="fn-1">note<a href="#fnref-1">↩</a></li></ol></section></div>'
+        )
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(render_markdown(markdown, engine), expected)
+
+    def test_engines_match(self):
+        expected = render_markdown(DOCUMENT, "tree")
+        for engine in ENGINES:
+            for cache in (None, BlockCache()):
+                with self.subTest(engine=engine, cached=cache is not None):
+                    self.assertEqual(render_markdown(DOCUMENT, engine, cache), expected)
+
+    def test_cached_blocks_use_their_own_definitions(self):
+        cache = BlockCache()
+        block = "See [it][ref]."
+        first = render_markdown(f"{block}\n\n[ref]: /a", "direct", cache)
+        second = render_markdown(f"{block}\n\n[ref]: /b", "direct", cache)
+        plain = render_markdown(block, "direct", cache)
+        self.assertIn('href="/a"', first)
+        self.assertIn('href="/b"', second)
+        self.assertIn("[it][ref]", plain)
+
+    def test_footnote_links_collected(self):
+        context = ConversionContext(collect_text=True, collect_links=True)
+        render_markdown(DOCUMENT, "direct", None, context)
+        self.assertIn((TextType.LINK, "https://example.com/jrr"), context.links)
+        self.assertIn("Nested.", [node.text for node in context.text_nodes])
+
+
+if __name__ == "__main__":
+    unittest.main()
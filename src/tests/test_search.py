@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.search import SearchIndex, shard_key, tokenize
+from src.nodes import TextNode, TextType
+from src.tests.test_builder import SiteTestCase
+
+
+def text_nodes(*texts):
+    return [TextNode(text, TextType.TEXT) for text in texts]
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Tom's _merry_ Song, 2 songs; Váya márië"),
+            ["tom", "merry", "song", "songs", "váya", "márië"],
+        )
+
+    def test_shard_key(self):
+        self.assertEqual(shard_key("tom"), "t")
+        self.assertEqual(shard_key("42"), "4")
+        self.assertEqual(shard_key("váya"), "v")
+        self.assertEqual(shard_key("élan"), "_")
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self._tmp.name, "cache", "search.json")
+        self.output_dir = os.path.join(self._tmp.name, "search")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read_json(self, name):
+        with open(os.path.join(self.output_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def build(self, pages):
+        index = SearchIndex(self.state_path)
+        for url, (title, texts) in pages.items():
+            index.add_page(url, title, text_nodes(*texts))
+        index.remove_missing()
+        written = index.write(self.output_dir)
+        index.save()
+        index.finish()
+        return written
+
+    def test_writes_postings_and_pages(self):
+        self.build(
+            {
+                "/": ("Home", ["Tom and tea", "tea again"]),
+                "/blog/tom/": ("Tom", ["Tom Bombadil"]),
+            }
+        )
+        self.assertEqual(
+            self.read_json("pages.json"),
+            {"0": ["/", "Home"], "1": ["/blog/tom/", "Tom"]},
+        )
+        shard = self.read_json("t.json")
+        self.assertEqual(shard["tea"], [[0, 2]])
+        self.assertEqual(shard["tom"], [[0, 1], [1, 1]])
+        self.assertEqual(self.read_json("b.json"), {"bombadil": [[1, 1]]})
+
+    def test_incremental_rewrites_only_changed_shards(self):
+        pages = {
+            "/": ("Home", ["apple"]),
+            "/b/": ("B", ["banana"]),
+        }
+        self.assertEqual(self.build(pages), 3)
+
+        # unchanged pages write nothing
+        self.assertEqual(self.build(pages), 0)
+
+        pages["/b/"] = ("B", ["cherry"])
+        self.assertEqual(self.build(pages), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "b.json")))
+        self.assertEqual(self.read_json("c.json"), {"cherry": [[1, 1]]})
+        self.assertEqual(self.read_json("a.json"), {"apple": [[0, 1]]})
+
+    def test_removed_pages_are_dropped(self):
+        self.build({"/": ("Home", ["apple"]), "/b/": ("B", ["apple"])})
+        self.build({"/": ("Home", ["apple"])})
+        self.assertEqual(self.read_json("pages.json"), {"0": ["/", "Home"]})
+        self.assertEqual(self.read_json("a.json"), {"apple": [[0, 1]]})
+
+    def test_missing_output_is_rewritten(self):
+        pages = {"/": ("Home", ["apple"])}
+        self.build(pages)
+        os.remove(os.path.join(self.output_dir, "a.json"))
+        self.assertEqual(self.build(pages), 1)
+        self.assertEqual(self.read_json("a.json"), {"apple": [[0, 1]]})
+
+
+class TestSiteSearchIndex(SiteTestCase):
+
+    def test_build_writes_search_index(self):
+        output_dir = self.path("docs")
+        builder = self.make_builder([Target("/", output_dir)])
+        self.build(builder)
+        with open(os.path.join(output_dir, "search", "pages.json")) as f:
+            pages = json.load(f)
+        self.assertEqual(sorted(pages.values()), [["/", "Home"], ["/blog/tom/", "Tom"]])
+        with open(os.path.join(output_dir, "search", "t.json")) as f:
+            # the image alt text on the Tom page is indexed too
+            self.assertEqual(json.load(f)["tom"], [[0, 1], [1, 2]])
+
+    def test_page_urls_include_each_targets_basepath(self):
+        targets = [Target("/", self.path("root")), Target("/flatpy", self.path("sub"))]
+        self.build(self.make_builder(targets))
+        for output_dir, urls in (
+            ("root", ["/", "/blog/tom/"]),
+            ("sub", ["/flatpy/", "/flatpy/blog/tom/"]),
+        ):
+            with open(self.path(output_dir, "search", "pages.json")) as f:
+                pages = json.load(f)
+            self.assertEqual(sorted(url for url, _ in pages.values()), urls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import gzip
+import http.client
+import io
+import os
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from src.build import SiteBuilder, Target
+from src.build.pages import write_text
+from src.build.server import LIVE_RELOAD_PATH, DevServer, inject_live_reload
+from src.tests.test_builder import SiteTestCase
+
+
+class TestDevServer(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write_text(self.path("static", "big.css"), "body { color: red; }\n" * 100)
+        self.dev = self.start_server("")
+
+    def start_server(self, basepath):
+        def make_builder(output):
+            return SiteBuilder(
+                content_dir=self.content_dir,
+                template_path=self.template_path,
+                static_dir=self.static_dir,
+                targets=[Target(basepath, "docs")],
+                cache_dir=self.path("cache"),
+                output=output,
+            )
+
+        dev = DevServer(make_builder, [self.content_dir], port=0, basepath=basepath)
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(dev.rebuild())
+        thread = threading.Thread(target=dev.httpd.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(dev.shutdown)
+        self.addCleanup(dev.httpd.shutdown)
+        return dev
+
+    def request(self, path, headers=None, dev=None):
+        host, port = (dev or self.dev).httpd.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_serves_pages_from_memory(self):
+        response, body = self.request("/blog/tom/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertIn(b"<h1>Tom</h1>", body)
+        self.assertIn(LIVE_RELOAD_PATH.encode("utf-8"), body)
+        response, body = self.request("/index.css")
+        self.assertEqual(body, b"body {}")
+
+    def test_rebuild_writes_no_cache_files(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.dev.rebuild())
+        self.assertFalse(os.path.exists(self.path("cache")))
+
+    def test_etag_and_not_modified(self):
+        response, _ = self.request("/")
+        etag = response.getheader("ETag")
+        response, body = self.request("/", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+        response, _ = self.request("/", {"If-None-Match": '"other"'})
+        self.assertEqual(response.status, 200)
+
+    def test_gzip(self):
+        response, body = self.request("/big.css", {"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), b"body { color: red; }\n" * 100)
+        response, body = self.request("/big.css")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+
+    def test_gzip_variant_has_its_own_etag(self):
+        response, _ = self.request("/big.css", {"Accept-Encoding": "gzip"})
+        gzip_etag = response.getheader("ETag")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        response, _ = self.request("/big.css")
+        etag = response.getheader("ETag")
+        self.assertEqual(gzip_etag, etag[:-1] + '-gzip"')
+        # either form revalidates either variant
+        for tag in (etag, gzip_etag):
+            response, body = self.request("/big.css", {"If-None-Match": tag})
+            self.assertEqual((response.status, response.getheader("ETag")), (304, etag))
+            response, body = self.request(
+                "/big.css", {"If-None-Match": tag, "Accept-Encoding": "gzip"}
+            )
+            self.assertEqual(
+                (response.status, response.getheader("ETag")), (304, gzip_etag)
+            )
+
+    def test_redirect_and_not_found(self):
+        response, _ = self.request("/blog/tom")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/blog/tom/")
+        response, _ = self.request("/blog/missing/")
+        self.assertEqual(response.status, 404)
+
+    def test_basepath(self):
+        dev = self.start_server("/flatpy")
+        response, body = self.request("/flatpy/", dev=dev)
+        self.assertIn(b'<link href="/flatpy/index.css" />', body)
+        response, _ = self.request("/flatpy/index.css", dev=dev)
+        self.assertEqual(response.status, 200)
+        response, _ = self.request("/index.css", dev=dev)
+        self.assertEqual(response.status, 404)
+
+    def test_rebuild_pushes_reload_event(self):
+        host, port = self.dev.httpd.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", LIVE_RELOAD_PATH)
+        response = connection.getresponse()
+        self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+        self.assertEqual(response.readline(), b"retry: 1000\n")
+        response.readline()
+
+        write_text(self.path("content", "index.md"), "# Home\n\nChanged")
+        with redirect_stdout(io.StringIO()):
+            self.dev.rebuild()
+        self.assertEqual(response.readline(), f"data: {self.dev.version}\n".encode())
+        connection.close()
+        _, body = self.request("/")
+        self.assertIn(b"Changed", body)
+
+    def test_failed_build_keeps_last_site(self):
+        write_text(self.path("content", "index.md"), "no title")
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(self.dev.rebuild())
+        response, _ = self.request("/")
+        self.assertEqual(response.status, 200)
+
+    def test_inject_live_reload(self):
+        self.assertTrue(
+            inject_live_reload(b"<body></body>").endswith(b"</script></body>")
+        )
+        self.assertTrue(inject_live_reload(b"<p>x</p>").endswith(b"</script>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.cache import BuildCache
+from src.build.feed import FeedWriter
+from src.build.pages import date_timestamp, read_text, write_text
+from src.build.sitemap import SitemapWriter
+from src.tests.test_builder import SiteTestCase
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self._tmp.name, "docs")
+        self.cache = BuildCache(os.path.join(self._tmp.name, "cache"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.output_dir, *parts), encoding="utf-8") as f:
+            return f.read()
+
+    def exists(self, *parts):
+        return os.path.exists(os.path.join(self.output_dir, *parts))
+
+
+class TestSitemapWriter(OutputTestCase):
+
+    def write_sitemap(self, urls, max_urls=None):
+        writer = SitemapWriter(self.output_dir, self.cache, "https://x.io", "/flatpy")
+        if max_urls:
+            writer.max_urls = max_urls
+        for url in urls:
+            writer.add(url, "2025-01-02")
+        return writer.close()
+
+    def test_single_sitemap(self):
+        self.assertTrue(self.write_sitemap(["/", "/blog/a&b/"]))
+        sitemap = self.read("sitemap.xml")
+        self.assertIn(
+            "<url><loc>https://x.io/flatpy/</loc><lastmod>2025-01-02</lastmod></url>",
+            sitemap,
+        )
+        self.assertIn("<loc>https://x.io/flatpy/blog/a&amp;b/</loc>", sitemap)
+        self.assertFalse(self.exists("sitemap-1.xml"))
+        self.assertEqual(os.listdir(self.output_dir), ["sitemap.xml"])
+
+    def test_split_into_index(self):
+        self.assertTrue(self.write_sitemap([f"/p{i}/" for i in range(5)], max_urls=2))
+        index = self.read("sitemap.xml")
+        self.assertIn("<sitemapindex", index)
+        for n in (1, 2, 3):
+            self.assertIn(f"<loc>https://x.io/flatpy/sitemap-{n}.xml</loc>", index)
+        self.assertEqual(self.read("sitemap-3.xml").count("<url>"), 1)
+
+        # shrinking back to one file removes the old parts
+        self.assertTrue(self.write_sitemap(["/"], max_urls=2))
+        self.assertFalse(self.exists("sitemap-1.xml"))
+        self.assertFalse(self.exists("sitemap-3.xml"))
+        self.assertIn("<urlset", self.read("sitemap.xml"))
+
+    def test_unchanged_sitemap_not_rewritten(self):
+        urls = ["/", "/about/"]
+        self.assertTrue(self.write_sitemap(urls))
+        mtime = os.stat(os.path.join(self.output_dir, "sitemap.xml")).st_mtime_ns
+        self.assertFalse(self.write_sitemap(urls))
+        self.assertEqual(
+            os.stat(os.path.join(self.output_dir, "sitemap.xml")).st_mtime_ns, mtime
+        )
+        self.assertEqual(os.listdir(self.output_dir), ["sitemap.xml"])
+        self.assertTrue(self.write_sitemap(urls + ["/new/"]))
+
+    def test_missing_sitemap_rewritten(self):
+        self.write_sitemap(["/"])
+        os.remove(os.path.join(self.output_dir, "sitemap.xml"))
+        self.assertTrue(self.write_sitemap(["/"]))
+        self.assertTrue(self.exists("sitemap.xml"))
+
+
+class TestFeedWriter(OutputTestCase):
+
+    def test_keeps_newest_items(self):
+        feed = FeedWriter(
+            self.output_dir, self.cache, "blog", "https://x.io", max_items=2
+        )
+        feed.add("/blog/old/", "Old", 1_000_000)
+        feed.add("/blog/new/", "New <post>", 3_000_000)
+        feed.add("/blog/mid/", "Mid", 2_000_000, summary="A summary")
+        self.assertTrue(feed.close())
+
+        rss = self.read("blog", "feed.xml")
+        self.assertIn("<title>Blog</title>", rss)
+        self.assertIn("<link>https://x.io/blog/</link>", rss)
+        self.assertNotIn("/blog/old/", rss)
+        self.assertLess(rss.index("New &lt;post&gt;"), rss.index("Mid"))
+        self.assertIn("<description>A summary</description>", rss)
+        self.assertIn("<pubDate>Wed, 04 Feb 1970 17:20:00 GMT</pubDate>", rss)
+
+    def test_unchanged_feed_not_rewritten(self):
+        for expected in (True, False):
+            feed = FeedWriter(self.output_dir, self.cache, "blog")
+            feed.add("/blog/a/", "A", 1_000_000)
+            self.assertEqual(feed.close(), expected)
+
+
+class TestPageDates(SiteTestCase):
+
+    def test_date_timestamp(self):
+        self.assertEqual(date_timestamp("2024-02-01"), 1706745600)
+        self.assertEqual(date_timestamp("2024-02-01T01:00:00Z"), 1706749200)
+        self.assertIsNone(date_timestamp(""))
+        self.assertIsNone(date_timestamp("soon"))
+
+    def test_front_matter_date_and_summary_used(self):
+        tom = self.path("content", "blog", "tom", "index.md")
+        write_text(tom, "---\ndate: 2024-02-01\n---\n# Tom\n\nBombadil sings.")
+        docs = self.path("docs")
+        for mtime in (1_000_000_000, 1_100_000_000):
+            # a fresh checkout changes mtimes, not the dates
+            os.utime(tom, (mtime, mtime))
+            self.build(self.make_builder([Target("/", docs)]))
+            feed = read_text(os.path.join(docs, "blog", "feed.xml"))
+            self.assertIn("<pubDate>Thu, 01 Feb 2024 00:00:00 GMT</pubDate>", feed)
+            self.assertIn("<description>Bombadil sings.</description>", feed)
+            sitemap = read_text(os.path.join(docs, "sitemap.xml"))
+            self.assertIn("/blog/tom/</loc><lastmod>2024-02-01</lastmod>", sitemap)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.cache import BuildCache
+from src.build.pages import read_text
+from src.build.store import (
+    LocalStore,
+    decode_entry,
+    encode_entry,
+    generator_version,
+    valid_key,
+)
+from src.tests.test_builder import SiteTestCase
+
+KEY = "a3" + "0" * 62
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def test_state_and_blobs_kept_in_memory(self):
+        cache = BuildCache(None)
+        cache.save_json("state.json", {"a": [1]})
+        cache.write_blob("pages", KEY, b"html")
+        self.assertEqual(cache.load_json("state.json"), {"a": [1]})
+        self.assertEqual(cache.load_json("missing.json", {}), {})
+        self.assertEqual(cache.read_blob("pages", KEY), b"html")
+        self.assertEqual(list(cache.store.keys()), [f"pages/{KEY}"])
+
+
+class TestEntries(unittest.TestCase):
+
+    def test_round_trip(self):
+        self.assertEqual(decode_entry(encode_entry(b"data\n", "v1"), "v1"), b"data\n")
+
+    def test_other_version_or_damaged_entry_is_a_miss(self):
+        raw = encode_entry(b"data", "v1")
+        self.assertIsNone(decode_entry(raw, "v2"))
+        self.assertIsNone(decode_entry(raw[:-1] + b"x", "v1"))
+        self.assertIsNone(decode_entry(b"data", "v1"))
+
+    def test_generator_version_is_stable(self):
+        self.assertEqual(generator_version(), generator_version())
+        self.assertEqual(len(generator_version()), 16)
+
+    def test_valid_key(self):
+        self.assertTrue(valid_key(f"gzip/{KEY}-9"))
+        self.assertTrue(valid_key(f"minify/{KEY}.html"))
+        for key in ("gzip/../x", f"/gzip/{KEY}", f"gzip/{KEY}/x", f"gzip/{KEY}.1.tmp"):
+            with self.subTest(key=key):
+                self.assertFalse(valid_key(key))
+
+
+class TestBuildCacheExport(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = BuildCache(self.path("cache"))
+        self.cache.write_blob("gzip", KEY, b"compressed")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self._tmp.name, *parts)
+
+    def test_export_and_import(self):
+        for destination in ("exported", "cache.tar.gz", "cache.tar"):
+            with self.subTest(destination=destination):
+                self.assertEqual(self.cache.export_to(self.path(destination)), 1)
+                restored = BuildCache(self.path("restored", destination))
+                self.assertEqual(restored.import_from(self.path(destination)), (1, 0))
+                self.assertEqual(restored.read_blob("gzip", KEY), b"compressed")
+
+    def test_stale_entries_not_exported_or_imported(self):
+        BuildCache(self.path("cache"), version="old").write_blob("gzip", "b" * 64, b"x")
+        self.assertEqual(self.cache.export_to(self.path("exported")), 1)
+        store = LocalStore(self.path("tampered"))
+        store.put(f"gzip/{KEY}", encode_entry(b"compressed", "old"))
+        store.put("gzip/" + "c" * 64, b"garbage")
+        restored = BuildCache(self.path("restored"))
+        self.assertEqual(restored.import_from(self.path("tampered")), (0, 2))
+        self.assertIsNone(restored.read_blob("gzip", KEY))
+
+    def test_unsafe_tar_members_ignored(self):
+        with tarfile.open(self.path("evil.tar"), "w") as tar:
+            info = tarfile.TarInfo("../../evil")
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b"evil"))
+        restored = BuildCache(self.path("restored"))
+        self.assertEqual(restored.import_from(self.path("evil.tar")), (0, 0))
+        self.assertFalse(os.path.exists(self.path("evil")))
+
+    def test_missing_source(self):
+        with self.assertRaises(ValueError):
+            self.cache.import_from(self.path("missing"))
+        with self.assertRaises(ValueError):
+            self.cache.import_from(self.path("missing.tar"))
+
+
+class TestRestoredBuild(SiteTestCase):
+
+    def test_restored_cache_skips_rendering(self):
+        self.build(self.make_builder([Target("/", self.path("docs"))]))
+        expected = read_text(self.path("docs", "index.html"))
+        BuildCache(self.path("cache")).export_to(self.path("cache.tar.gz"))
+
+        # another machine: empty cache and output directories
+        BuildCache(self.path("ci-cache")).import_from(self.path("cache.tar.gz"))
+        builder = self.build(
+            self.make_builder(
+                [Target("/", self.path("ci-docs"))], cache_dir=self.path("ci-cache")
+            )
+        )
+        self.assertEqual((builder.cache.hits, builder.cache.misses), (0, 0))
+        self.assertEqual(read_text(self.path("ci-docs", "index.html")), expected)
+        # links and search text were restored with the page bodies
+        self.assertEqual(len(builder.link_checker.references), 2)
+        self.assertIn("tom", builder.search_index.pages["/"]["terms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
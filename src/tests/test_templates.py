@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from src.build import Target
+from src.build.pages import read_text, write_text
+from src.build.templates import TemplateError, TemplateLoader, compile_template
+from src.tests.test_builder import SiteTestCase
+
+BASE = (
+    "<html><title>{% block title %}{{ Title }}{% endblock %}</title>"
+    '{% include "partials/header.html" %}'
+    "<main>{% block main %}{{ Content }}{% endblock %}</main></html>"
+)
+
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.loader = TemplateLoader(self._tmp.name)
+        self.write("base.html", BASE)
+        self.write("partials/header.html", "<header>{{ site }}</header>")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        write_text(os.path.join(self._tmp.name, name), text)
+
+    def test_variables(self):
+        template = compile_template("<h1>{{ Title }}</h1>{{Content}}{{ missing }}")
+        self.assertEqual(template.variables, {"Title", "Content", "missing"})
+        self.assertEqual(
+            template.render({"Title": "Tom", "Content": "<p>x</p>"}),
+            "<h1>Tom</h1><p>x</p>",
+        )
+
+    def test_layout_blocks_and_includes(self):
+        self.write(
+            "blog.html",
+            '{% extends "base.html" %}{% block main %}<article>{{ Content }}'
+            "</article>{% endblock %}",
+        )
+        template = self.loader.load_name("blog.html")
+        html = template.render({"Title": "Tom", "Content": "<p>x</p>", "site": "LOTR"})
+        self.assertEqual(
+            html,
+            "<html><title>Tom</title><header>LOTR</header>"
+            "<main><article><p>x</p></article></main></html>",
+        )
+        # compiled to literals and slots only
+        self.assertEqual(len(template.slots), 3)
+        self.assertIs(self.loader.load_name("blog.html"), template)
+
+    def test_multi_level_extends(self):
+        self.write(
+            "blog.html", '{% extends "base.html" %}{% block title %}Blog{% endblock %}'
+        )
+        self.write(
+            "post.html", '{% extends "blog.html" %}{% block main %}post{% endblock %}'
+        )
+        html = self.loader.load_name("post.html").render({"site": "s"})
+        self.assertEqual(
+            html, "<html><title>Blog</title><header>s</header><main>post</main></html>"
+        )
+
+    def test_find_directory_template(self):
+        self.write("blog/page.html", "blog")
+        self.assertEqual(
+            self.loader.find(os.path.join("blog", "tom")),
+            os.path.join(self._tmp.name, "blog", "page.html"),
+        )
+        self.assertIsNone(self.loader.find("contact"))
+
+    def test_errors(self):
+        self.write("loop.html", '{% include "loop.html" %}')
+        self.write("a.html", '{% extends "b.html" %}')
+        self.write("b.html", '{% extends "a.html" %}')
+        for text in (
+            "{% block main %}",
+            "{% endblock %}",
+            "{% for x in y %}",
+            '{% include "missing.html" %}',
+            '{% include "loop.html" %}',
+            '{% extends "a.html" %}',
+            "{% block %}{% endblock %}",
+        ):
+            with self.subTest(text=text):
+                with self.assertRaises(TemplateError):
+                    self.loader.compile(text)
+
+
+class TestBuilderTemplates(SiteTestCase):
+
+    def test_per_directory_template_and_front_matter(self):
+        write_text(
+            self.path("templates", "blog", "page.html"), "<blog>{{ Content }}</blog>"
+        )
+        write_text(self.path("templates", "landing.html"), "{{ Title }}|{{ tagline }}")
+        write_text(
+            self.path("content", "about.md"),
+            "---\ntemplate: landing.html\ntitle: About us\ntagline: Hi\n---\n# About",
+        )
+        builder = self.make_builder(
+            [Target("/", self.path("docs"))], templates_dir=self.path("templates")
+        )
+        self.build(builder)
+
+        self.assertEqual(
+            read_text(self.path("docs", "blog", "tom", "index.html")),
+            '<blog><div><h1>Tom</h1><p><img src="//images/tom.png" alt="tom"></img>'
+            "</p></div></blog>",
+        )
+        self.assertEqual(read_text(self.path("docs", "about.html")), "About us|Hi")
+        self.assertIn("<title>Home</title>", read_text(self.path("docs", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
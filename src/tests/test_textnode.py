@@ -29,6 +29,12 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Text", TextType.LINK)
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("Text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+
+from src.build import Target
+from src.build.pages import read_text, write_text
+from src.parsers import (
+    ENGINES,
+    BlockCache,
+    ConversionContext,
+    render_markdown,
+    slugify,
+    toc_html,
+)
+from src.tests.test_builder import SiteTestCase
+
+MARKDOWN = """# Why Tom Bombadil Was a Mistake?
+
+## Intro
+
+Text.
+
+### The **Old** Forest
+
+## Intro
+
+## [Goldberry](/goldberry) ![img](/g.png)
+"""
+
+
+class TestSlugify(unittest.TestCase):
+
+    def test_slugify(self):
+        self.assertEqual(
+            slugify("Why Tom Bombadil Was a Mistake?"), "why-tom-bombadil-was-a-mistake"
+        )
+        self.assertEqual(
+            slugify("  snake_case -- and  spaces "), "snake-case-and-spaces"
+        )
+        self.assertEqual(slugify("Éowyn"), "éowyn")
+        self.assertEqual(slugify("?!"), "section")
+
+
+class TestToc(unittest.TestCase):
+
+    def render(self, engine, cache=None):
+        context = ConversionContext(collect_toc=True)
+        return render_markdown(MARKDOWN, engine, cache, context), context.toc
+
+    def test_heading_ids(self):
+        html, toc = self.render("tree")
+        self.assertIn('<h1 id="why-tom-bombadil-was-a-mistake">', html)
+        self.assertIn('<h2 id="intro">Intro</h2>', html)
+        self.assertIn('<h3 id="the-old-forest">The <b>Old</b> Forest</h3>', html)
+        self.assertIn('<h2 id="intro-1">Intro</h2>', html)
+        self.assertEqual(
+            toc,
+            [
+                (
+                    1,
+                    "why-tom-bombadil-was-a-mistake",
+                    "Why Tom Bombadil Was a Mistake?",
+                ),
+                (2, "intro", "Intro"),
+                (3, "the-old-forest", "The Old Forest"),
+                (2, "intro-1", "Intro"),
+                (2, "goldberry", "Goldberry "),
+            ],
+        )
+
+    def test_engines_match(self):
+        expected = self.render("tree")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(self.render(engine), expected)
+                # cached headings still get ids for their own document
+                cache = BlockCache()
+                self.render(engine, cache)
+                self.assertEqual(self.render(engine, cache), expected)
+
+    def test_off_by_default(self):
+        html = render_markdown(MARKDOWN, "tree", None, ConversionContext())
+        self.assertIn("<h2>Intro</h2>", html)
+
+    def test_unique_after_suffix_collision(self):
+        context = ConversionContext(collect_toc=True)
+        render_markdown("## A 1\n\n## A\n\n## A", "direct", None, context)
+        self.assertEqual([slug for _, slug, _ in context.toc], ["a-1", "a", "a-2"])
+
+    def test_toc_html(self):
+        toc = [(2, "a", "A"), (3, "b", "B & C"), (2, "d", "D"), (4, "e", "E")]
+        self.assertEqual(
+            toc_html(toc),
+            '<ul class="toc"><li><a href="#a">A</a><ul><li><a href="#b">B &amp; C</a>'
+            '</li></ul></li><li><a href="#d">D</a><ul><li><a href="#e">E</a>'
+            "</li></ul></li></ul>",
+        )
+        self.assertEqual(toc_html([]), "")
+
+    def test_toc_html_shallower_heading_after_first(self):
+        toc = [(2, "intro", "Intro"), (1, "title", "Title"), (2, "a", "A")]
+        self.assertEqual(
+            toc_html(toc),
+            '<ul class="toc"><li><a href="#intro">Intro</a></li>'
+            '<li><a href="#title">Title</a><ul><li><a href="#a">A</a>'
+            "</li></ul></li></ul>",
+        )
+
+    def test_toc_text_matches_rendered_heading(self):
+        markdown = "## See [the map][map] `x*`[^1]\n\n[map]: /map\n[^1]: note"
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                context = ConversionContext(collect_toc=True)
+                render_markdown(markdown, engine, None, context)
+                self.assertEqual(context.toc, [(2, "see-the-map-x", "See the map x*")])
+
+
+class TestBuilderToc(SiteTestCase):
+
+    def test_toc_variable(self):
+        write_text(self.template_path, "{{ Toc }}{{ Content }}")
+        write_text(self.path("content", "index.md"), "# Home\n\n## Part one")
+        self.build(self.make_builder([Target("/", self.path("docs"))], toc=True))
+        html = read_text(self.path("docs", "index.html"))
+        self.assertIn('<a href="#part-one">Part one</a>', html)
+        self.assertIn('<h2 id="part-one">Part one</h2>', html)
+
+
+if __name__ == "__main__":
+    unittest.main()